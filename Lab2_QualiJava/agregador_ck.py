@@ -0,0 +1,168 @@
+import os
+import math
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from armazenamento_ck import pasta_particao
+
+# 📊 Agregação das métricas do CK numa única passada, lote a lote, com memória limitada.
+#
+# Para cada coluna numérica das tabelas de classe e método são calculados contagem, média,
+# desvio padrão, mínimo, máximo, média ponderada pela LOC e quantis aproximados. Os quantis vêm
+# de um sketch com buckets logarítmicos (no estilo DDSketch): o erro relativo é limitado por
+# PRECISAO_QUANTIS e a memória depende da faixa de valores, não da quantidade de linhas.
+
+TABELAS_AGREGADAS = ("class", "method")
+QUANTIS_CK = (0.5, 0.9, 0.99)
+PRECISAO_QUANTIS = 0.01
+LINHAS_POR_LOTE = 64 * 1024
+COLUNA_PESO = "loc"
+
+class SketchQuantis:
+    """
+    Sketch de quantis com buckets logarítmicos.
+
+    Um valor v > 0 cai no bucket ceil(log(v) / log(gamma)), com gamma = (1 + a) / (1 - a);
+    o representante do bucket difere de qualquer valor dele em no máximo `a` (erro relativo).
+    Negativos usam buckets espelhados e zeros têm contador próprio.
+    """
+    def __init__(self, precisao=PRECISAO_QUANTIS):
+        self.gamma = (1 + precisao) / (1 - precisao)
+        self.log_gamma = math.log(self.gamma)
+        self.positivos = {}
+        self.negativos = {}
+        self.zeros = 0
+        self.total = 0
+
+    def _acumular(self, buckets, valores):
+        indices, contagens = np.unique(np.ceil(np.log(valores) / self.log_gamma).astype(np.int64), return_counts=True)
+        for indice, contagem in zip(indices.tolist(), contagens.tolist()):
+            buckets[indice] = buckets.get(indice, 0) + contagem
+
+    def adicionar(self, valores):
+        """Adiciona um array numpy sem NaN."""
+        if len(valores) == 0:
+            return
+        positivos = valores[valores > 0]
+        negativos = valores[valores < 0]
+        if len(positivos):
+            self._acumular(self.positivos, positivos)
+        if len(negativos):
+            self._acumular(self.negativos, -negativos)
+        self.zeros += len(valores) - len(positivos) - len(negativos)
+        self.total += len(valores)
+
+    def _representante(self, indice):
+        return 2 * self.gamma ** indice / (self.gamma + 1)
+
+    def quantil(self, q):
+        if self.total == 0:
+            return None
+        posicao = q * (self.total - 1)
+        acumulado = 0
+        for indice in sorted(self.negativos, reverse=True):
+            acumulado += self.negativos[indice]
+            if acumulado > posicao:
+                return -self._representante(indice)
+        acumulado += self.zeros
+        if acumulado > posicao:
+            return 0.0
+        for indice in sorted(self.positivos):
+            acumulado += self.positivos[indice]
+            if acumulado > posicao:
+                return self._representante(indice)
+        return self._representante(max(self.positivos))
+
+class AgregadorColuna:
+    """Estatísticas de uma coluna combinadas lote a lote (média/variância pela fórmula de Chan)."""
+    def __init__(self, precisao=PRECISAO_QUANTIS):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.soma_ponderada = 0.0
+        self.soma_pesos = 0.0
+        self.sketch = SketchQuantis(precisao)
+
+    def adicionar(self, valores, pesos=None):
+        validos = ~np.isnan(valores)
+        lote = valores[validos]
+        n_lote = len(lote)
+        if n_lote == 0:
+            return
+
+        media_lote = lote.mean()
+        m2_lote = ((lote - media_lote) ** 2).sum()
+        n_total = self.n + n_lote
+        delta = media_lote - self.media
+        self.m2 += m2_lote + delta * delta * self.n * n_lote / n_total
+        self.media += delta * n_lote / n_total
+        self.n = n_total
+
+        self.minimo = min(self.minimo, lote.min())
+        self.maximo = max(self.maximo, lote.max())
+        self.sketch.adicionar(lote)
+
+        if pesos is not None:
+            pesos_validos = pesos[validos]
+            com_peso = ~np.isnan(pesos_validos)
+            self.soma_ponderada += float((lote[com_peso] * pesos_validos[com_peso]).sum())
+            self.soma_pesos += float(pesos_validos[com_peso].sum())
+
+    def resumo(self, quantis=QUANTIS_CK):
+        if self.n == 0:
+            return None
+        resumo = {
+            "count": self.n,
+            "mean": self.media,
+            "std": math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else None,
+            "min": float(self.minimo),
+            "max": float(self.maximo),
+        }
+        for q in quantis:
+            resumo[f"p{q * 100:g}"] = self.sketch.quantil(q)
+        resumo["mean_loc"] = self.soma_ponderada / self.soma_pesos if self.soma_pesos > 0 else None
+        return resumo
+
+def colunas_numericas(esquema):
+    return [campo.name for campo in esquema if pa.types.is_floating(campo.type) or pa.types.is_integer(campo.type)]
+
+def agregar_arquivo(arquivo, quantis=QUANTIS_CK, precisao=PRECISAO_QUANTIS, linhas_por_lote=LINHAS_POR_LOTE):
+    """Agrega todas as colunas numéricas de um arquivo Parquet em uma passada. Retorna {coluna: resumo}."""
+    parquet = pq.ParquetFile(arquivo)
+    colunas = colunas_numericas(parquet.schema_arrow)
+    agregadores = {coluna: AgregadorColuna(precisao) for coluna in colunas}
+
+    for lote in parquet.iter_batches(batch_size=linhas_por_lote, columns=colunas):
+        arrays = {coluna: lote.column(coluna).to_numpy(zero_copy_only=False).astype(np.float64, copy=False) for coluna in colunas}
+        pesos = arrays.get(COLUNA_PESO)
+        for coluna, agregador in agregadores.items():
+            agregador.adicionar(arrays[coluna], pesos)
+
+    return {coluna: agregador.resumo(quantis) for coluna, agregador in agregadores.items()}
+
+def agregar_saida_ck(repo_name, tabelas=TABELAS_AGREGADAS, quantis=QUANTIS_CK, precisao=PRECISAO_QUANTIS):
+    """
+    📊 Resume as tabelas do CK de um repositório.
+
+    Retorna uma lista de linhas {"tabela", "metrica", "count", "mean", "std", "min", "max",
+    "p50", "p90", "p99", "mean_loc"}, uma por coluna numérica com ao menos um valor.
+    """
+    linhas = []
+    for tabela in tabelas:
+        arquivo = os.path.join(pasta_particao(tabela, repo_name), "part-0.parquet")
+        if not os.path.exists(arquivo):
+            continue
+        resumos = agregar_arquivo(arquivo, quantis, precisao)
+        for metrica, resumo in resumos.items():
+            if resumo is not None:
+                linhas.append({"tabela": tabela, "metrica": metrica, **resumo})
+    return linhas
+
+def medias_principais(estatisticas):
+    """Extrai (CBO, DIT, LCOM) médios de classe do resultado de `agregar_saida_ck`."""
+    medias = {linha["metrica"]: linha["mean"] for linha in estatisticas if linha["tabela"] == "class"}
+    return medias.get("cbo"), medias.get("dit"), medias.get("lcom")
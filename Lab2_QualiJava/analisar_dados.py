@@ -1,12 +1,14 @@
 import os
 import logging
+import argparse
 import pandas as pd
 import statsmodels.api as sm
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import pearsonr, spearmanr, norm
 from tabulate import tabulate
-import numpy as np
+
+from motor_figuras import Figuras, preparar_histograma, histograma_de_contagens, preparar_boxplot, preparar_regressao
+from motor_correlacao import matrizes_correlacao, correlacoes_com
+from motor_bootstrap import bootstrap_questao
+from analise_streaming import analisar_fora_do_nucleo
 
 
 # Configuração dos diretórios base e da pasta de dados
@@ -43,7 +45,12 @@ def verificar_arquivo_entrada():
     logging.info(f"✅ Arquivo de entrada verificado com sucesso: {input_file}")
     return input_file
 
-def analisar_dados(input_file):
+METRICAS = ['CBO', 'DIT', 'LCOM', 'LOC', 'Comments', 'Maturity', 'Release', 'Stars']
+
+def formatar_estatisticas(descricao):
+    return descricao.map(lambda x: f"{x:,.0f}".replace(',', '.'))
+
+def analisar_dados(input_file, figuras):
     logging.info("📊 Iniciando análise dos dados coletados...")
     output_file = os.path.join(DATA_DIR, 'analise_metrica_ck.csv')
 
@@ -62,7 +69,7 @@ def analisar_dados(input_file):
         logging.warning(f"⚠️ Faltam colunas obrigatórias: {colunas_necessarias}")
         return
 
-    metricas = ['CBO', 'DIT', 'LCOM', 'LOC', 'Comments', 'Maturity', 'Release', 'Stars']
+    metricas = METRICAS
     logging.info("🧹 Limpando e preparando os dados...")
 
     for col in ['CBO', 'DIT', 'LCOM']:
@@ -79,68 +86,27 @@ def analisar_dados(input_file):
         return
 
     logging.info("📉 Calculando estatísticas descritivas...")
-    stats = df_metricas.describe().applymap(lambda x: f"{x:,.0f}".replace(',', '.'))
+    stats = formatar_estatisticas(df_metricas.describe())
     logging.info("✅ Estatísticas calculadas com sucesso:\n" + tabulate(stats, headers='keys', tablefmt='grid'))
 
     logging.info("🔗 Calculando matriz de correlação...")
-    correlacoes = df_metricas.corr()
+    correlacoes = matrizes_correlacao(df_metricas)["pearson"]
     logging.info("✅ Matriz de correlação calculada com sucesso:\n" + tabulate(correlacoes, headers='keys', tablefmt='grid'))
 
-    logging.info("🔗 Gerando histogramas das variáveis...")
-    plt.figure(figsize=(15, 10))
-
-    # Criar histogramas com curva normal para cada métrica
-    for i, metrica in enumerate(metricas, 1):
-        data = df_metricas[metrica].dropna()
-        bins = int(np.ceil(1 + np.log2(len(data))))  # Número de bins padrão
-
-        plt.subplot(2, 4, i)
-        ax = sns.histplot(data, bins=bins, kde=True, stat="count", edgecolor='black', alpha=0.7)
-
-        # Adicionar valores das frequências no topo das barras
-        for p in ax.patches:
-            height = p.get_height()
-            if height > 0:  # Evita mostrar valores para barras vazias
-                plt.text(p.get_x() + p.get_width() / 2, height + 5, f"{int(height)}",
-                        ha='center', va='bottom', fontsize=9)
-
-        plt.title(f'Histograma de {metrica}')
-        plt.xlabel(metrica)
-        plt.ylabel('Frequência')
-
-        # Salvar gráfico individualmente
-        fig, ax = plt.subplots(figsize=(8, 6))
-        sns.histplot(data, bins=bins, kde=True, stat="count", edgecolor='black', alpha=0.7, ax=ax)
-
-        # Adicionar valores das frequências
-        for p in ax.patches:
-            height = p.get_height()
-            if height > 0:
-                ax.text(p.get_x() + p.get_width() / 2, height + 5, f"{int(height)}",
-                        ha='center', va='bottom', fontsize=9)
-
-        ax.set_title(f'Histograma de {metrica}')
-        ax.set_xlabel(metrica)
-        ax.set_ylabel('Frequência')
-
-        plt.savefig(os.path.join(LOG_DIR, f'histograma_{metrica}.png'), dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-    # Ajustar layout e exibir gráficos agrupados
-    plt.tight_layout()
-    plt.show()
+    logging.info("🔗 Preparando histogramas das variáveis...")
+    histogramas = []
+    for metrica in metricas:
+        painel = preparar_histograma(df_metricas[metrica], f'Histograma de {metrica}', metrica)
+        histogramas.append(painel)
+        figuras.individual(f'histograma_{metrica}.png', painel)
+    figuras.composta('histogramas.png', histogramas, grade=(2, 4), tamanho=(15, 10))
 
     # BoxPlot específico para LOC
-    fig, ax = plt.subplots(figsize=(8, 6))
-    sns.boxplot(x=df_metricas["LOC"].dropna(), ax=ax)
-    ax.set_xscale("log")
-    ax.set_title("Boxplot de LOC (Escala Logarítmica)")
-    ax.set_xlabel("Linhas de Código (LOC) - Escala Log")
+    figuras.individual("boxplot_LOC.png", preparar_boxplot(
+        df_metricas["LOC"], "Boxplot de LOC (Escala Logarítmica)", "Linhas de Código (LOC) - Escala Log", escala_log=True
+    ))
 
-    plt.savefig(os.path.join(LOG_DIR, "boxplot_LOC.png"), dpi=300, bbox_inches="tight")
-    plt.show()
-
-    logging.info("✅ Histogramas gerados.\n")        
+    logging.info("✅ Histogramas preparados.\n")
 
     try:
         stats.to_csv(output_file)
@@ -153,333 +119,161 @@ def analisar_dados(input_file):
 
     return df_metricas
 
-def questao_pesquisa_01(df_metricas):
-    print("\nRQ 01. Qual a relação entre a popularidade dos repositórios e as suas características de qualidade?")
-
-    # Lista de métricas
-    metrics = ['CBO', 'DIT', 'LCOM']
-
-    # Criando um dicionário para armazenar os resultados
-    correlacao_results = []
-
-    # Criando uma figura para exibir os gráficos agrupados
-    plt.figure(figsize=(15, 12))
-
-    # Criando gráficos de dispersão com linha de tendência para cada métrica
-    for i, metric in enumerate(metrics, 1):
-        # Exibindo os gráficos agrupados na tela
-        plt.subplot(2, 2, i)
-        sns.regplot(data=df_metricas, x='Stars', y=metric, scatter_kws={'s': 100, 'alpha': 0.7}, line_kws={'color': 'red', 'lw': 2})
-        plt.title(f'Relação entre Popularidade (Stars) e {metric} com Linha de Tendência')
-        plt.xlabel('Stars (Popularidade)')
-        plt.ylabel(f'{metric}')
-        
-        # Salva cada gráfico individualmente
-        fig = plt.figure(figsize=(8, 6))
-        sns.regplot(data=df_metricas, x='Stars', y=metric, scatter_kws={'s': 100, 'alpha': 0.7}, line_kws={'color': 'red', 'lw': 2})
-        plt.title(f'Relação entre Popularidade (Stars) e {metric} com Linha de Tendência')
-        plt.xlabel('Stars (Popularidade)')
-        plt.ylabel(f'{metric}')
-        plt.savefig(os.path.join(LOG_DIR, f'popularidade_qualidade_{metric}.png'), dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-    # Exibe todos os gráficos agrupados na tela
-    plt.tight_layout()
-    plt.show()
-
-    print("\nGráficos salvos.")
-
-    # Teste de correlação para cada métrica (Spearman e Pearson)
-    for metric in metrics:
-        # Cálculo da correlação de Pearson
-        pearson_corr, pearson_p = pearsonr(df_metricas['Stars'], df_metricas[metric])
-        # Cálculo da correlação de Spearman
-        spearman_corr, spearman_p = spearmanr(df_metricas['Stars'], df_metricas[metric])
-        
-        # Armazenando os resultados no dicionário
-        correlacao_results.append({
-        'Metric': metric,
-        'Pearson_Coefficient': pearson_corr,
-        'Pearson_p-value': pearson_p,
-        'Spearman_Coefficient': spearman_corr,
-        'Spearman_p-value': spearman_p
-        })
-
-    # Convertendo o dicionário para um DataFrame do pandas
-    correlacao_df = pd.DataFrame(correlacao_results)
+# Configuração de cada questão de pesquisa: variável de processo comparada às métricas de qualidade
+QUESTOES_PESQUISA = {
+    "01": {
+        "pergunta": "Qual a relação entre a popularidade dos repositórios e as suas características de qualidade?",
+        "variavel": "Stars", "descricao": "Popularidade (Stars)", "rotulo_x": "Stars (Popularidade)",
+        "prefixo": "popularidade_qualidade",
+        "preditores": ["CBO", "DIT", "LCOM", "LOC", "Comments", "Maturity", "Release"]
+    },
+    "02": {
+        "pergunta": "Qual a relação entre a maturidade do repositórios e as suas características de qualidade ?",
+        "variavel": "Maturity", "descricao": "Maturidade", "rotulo_x": "Maturidade",
+        "prefixo": "maturidade_qualidade",
+        "preditores": ["CBO", "DIT", "LCOM", "LOC", "Comments", "Release", "Stars"]
+    },
+    "03": {
+        "pergunta": "Qual a relação entre a atividade dos repositórios e as suas características de qualidade?",
+        "variavel": "Release", "descricao": "Release", "rotulo_x": "Release",
+        "prefixo": "release_qualidade",
+        "preditores": ["CBO", "DIT", "LCOM", "LOC", "Comments", "Maturity", "Stars"]
+    },
+    "04": {
+        "pergunta": "Qual a relação entre o tamanho dos repositórios e as suas características de qualidade?",
+        "variavel": "LOC", "descricao": "Tamanho (LOC)", "rotulo_x": "LOC",
+        "prefixo": "loc_qualidade",
+        "preditores": ["CBO", "DIT", "LCOM", "Comments", "Maturity", "Release", "Stars"]
+    },
+}
+METRICAS_QUALIDADE = ['CBO', 'DIT', 'LCOM']
+
+def questao_pesquisa(df_metricas, numero, figuras):
+    questao = QUESTOES_PESQUISA[numero]
+    variavel = questao["variavel"]
+    print(f"\nRQ {numero}. {questao['pergunta']}")
+
+    # Gráficos de dispersão com linha de tendência: calculados uma vez, usados na figura individual e na agrupada
+    paineis = []
+    for metric in METRICAS_QUALIDADE:
+        painel = preparar_regressao(
+            df_metricas[variavel], df_metricas[metric],
+            f'Relação entre {questao["descricao"]} e {metric} com Linha de Tendência', questao["rotulo_x"], metric
+        )
+        paineis.append(painel)
+        figuras.individual(f'{questao["prefixo"]}_{metric}.png', painel)
+    figuras.composta(f'{questao["prefixo"]}.png', paineis, grade=(2, 2), tamanho=(15, 12))
+
+    # Teste de correlação para cada métrica (Spearman e Pearson), tirado das matrizes compartilhadas
+    correlacao_df = correlacoes_com(df_metricas, variavel, METRICAS_QUALIDADE)
+
+    # Intervalos de confiança (bootstrap) e p-valores de permutação para as mesmas correlações e para a regressão
+    ic_correlacoes, ic_coeficientes = bootstrap_questao(df_metricas, variavel, METRICAS_QUALIDADE, questao["preditores"])
+    correlacao_df = correlacao_df.merge(ic_correlacoes, on='Metric')
 
     # Exibindo a tabela no terminal
     logging.info("\n" + tabulate(correlacao_df, headers='keys', tablefmt='grid'))
 
     # Salvando o DataFrame em um arquivo CSV
-    correlacao_df.to_csv(os.path.join(LOG_DIR, 'correlacao_p_values_rq01.csv'), index=False)
+    arquivo_csv = f'correlacao_p_values_rq{numero}.csv'
+    correlacao_df.to_csv(os.path.join(LOG_DIR, arquivo_csv), index=False)
 
-    # Regressão linear mútilpla
-    X = df_metricas[["CBO", "DIT", "LCOM", "LOC", "Comments", "Maturity", "Release"]]
-    y = df_metricas["Stars"]
-
-    # Adicionar constante para regressão
-    X = sm.add_constant(X)
-
-    # Ajustar modelo
+    # Regressão linear múltipla
+    X = sm.add_constant(df_metricas[questao["preditores"]])
+    y = df_metricas[variavel]
     model = sm.OLS(y, X).fit()
-
-    # Exibir resumo estatístico
     print(model.summary())
 
-    logging.info("✅ Resultados de correlação salvos em 'correlacao_p_values_rq01.csv'.")
-
-
-def questao_pesquisa_02(df_metricas):        
-    print("\nRQ 02. Qual a relação entre a maturidade do repositórios e as suas características de qualidade ?")
-
-    # Lista de métricas
-    metrics = ['CBO', 'DIT', 'LCOM']
-
-    # Criando um dicionário para armazenar os resultados
-    correlacao_results = []
-
-    # Criando uma figura para exibir os gráficos agrupados
-    plt.figure(figsize=(15, 12))
-
-    # Criando gráficos de dispersão com linha de tendência para cada métrica
-    for i, metric in enumerate(metrics, 1):
-        # Exibindo os gráficos agrupados na tela
-        plt.subplot(2, 2, i)
-        sns.regplot(data=df_metricas, x='Maturity', y=metric, scatter_kws={'s': 100, 'alpha': 0.7}, line_kws={'color': 'red', 'lw': 2})
-        plt.title(f'Relação entre Maturidade e {metric} com Linha de Tendência')
-        plt.xlabel('Maturidade')
-        plt.ylabel(f'{metric}')
-        
-        # Salva cada gráfico individualmente
-        fig = plt.figure(figsize=(8, 6))
-        sns.regplot(data=df_metricas, x='Maturity', y=metric, scatter_kws={'s': 100, 'alpha': 0.7}, line_kws={'color': 'red', 'lw': 2})
-        plt.title(f'Relação entre Maturidade e {metric} com Linha de Tendência')
-        plt.xlabel('Maturidade')
-        plt.ylabel(f'{metric}')
-        plt.savefig(os.path.join(LOG_DIR, f'maturidade_qualidade_{metric}.png'), dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-    # Ajustar o layout para evitar sobreposição
-    plt.tight_layout()
-    plt.show()
-
-    print("\nGráficos salvos.")
-
-    # Teste de correlação para cada métrica (Spearman e Pearson)
-    for metric in metrics:
-        # Cálculo da correlação de Pearson
-        pearson_corr, pearson_p = pearsonr(df_metricas['Maturity'], df_metricas[metric])
-        # Cálculo da correlação de Spearman
-        spearman_corr, spearman_p = spearmanr(df_metricas['Maturity'], df_metricas[metric])
-        
-        # Armazenando os resultados no dicionário
-        correlacao_results.append({
-        'Metric': metric,
-        'Pearson_Coefficient': pearson_corr,
-        'Pearson_p-value': pearson_p,
-        'Spearman_Coefficient': spearman_corr,
-        'Spearman_p-value': spearman_p
-        })
-
-    # Convertendo o dicionário para um DataFrame do pandas
-    correlacao_df = pd.DataFrame(correlacao_results)
+    logging.info("🎲 Coeficientes com IC bootstrap:\n" + tabulate(ic_coeficientes, headers='keys', tablefmt='grid', showindex=False))
+    arquivo_regressao = f'regressao_bootstrap_rq{numero}.csv'
+    ic_coeficientes.to_csv(os.path.join(LOG_DIR, arquivo_regressao), index=False)
 
-    # Exibindo a tabela no terminal
-    logging.info("\n" + tabulate(correlacao_df, headers='keys', tablefmt='grid'))
+    logging.info(f"✅ Resultados de correlação salvos em '{arquivo_csv}' e '{arquivo_regressao}'.")
 
-    # Salvando o DataFrame em um arquivo CSV
-    correlacao_df.to_csv(os.path.join(LOG_DIR, 'correlacao_p_values_rq02.csv'), index=False)
 
-    # Regressão linear mútilpla
-    X = df_metricas[["CBO", "DIT", "LCOM", "LOC", "Comments", "Release", "Stars"]]
-    y = df_metricas["Maturity"]
-
-    # Adicionar constante para regressão
-    X = sm.add_constant(X)
-
-    # Ajustar modelo
-    model = sm.OLS(y, X).fit()
-
-    # Exibir resumo estatístico
-    print(model.summary())
-
-    logging.info("✅ Resultados de correlação salvos em 'correlacao_p_values_rq02.csv'.")
-
-
-def questao_pesquisa_03(df_metricas):        
-    print("\nRQ 03. Qual a relação entre a atividade dos repositórios e as suas características de qualidade?")
-
-    # Lista de métricas
-    metrics = ['CBO', 'DIT', 'LCOM']
-
-    # Criando um dicionário para armazenar os resultados
-    correlacao_results = []
-
-   # Criando uma figura para exibir os gráficos agrupados
-    plt.figure(figsize=(15, 12))
-
-    # Criando gráficos de dispersão com linha de tendência para cada métrica
-    for i, metric in enumerate(metrics, 1):
-        # Exibindo os gráficos agrupados na tela
-        plt.subplot(2, 2, i)
-        sns.regplot(data=df_metricas, x='Release', y=metric, scatter_kws={'s': 100, 'alpha': 0.7}, line_kws={'color': 'red', 'lw': 2})
-        plt.title(f'Relação entre Release e {metric} com Linha de Tendência')
-        plt.xlabel('Release')
-        plt.ylabel(f'{metric}')
-        
-        # Salva cada gráfico individualmente
-        fig = plt.figure(figsize=(8, 6))
-        sns.regplot(data=df_metricas, x='Release', y=metric, scatter_kws={'s': 100, 'alpha': 0.7}, line_kws={'color': 'red', 'lw': 2})
-        plt.title(f'Relação entre Release e {metric} com Linha de Tendência')
-        plt.xlabel('Release')
-        plt.ylabel(f'{metric}')
-        plt.savefig(os.path.join(LOG_DIR, f'release_qualidade_{metric}.png'), dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-    # Ajustar o layout para evitar sobreposição
-    plt.tight_layout()
-    plt.show()
-
-    print("\nGráficos salvos.")
-    
-    # Teste de correlação para cada métrica (Spearman e Pearson)
-    for metric in metrics:
-        # Cálculo da correlação de Pearson
-        pearson_corr, pearson_p = pearsonr(df_metricas['Release'], df_metricas[metric])
-        # Cálculo da correlação de Spearman
-        spearman_corr, spearman_p = spearmanr(df_metricas['Release'], df_metricas[metric])
-        
-        # Armazenando os resultados no dicionário
-        correlacao_results.append({
-        'Metric': metric,
-        'Pearson_Coefficient': pearson_corr,
-        'Pearson_p-value': pearson_p,
-        'Spearman_Coefficient': spearman_corr,
-        'Spearman_p-value': spearman_p
-        })
+def analisar_dados_fora_do_nucleo(entrada, figuras, colunas=METRICAS):
+    """
+    🌊 Versão de `analisar_dados` com memória limitada: a entrada é lida em lotes, em duas passadas.
 
-    # Convertendo o dicionário para um DataFrame do pandas
-    correlacao_df = pd.DataFrame(correlacao_results)
-
-    # Exibindo a tabela no terminal
-    logging.info("\n" + tabulate(correlacao_df, headers='keys', tablefmt='grid'))
-
-    # Salvando o DataFrame em um arquivo CSV
-    correlacao_df.to_csv(os.path.join(LOG_DIR, 'correlacao_p_values_rq03.csv'), index=False)
-
-    # Regressão linear mútilpla
-    X = df_metricas[["CBO", "DIT", "LCOM", "LOC", "Comments", "Maturity", "Stars"]]
-    y = df_metricas["Release"]
+    Gera as mesmas estatísticas descritivas, a matriz de Pearson e os histogramas (sem KDE). Para cada
+    RQ cujas colunas estejam presentes, grava a correlação de Pearson e registra os coeficientes OLS
+    (exatos, calculados pelos co-momentos). Spearman, dispersões e bootstrap exigem os dados em memória.
+    """
+    logging.info(f"🌊 Iniciando análise fora do núcleo de '{entrada}'...")
+    output_file = os.path.join(DATA_DIR, 'analise_metrica_ck.csv')
 
-    # Adicionar constante para regressão
-    X = sm.add_constant(X)
+    resumo, contagens = analisar_fora_do_nucleo(entrada, colunas)
+    if resumo.n == 0:
+        logging.warning("⚠️ Nenhum dado válido disponível após limpeza. Análise cancelada.")
+        return None
 
-    # Ajustar modelo
-    model = sm.OLS(y, X).fit()
+    stats = formatar_estatisticas(resumo.descricao())
+    logging.info("✅ Estatísticas calculadas com sucesso:\n" + tabulate(stats, headers='keys', tablefmt='grid'))
 
-    # Exibir resumo estatístico
-    print(model.summary())
+    correlacoes, p_valores = resumo.pearson()
+    logging.info("✅ Matriz de correlação calculada com sucesso:\n" + tabulate(correlacoes, headers='keys', tablefmt='grid'))
 
-    logging.info("✅ Resultados de correlação salvos em 'correlacao_p_values_rq03.csv'.")
-
-
-def questao_pesquisa_04(df_metricas):        
-    print("\nRQ 04. Qual a relação entre o tamanho dos repositórios e as suas características de qualidade?")
-
-    # Lista de métricas
-    metrics = ['CBO', 'DIT', 'LCOM']
-
-    # Criando um dicionário para armazenar os resultados
-    correlacao_results = []
-
-    # Criando uma figura para exibir os gráficos agrupados
-    plt.figure(figsize=(15, 12))
-
-    # Criando gráficos de dispersão com linha de tendência para cada métrica
-    for i, metric in enumerate(metrics, 1):
-        # Exibindo os gráficos agrupados na tela
-        plt.subplot(2, 2, i)
-        sns.regplot(data=df_metricas, x='LOC', y=metric, scatter_kws={'s': 100, 'alpha': 0.7}, line_kws={'color': 'red', 'lw': 2})
-        plt.title(f'Relação entre Tamanho (LOC) e {metric} com Linha de Tendência')
-        plt.xlabel('LOC')
-        plt.ylabel(f'{metric}')
-        
-        # Salva cada gráfico individualmente
-        fig = plt.figure(figsize=(8, 6))
-        sns.regplot(data=df_metricas, x='LOC', y=metric, scatter_kws={'s': 100, 'alpha': 0.7}, line_kws={'color': 'red', 'lw': 2})
-        plt.title(f'Relação entre Tamanho (LOC) e {metric} com Linha de Tendência')
-        plt.xlabel('LOC')
-        plt.ylabel(f'{metric}')
-        plt.savefig(os.path.join(LOG_DIR, f'loc_qualidade_{metric}.png'), dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-    # Ajustar o layout para evitar sobreposição
-    plt.tight_layout()
-    plt.show()
-
-    print("\nGráficos salvos.")
-
-    # Teste de correlação para cada métrica (Spearman e Pearson)
-    for metric in metrics:
-        # Cálculo da correlação de Pearson
-        pearson_corr, pearson_p = pearsonr(df_metricas['LOC'], df_metricas[metric])
-        # Cálculo da correlação de Spearman
-        spearman_corr, spearman_p = spearmanr(df_metricas['LOC'], df_metricas[metric])
-        
-        # Armazenando os resultados no dicionário
-        correlacao_results.append({
-        'Metric': metric,
-        'Pearson_Coefficient': pearson_corr,
-        'Pearson_p-value': pearson_p,
-        'Spearman_Coefficient': spearman_corr,
-        'Spearman_p-value': spearman_p
+    histogramas = []
+    for coluna in colunas:
+        painel = histograma_de_contagens(*contagens[coluna], f'Histograma de {coluna}', coluna)
+        histogramas.append(painel)
+        figuras.individual(f'histograma_{coluna}.png', painel)
+    figuras.composta('histogramas.png', histogramas, grade=(2, -(-len(colunas) // 2)), tamanho=(15, 10))
+
+    stats.to_csv(output_file)
+    logging.info(f"💾 Resultados estatísticos salvos no arquivo: {os.path.relpath(output_file, BASE_DIR)}")
+
+    for numero, questao in QUESTOES_PESQUISA.items():
+        variavel = questao["variavel"]
+        if not set([variavel, *METRICAS_QUALIDADE, *questao["preditores"]]) <= set(colunas):
+            continue
+        print(f"\nRQ {numero}. {questao['pergunta']}")
+        correlacao_df = pd.DataFrame({
+            'Metric': METRICAS_QUALIDADE,
+            'Pearson_Coefficient': correlacoes.loc[METRICAS_QUALIDADE, variavel].to_numpy(),
+            'Pearson_p-value': p_valores.loc[METRICAS_QUALIDADE, variavel].to_numpy(),
         })
+        logging.info("\n" + tabulate(correlacao_df, headers='keys', tablefmt='grid'))
+        arquivo_csv = f'correlacao_p_values_rq{numero}.csv'
+        correlacao_df.to_csv(os.path.join(LOG_DIR, arquivo_csv), index=False)
 
-    # Convertendo o dicionário para um DataFrame do pandas
-    correlacao_df = pd.DataFrame(correlacao_results)
+        coeficientes = resumo.regressao(variavel, questao["preditores"])
+        logging.info("📐 Coeficientes OLS:\n" + tabulate(coeficientes.to_frame('Coefficient'), headers='keys', tablefmt='grid'))
+        logging.info(f"✅ Resultados de correlação salvos em '{arquivo_csv}'.")
 
-    # Exibindo a tabela no terminal
-    logging.info("\n" + tabulate(correlacao_df, headers='keys', tablefmt='grid'))
+    return resumo
 
-    # Salvando o DataFrame em um arquivo CSV
-    correlacao_df.to_csv(os.path.join(LOG_DIR, 'correlacao_p_values_rq04.csv'), index=False)    
-
-    # Regressão linear mútilpla
-    X = df_metricas[["CBO", "DIT", "LCOM", "Comments", "Maturity", "Release", "Stars"]]
-    y = df_metricas["LOC"]
-
-    # Adicionar constante para regressão
-    X = sm.add_constant(X)
-
-    # Ajustar modelo
-    model = sm.OLS(y, X).fit()
-
-    # Exibir resumo estatístico
-    print(model.summary())
-
-    logging.info("✅ Resultados de correlação salvos em 'correlacao_p_values_rq04.csv'.")
-
-
-def main():
+def main(fora_do_nucleo=False, entrada=None, colunas=None):
     logging.info("===== 🚀 INICIANDO PROCESSO DE ANÁLISE =====")
     try:
+        if fora_do_nucleo:
+            entrada = entrada or verificar_arquivo_entrada()
+            if entrada:
+                figuras = Figuras(LOG_DIR)
+                analisar_dados_fora_do_nucleo(entrada, figuras, colunas or METRICAS)
+                figuras.renderizar()
+                print("\nGráficos salvos.")
+            else:
+                logging.info("ℹ️ Nenhum dado para analisar. Processo encerrado.")
+            logging.info("🎉 Processo de análise finalizado com sucesso!")
+            return
+
         input_file = verificar_arquivo_entrada()
         if input_file:
-            print("\n🔹 Analisando os dados e gerando resultados gerais...")
-            df = analisar_dados(input_file)
-
-            print("\nGerando resultados da RQ 01...")
-            questao_pesquisa_01(df)
+            figuras = Figuras(LOG_DIR)
 
-            print("\nGerando resultados da RQ 02...")
-            questao_pesquisa_02(df)
+            print("\n🔹 Analisando os dados e gerando resultados gerais...")
+            df = analisar_dados(input_file, figuras)
+            if df is None:
+                logging.info("ℹ️ Nenhum dado válido para as questões de pesquisa. Processo encerrado.")
+                return
 
-            print("\nGerando resultados da RQ 03...")
-            questao_pesquisa_03(df)
+            for numero in QUESTOES_PESQUISA:
+                print(f"\nGerando resultados da RQ {numero}...")
+                questao_pesquisa(df, numero, figuras)
 
-            print("\nGerando resultados da RQ 04...")
-            questao_pesquisa_04(df)
+            figuras.renderizar()
+            print("\nGráficos salvos.")
         else:
             logging.info("ℹ️ Nenhum dado para analisar. Processo encerrado.")
         logging.info("🎉 Processo de análise finalizado com sucesso!")
@@ -488,4 +282,12 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="📊 Análise das métricas CK e das questões de pesquisa")
+    parser.add_argument('--fora-do-nucleo', action='store_true',
+                        help="Lê a entrada em lotes, com memória limitada (sem Spearman, dispersões e bootstrap)")
+    parser.add_argument('--entrada', default=None,
+                        help="CSV, pasta Parquet ou tabela do CK ('class', 'method'...) para o modo fora do núcleo")
+    parser.add_argument('--colunas', nargs='+', default=None,
+                        help="Colunas analisadas no modo fora do núcleo (padrão: métricas do resultados_totais.csv)")
+    args = parser.parse_args()
+    main(fora_do_nucleo=args.fora_do_nucleo, entrada=args.entrada, colunas=args.colunas)
\ No newline at end of file
@@ -0,0 +1,147 @@
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+from scipy.stats import t as dist_t
+
+from agregador_ck import AgregadorColuna
+from armazenamento_ck import abrir_tabela
+from motor_figuras import bins_sturges
+
+# 🌊 Análise fora do núcleo (out-of-core).
+#
+# A entrada (CSV de resultados ou uma tabela do dataset Parquet do CK) é lida em lotes, só com
+# as colunas pedidas e com tipos fixos. Nada além de um lote fica em memória:
+#   - 1ª passada: estatísticas por coluna (média/variância de Chan, mín/máx, quartis pelo sketch
+#     do agregador_ck) e a matriz de co-momentos, que dá Pearson e os coeficientes OLS exatos;
+#   - 2ª passada: contagens dos histogramas, com bordas fixadas pelos mín/máx da 1ª passada.
+# O Spearman precisa dos postos globais e não entra neste modo.
+
+LINHAS_POR_LOTE = 256 * 1024
+QUANTIS_DESCRICAO = (0.25, 0.5, 0.75)
+# Mesmo tratamento do modo em memória: métricas do CK ausentes contam como 0
+COLUNAS_ZERO_SE_VAZIO = ("CBO", "DIT", "LCOM")
+
+def ler_lotes(entrada, colunas, linhas_por_lote=LINHAS_POR_LOTE):
+    """
+    Gera arrays (linhas x colunas) float64 só com as linhas completas.
+
+    `entrada` pode ser um CSV, uma pasta de arquivos Parquet ou o nome de uma tabela do CK
+    ("class", "method"...).
+    """
+    colunas = list(colunas)
+    if entrada.endswith(".csv"):
+        leitor = pacsv.open_csv(
+            entrada,
+            read_options=pacsv.ReadOptions(block_size=16 * 1024 * 1024),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=colunas,
+                column_types={coluna: pa.float64() for coluna in colunas},
+                null_values=["", "NaN", "nan"]
+            )
+        )
+        lotes = leitor
+    else:
+        dataset = ds.dataset(entrada, format="parquet", partitioning="hive") if os.path.isdir(entrada) else abrir_tabela(entrada)
+        lotes = dataset.to_batches(columns=colunas, batch_size=linhas_por_lote)
+
+    for lote in lotes:
+        if lote.num_rows == 0:
+            continue
+        matriz = np.column_stack([
+            lote.column(coluna).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+            for coluna in colunas
+        ])
+        for j, coluna in enumerate(colunas):
+            if coluna in COLUNAS_ZERO_SE_VAZIO:
+                matriz[np.isnan(matriz[:, j]), j] = 0.0
+        matriz = matriz[~np.isnan(matriz).any(axis=1)]
+        if len(matriz):
+            yield matriz
+
+class ResumoStreaming:
+    """Estatísticas por coluna e matriz de co-momentos combinadas lote a lote."""
+    def __init__(self, colunas):
+        self.colunas = list(colunas)
+        self.agregadores = [AgregadorColuna() for _ in self.colunas]
+        self.n = 0
+        self.media = np.zeros(len(self.colunas))
+        self.comomentos = np.zeros((len(self.colunas), len(self.colunas)))
+
+    def adicionar(self, lote):
+        for j, agregador in enumerate(self.agregadores):
+            agregador.adicionar(lote[:, j])
+
+        # Fórmula de Chan para a matriz: C = C_a + C_b + delta delta^T * n_a n_b / n
+        n_lote = len(lote)
+        media_lote = lote.mean(axis=0)
+        centrado = lote - media_lote
+        n_total = self.n + n_lote
+        delta = media_lote - self.media
+        self.comomentos += centrado.T @ centrado + np.outer(delta, delta) * self.n * n_lote / n_total
+        self.media += delta * n_lote / n_total
+        self.n = n_total
+
+    def descricao(self):
+        """Tabela no formato de `DataFrame.describe()`."""
+        linhas = {}
+        for coluna, agregador in zip(self.colunas, self.agregadores):
+            resumo = agregador.resumo(QUANTIS_DESCRICAO) or {}
+            linhas[coluna] = {
+                "count": resumo.get("count", 0), "mean": resumo.get("mean"), "std": resumo.get("std"),
+                "min": resumo.get("min"), "25%": resumo.get("p25"), "50%": resumo.get("p50"),
+                "75%": resumo.get("p75"), "max": resumo.get("max"),
+            }
+        return pd.DataFrame(linhas, dtype=np.float64)
+
+    def pearson(self):
+        """(correlações, p-valores) de Pearson entre todas as colunas."""
+        desvios = np.sqrt(np.diag(self.comomentos))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = np.clip(self.comomentos / np.outer(desvios, desvios), -1.0, 1.0)
+            estatistica = r * np.sqrt((self.n - 2) / (1 - r ** 2))
+        p = 2 * dist_t.sf(np.abs(estatistica), self.n - 2) if self.n > 2 else np.full_like(r, np.nan)
+        p[np.abs(r) == 1] = 0.0
+        quadro = lambda matriz: pd.DataFrame(matriz, index=self.colunas, columns=self.colunas)
+        return quadro(r), quadro(p)
+
+    def regressao(self, alvo, preditores):
+        """Coeficientes OLS (com constante) de `alvo` sobre `preditores`, a partir dos co-momentos."""
+        i = [self.colunas.index(coluna) for coluna in preditores]
+        k = self.colunas.index(alvo)
+        beta = np.linalg.pinv(self.comomentos[np.ix_(i, i)]) @ self.comomentos[i, k]
+        constante = self.media[k] - beta @ self.media[i]
+        return pd.Series([constante, *beta], index=["const", *preditores])
+
+def histogramas(entrada, colunas, resumo, linhas_por_lote=LINHAS_POR_LOTE):
+    """2ª passada: {coluna: (contagens, bordas)} com bins de Sturges entre o mínimo e o máximo."""
+    bordas = {}
+    for coluna, agregador in zip(colunas, resumo.agregadores):
+        minimo, maximo = (agregador.minimo, agregador.maximo) if agregador.n else (0.0, 1.0)
+        if minimo == maximo:
+            minimo, maximo = minimo - 0.5, maximo + 0.5
+        bordas[coluna] = np.linspace(minimo, maximo, bins_sturges(resumo.n) + 1)
+    contagens = {coluna: np.zeros(len(b) - 1, dtype=np.int64) for coluna, b in bordas.items()}
+
+    for lote in ler_lotes(entrada, colunas, linhas_por_lote):
+        for j, coluna in enumerate(colunas):
+            contagens[coluna] += np.histogram(lote[:, j], bins=bordas[coluna])[0]
+    return {coluna: (contagens[coluna], bordas[coluna]) for coluna in colunas}
+
+def analisar_fora_do_nucleo(entrada, colunas, linhas_por_lote=LINHAS_POR_LOTE):
+    """
+    🌊 Varre `entrada` em lotes e devolve o `ResumoStreaming` e os histogramas de `colunas`.
+    """
+    resumo = ResumoStreaming(colunas)
+    lotes = 0
+    for lote in ler_lotes(entrada, colunas, linhas_por_lote):
+        resumo.adicionar(lote)
+        lotes += 1
+    logging.info(f"🌊 1ª passada: {resumo.n} linhas válidas em {lotes} lote(s).")
+    contagens = histogramas(entrada, colunas, resumo, linhas_por_lote)
+    logging.info("🌊 2ª passada: histogramas calculados.")
+    return resumo, contagens
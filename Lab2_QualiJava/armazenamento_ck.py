@@ -0,0 +1,149 @@
+import os
+import shutil
+import logging
+import argparse
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'Data')
+DATASET_DIR = os.path.join(DATA_DIR, 'ck_dataset')
+
+# 🗄️ Saídas do CK num único dataset Parquet particionado por tabela e repositório:
+#   Data/ck_dataset/tabela=<class|method|field|variable>/repo=<nome>/part-0.parquet
+# Os tipos são fixados na leitura do CSV (sem inferência), então todas as partições têm o mesmo
+# esquema e consultas entre repositórios viram uma varredura colunar só.
+
+TABELAS_CK = ("class", "method", "field", "variable")
+COMPRESSAO = "zstd"
+
+COLUNAS_TEXTO = {"file", "class", "type", "method", "variable"}
+COLUNAS_BOOLEANAS = {"constructor", "hasJavaDoc"}
+
+PARTICIONAMENTO = ds.partitioning(pa.schema([("repo", pa.string())]), flavor="hive")
+
+def tipo_coluna_ck(coluna):
+    if coluna in COLUNAS_TEXTO:
+        return pa.string()
+    if coluna in COLUNAS_BOOLEANAS:
+        return pa.bool_()
+    # Métricas numéricas: float64 para todas, já que o CK escreve NaN em algumas (tcc, lcc, lcom*)
+    return pa.float64()
+
+def ler_csv_ck(caminho):
+    """Lê um CSV do CK com tipos explícitos, derivados do cabeçalho."""
+    with open(caminho, 'r', encoding='utf-8', errors='replace') as f:
+        cabecalho = f.readline().strip().split(',')
+    return pacsv.read_csv(
+        caminho,
+        convert_options=pacsv.ConvertOptions(
+            column_types={coluna: tipo_coluna_ck(coluna) for coluna in cabecalho},
+            true_values=["true"], false_values=["false"],
+            null_values=["", "NaN"], strings_can_be_null=False
+        )
+    )
+
+def pasta_particao(tabela, repo_name):
+    return os.path.join(DATASET_DIR, f"tabela={tabela}", f"repo={repo_name}")
+
+def ingerir_saida_ck(pasta_csv, repo_name):
+    """
+    📥 Converte os CSVs do CK de `pasta_csv` nas partições Parquet de `repo_name`.
+
+    Partições anteriores do repositório são substituídas. Retorna a lista das tabelas gravadas.
+    """
+    gravadas = []
+    for tabela in TABELAS_CK:
+        caminho = os.path.join(pasta_csv, f"{tabela}.csv")
+        if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+            continue
+
+        particao = pasta_particao(tabela, repo_name)
+        temporaria = particao + ".tmp"
+        shutil.rmtree(temporaria, ignore_errors=True)
+        os.makedirs(temporaria)
+        pq.write_table(ler_csv_ck(caminho), os.path.join(temporaria, "part-0.parquet"), compression=COMPRESSAO)
+
+        shutil.rmtree(particao, ignore_errors=True)
+        os.replace(temporaria, particao)
+        gravadas.append(tabela)
+    return gravadas
+
+def existe_particao(tabela, repo_name):
+    return os.path.exists(os.path.join(pasta_particao(tabela, repo_name), "part-0.parquet"))
+
+def ler_tabela_repo(tabela, repo_name, colunas=None):
+    """Lê as colunas pedidas da tabela de um repositório (ou None se ela não existir)."""
+    arquivo = os.path.join(pasta_particao(tabela, repo_name), "part-0.parquet")
+    if not os.path.exists(arquivo):
+        return None
+    if colunas is not None:
+        existentes = set(pq.read_schema(arquivo).names)
+        colunas = [coluna for coluna in colunas if coluna in existentes]
+    return pq.read_table(arquivo, columns=colunas)
+
+def abrir_tabela(tabela):
+    """Abre a tabela do CK de todos os repositórios como um dataset (a coluna `repo` vem da partição)."""
+    pasta = os.path.join(DATASET_DIR, f"tabela={tabela}")
+    if not os.path.isdir(pasta):
+        raise FileNotFoundError(f"📄 Nenhum dado do CK para a tabela '{tabela}' em {pasta}")
+    return ds.dataset(pasta, format="parquet", partitioning=PARTICIONAMENTO)
+
+def percentil_classes(coluna, q=0.9, loc_minimo=None, repos=None):
+    """
+    📈 Percentil `q` de uma métrica de classe em todos os repositórios.
+
+    Ex.: `percentil_classes("cbo", 0.9, loc_minimo=500)` → p90 de CBO das classes com LOC > 500.
+    """
+    filtro = None
+    if loc_minimo is not None:
+        filtro = ds.field("loc") > loc_minimo
+    if repos is not None:
+        filtro_repos = ds.field("repo").isin(list(repos))
+        filtro = filtro_repos if filtro is None else filtro & filtro_repos
+
+    valores = abrir_tabela("class").to_table(columns=[coluna], filter=filtro).column(coluna)
+    if len(valores) == 0:
+        return None
+    return pc.quantile(valores, q=q, skip_nulls=True)[0].as_py()
+
+def migrar_pastas_csv(remover=False):
+    """Ingere as pastas `Data/ck_output_<repo>` existentes no dataset Parquet."""
+    migrados = 0
+    for nome in sorted(os.listdir(DATA_DIR)):
+        pasta = os.path.join(DATA_DIR, nome)
+        if not nome.startswith("ck_output_") or not os.path.isdir(pasta):
+            continue
+        repo_name = nome[len("ck_output_"):]
+        if ingerir_saida_ck(pasta, repo_name):
+            migrados += 1
+            logging.info(f"📥 Ingerido: \033[92m{repo_name}\033[0m")
+            if remover:
+                shutil.rmtree(pasta)
+    logging.info(f"✅ {migrados} repositório(s) migrado(s) para {os.path.relpath(DATASET_DIR, BASE_DIR)}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)-8s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Dataset Parquet com as saídas do CK")
+    parser.add_argument("--migrar", action="store_true",
+                        help="Ingere as pastas Data/ck_output_<repo> existentes")
+    parser.add_argument("--remover-csv", action="store_true",
+                        help="Com --migrar, remove as pastas de CSV após a ingestão")
+    parser.add_argument("--coluna", default=None,
+                        help="Métrica de classe para calcular o percentil (ex.: cbo)")
+    parser.add_argument("--percentil", type=float, default=0.9,
+                        help="Percentil entre 0 e 1 (padrão: %(default)s)")
+    parser.add_argument("--loc-minimo", type=float, default=None,
+                        help="Considera apenas classes com LOC acima desse valor")
+    args = parser.parse_args()
+
+    if args.migrar:
+        migrar_pastas_csv(args.remover_csv)
+    if args.coluna:
+        valor = percentil_classes(args.coluna, args.percentil, args.loc_minimo)
+        print(f"p{args.percentil * 100:g} de {args.coluna}: {valor}")
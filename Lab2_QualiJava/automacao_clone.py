@@ -2,24 +2,31 @@ import os
 import csv
 import subprocess
 import logging
-import psutil
 import shutil
 import stat
 import time
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
 
 from config_token import configurar_token
+from escalonador import EscalonadorRecursos
 
 TOKEN = configurar_token()
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'Data')
 REPOS_LIST_FILE = os.path.join(DATA_DIR, 'repositorios_list.csv')
+MANIFESTO_HEADS_FILE = os.path.join(DATA_DIR, 'repos_head_manifest.json')
 
 REPOS_DIR = os.path.join(BASE_DIR, 'Repos')
+# Repositório bare compartilhado; fica fora de Repos/ para não ser contado como um clone
+ESPELHO_DIR = os.path.join(BASE_DIR, '.espelho_git', 'objetos.git')
 LOG_DIR = os.path.join(BASE_DIR, "Relatórios")
 LOG_FILE = os.path.join(LOG_DIR, "automacao_clone.log")
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -41,17 +48,32 @@ log_error = logging.error
 MEMORY_THRESHOLD_MB = 500
 DISK_THRESHOLD_MB = 1024
 MAX_RETRIES = 5
-
-def recursos_suficientes():
-    mem = psutil.virtual_memory()
-    disk = psutil.disk_usage(REPOS_DIR)
-    if mem.available / (1024 * 1024) < MEMORY_THRESHOLD_MB:
-        logging.error("🛑 Memória insuficiente")
-        return False
-    if disk.free / (1024 * 1024) < DISK_THRESHOLD_MB:
-        logging.error("🛑 Espaço em disco insuficiente")
-        return False
-    return True
+MAX_WORKERS_LS_REMOTE = 16
+LS_REMOTE_TIMEOUT = 60
+
+# 🧬 Estratégias de clonagem: o CK e a contagem de LOC só precisam dos arquivos .java atuais
+#   completo  -> histórico completo (comportamento original)
+#   raso      -> apenas o último commit (--depth 1) da branch padrão
+#   esparso   -> último commit, sem blobs (--filter=blob:none) e checkout esparso só de *.java
+#   ref_unica -> histórico completo, mas apenas da branch padrão e sem tags
+MODOS_CLONE = ("completo", "raso", "esparso", "ref_unica")
+MODO_CLONE = os.environ.get("LAB2_MODO_CLONE", "completo")
+
+# 🪞 Espelho de objetos compartilhado: antes de clonar, os objetos do repositório são buscados
+# (fetch incremental) para um único repositório bare, e o clone usa --reference para ele.
+# Re-clones só transferem objetos novos e forks com histórico em comum dividem o armazenamento.
+# Vale para os modos com histórico completo; raso/esparso já transferem quase nada.
+USAR_ESPELHO = os.environ.get("LAB2_ESPELHO_GIT", "1") == "1"
+MODOS_COM_ESPELHO = ("completo", "ref_unica")
+
+_espelho_lock = threading.Lock()
+_locks_espelho_repo = {}
+
+def criar_escalonador(liberar_disco=None):
+    return EscalonadorRecursos(
+        REPOS_DIR, liberar_disco,
+        memoria_critica_mb=MEMORY_THRESHOLD_MB, disco_critico_mb=DISK_THRESHOLD_MB
+    )
 
 def remove_readonly(func, path, excinfo):
     os.chmod(path, stat.S_IWRITE)
@@ -70,7 +92,227 @@ def fetch_and_compare(repo_path):
     except subprocess.CalledProcessError:
         return False
 
-def clonar_repositorios():
+def montar_comandos_clone(repo_url, repo_path, modo=MODO_CLONE, referencia=None):
+    opcoes_referencia = ['--reference', referencia] if referencia else []
+    if modo == "completo":
+        return [['git', 'clone', '--progress', *opcoes_referencia, repo_url, repo_path]]
+    if modo == "raso":
+        return [['git', 'clone', '--progress', '--depth', '1', '--single-branch', '--no-tags', repo_url, repo_path]]
+    if modo == "ref_unica":
+        return [['git', 'clone', '--progress', '--single-branch', '--no-tags', *opcoes_referencia, repo_url, repo_path]]
+    if modo == "esparso":
+        return [
+            ['git', 'clone', '--progress', '--filter=blob:none', '--no-checkout', '--depth', '1',
+             '--single-branch', '--no-tags', repo_url, repo_path],
+            ['git', '-C', repo_path, 'sparse-checkout', 'set', '--no-cone', '*.java'],
+            # O checkout respeita o padrão esparso e busca sob demanda apenas os blobs *.java
+            ['git', '-C', repo_path, 'checkout'],
+        ]
+    raise ValueError(f"Modo de clonagem inválido: {modo}. Opções: {', '.join(MODOS_CLONE)}")
+
+def tamanho_diretorio(path):
+    total = 0
+    try:
+        with os.scandir(path) as entradas:
+            for entrada in entradas:
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        total += tamanho_diretorio(entrada.path)
+                    else:
+                        total += entrada.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        return 0
+    return total
+
+def formatar_bytes(num_bytes):
+    valor = float(num_bytes)
+    for unidade in ("B", "KiB", "MiB"):
+        if valor < 1024:
+            return f"{valor:.1f} {unidade}"
+        valor /= 1024
+    return f"{valor:.1f} GiB"
+
+def inicializar_espelho():
+    with _espelho_lock:
+        if os.path.exists(os.path.join(ESPELHO_DIR, 'HEAD')):
+            return True
+        os.makedirs(ESPELHO_DIR, exist_ok=True)
+        result = subprocess.run(['git', 'init', '--bare', '--quiet', ESPELHO_DIR], capture_output=True, text=True)
+        if result.returncode != 0:
+            logging.warning(f"⚠️ Não foi possível criar o espelho de objetos: {result.stderr.strip()}")
+            return False
+        # Vários fetches podem rodar em paralelo: nada de gc automático no meio deles
+        subprocess.run(['git', '-C', ESPELHO_DIR, 'config', 'gc.auto', '0'], capture_output=True)
+        return True
+
+def atualizar_espelho(repo_name, repo_url):
+    """
+    🪞 Busca no espelho compartilhado os objetos da branch padrão do repositório.
+
+    O fetch é incremental (só objetos que o espelho ainda não tem) e grava a ref em
+    refs/espelhos/<repo>, o que também impede o git de descartar esses objetos. Fetches do
+    mesmo repositório são serializados; repositórios diferentes podem buscar em paralelo.
+
+    Retorna (caminho do espelho, bytes buscados), ou (None, 0) se não foi possível atualizá-lo.
+    Os bytes buscados são o crescimento de objects/ do espelho durante o fetch; com fetches de
+    outros repositórios rodando ao mesmo tempo, o que eles gravarem nesse intervalo também entra.
+    """
+    if not inicializar_espelho():
+        return None, 0
+    with _espelho_lock:
+        lock_repo = _locks_espelho_repo.setdefault(repo_name, threading.Lock())
+    objetos_espelho = os.path.join(ESPELHO_DIR, 'objects')
+    with lock_repo:
+        tamanho_antes = tamanho_diretorio(objetos_espelho)
+        result = subprocess.run(
+            ['git', '-C', ESPELHO_DIR, '-c', 'gc.auto=0', 'fetch', '--quiet', '--no-tags',
+             repo_url, f'+HEAD:refs/espelhos/{repo_name}'],
+            capture_output=True, text=True
+        )
+        bytes_buscados = max(tamanho_diretorio(objetos_espelho) - tamanho_antes, 0)
+    if result.returncode != 0:
+        logging.warning(f"⚠️ Falha ao atualizar o espelho para {repo_name}. Clonando sem ele: {result.stderr.strip()}")
+        return None, 0
+    return ESPELHO_DIR, bytes_buscados
+
+def executar_clone(repo_url, repo_path, modo=MODO_CLONE):
+    """
+    🧬 Executa os comandos git da estratégia escolhida e mede o custo da clonagem.
+
+    Retorna (result, bytes_transferidos, bytes_em_disco). Como o clone é feito do zero, tudo
+    que está em .git/objects chegou pela rede (packs recebidos, inclusive os blobs buscados
+    sob demanda pelo modo esparso), então esse tamanho entra nos bytes transferidos. Com o
+    espelho, o clone só recebe o que o espelho não tem: a transferência real acontece no fetch
+    do espelho, e o que ele trouxe é somado aos bytes transferidos.
+    """
+    referencia, bytes_espelho = None, 0
+    if USAR_ESPELHO and modo in MODOS_COM_ESPELHO:
+        referencia, bytes_espelho = atualizar_espelho(os.path.basename(repo_path), repo_url)
+
+    result = None
+    for comando in montar_comandos_clone(repo_url, repo_path, modo, referencia):
+        result = subprocess.run(comando, capture_output=True, text=True)
+        if result.returncode != 0:
+            return result, bytes_espelho, 0
+
+    bytes_transferidos = bytes_espelho + tamanho_diretorio(os.path.join(repo_path, '.git', 'objects'))
+    bytes_em_disco = tamanho_diretorio(repo_path)
+    return result, bytes_transferidos, bytes_em_disco
+
+def clonar_repositorio(repo_url, repo_name, repo_path, padding, modo=MODO_CLONE):
+    attempt = 0
+    while attempt < MAX_RETRIES:
+        try:
+            logging.info(f"{padding} 🔄 Clonando {repo_name} (modo: {modo})...")
+            result, bytes_transferidos, bytes_em_disco = executar_clone(repo_url, repo_path, modo)
+
+            if result.returncode != 0:
+                logging.error(f"{padding} ❌ Erro ao clonar {repo_name}: {result.stderr.strip()}")
+                if os.path.exists(repo_path):
+                    shutil.rmtree(repo_path, onexc=remove_readonly)
+                attempt += 1
+                time.sleep(5)
+                continue
+            time.sleep(10)
+
+            if not os.path.exists(os.path.join(repo_path, '.git')):
+                logging.warning(f"{padding} ⚠️ {repo_name} clonado mas .git não encontrado. Tentando novamente...")
+                shutil.rmtree(repo_path, onexc=remove_readonly)
+                attempt += 1
+                time.sleep(5)
+                continue
+
+            logging.info(f"{padding} 📦 Transferido: {formatar_bytes(bytes_transferidos)} | 💾 Em disco: {formatar_bytes(bytes_em_disco)}")
+            return True
+
+        except subprocess.CalledProcessError:
+            attempt += 1
+            logging.warning(f"{padding} ⚠️ Erro ao clonar, tentativa {attempt}/{MAX_RETRIES}")
+            time.sleep(10)
+
+    return False
+
+def carregar_manifesto_heads():
+    if not os.path.exists(MANIFESTO_HEADS_FILE):
+        return {}
+    try:
+        with open(MANIFESTO_HEADS_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        logging.warning("⚠️ Manifesto de HEADs corrompido. Será reconstruído.")
+        return {}
+
+def salvar_manifesto_heads(manifesto):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    temp_file = MANIFESTO_HEADS_FILE + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+    os.replace(temp_file, MANIFESTO_HEADS_FILE)
+
+def obter_head_local(repo_path):
+    try:
+        return subprocess.check_output(['git', '-C', repo_path, 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).strip().decode()
+    except subprocess.CalledProcessError:
+        return None
+
+def obter_head_remoto(repo_url):
+    try:
+        saida = subprocess.check_output(['git', 'ls-remote', repo_url, 'HEAD'], stderr=subprocess.DEVNULL, timeout=LS_REMOTE_TIMEOUT)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+    linha = saida.decode().split('\n', 1)[0].strip()
+    return linha.split()[0] if linha else None
+
+def registrar_head(manifesto, repo_name, repo_url, repo_path, pushed_at=None):
+    sha = obter_head_local(repo_path)
+    if sha:
+        manifesto[repo_name] = {"url": repo_url, "sha": sha, "pushed_at": pushed_at}
+
+def verificar_atualizacoes(repos, manifesto):
+    """
+    🔎 Decide quais clones existentes estão atualizados sem executar `git fetch`.
+
+    `repos` é uma lista de tuplas (repo_name, repo_url, repo_path, pushed_at). Primeiro compara o
+    `pushed_at` da API com o registrado no manifesto (sem rede); para os demais, compara o SHA
+    do HEAD local (manifesto ou `rev-parse`) com `git ls-remote`, executados em paralelo.
+
+    Retorna {repo_name: True (atualizado) | False (desatualizado) | None (não foi possível verificar)}.
+    """
+    estados = {}
+    pendentes = []
+    for repo_name, repo_url, repo_path, pushed_at in repos:
+        if not repositorio_clonado_completo(repo_path):
+            estados[repo_name] = False
+            continue
+        registro = manifesto.get(repo_name)
+        if registro and pushed_at and registro.get("pushed_at") == pushed_at:
+            estados[repo_name] = True
+            continue
+        pendentes.append((repo_name, repo_url, repo_path, pushed_at))
+
+    def comparar(item):
+        repo_name, repo_url, repo_path, pushed_at = item
+        registro = manifesto.get(repo_name) or {}
+        head_local = registro.get("sha") or obter_head_local(repo_path)
+        head_remoto = obter_head_remoto(repo_url)
+        if head_local is None or head_remoto is None:
+            return item, None, head_local
+        return item, head_local == head_remoto, head_local
+
+    if pendentes:
+        logging.info(f"🔎 Consultando HEAD remoto de {len(pendentes)} repositórios via git ls-remote ({MAX_WORKERS_LS_REMOTE} em paralelo)...")
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS_LS_REMOTE) as executor:
+            for (repo_name, repo_url, _, pushed_at), estado, head_local in executor.map(comparar, pendentes):
+                estados[repo_name] = estado
+                # Confirmados como atualizados passam a usar o pushed_at atual como atalho
+                if estado:
+                    manifesto[repo_name] = {"url": repo_url, "sha": head_local, "pushed_at": pushed_at}
+
+    return estados
+
+def clonar_repositorios(modo=MODO_CLONE):
     if not os.path.exists(REPOS_LIST_FILE):
         raise FileNotFoundError(f"📄 Lista de repositórios não encontrada: {REPOS_LIST_FILE}")
 
@@ -82,6 +324,19 @@ def clonar_repositorios():
 
     total_repos = len(repositorios_raw)
     cloned_count = 0
+    escalonador = criar_escalonador()
+
+    manifesto = carregar_manifesto_heads()
+    existentes = []
+    for row in repositorios_raw:
+        repo_url = row[0].strip()
+        repo_name = repo_url.split('/')[-1].replace('.git', '')
+        repo_path = os.path.join(REPOS_DIR, repo_name)
+        if os.path.exists(repo_path):
+            pushed_at = row[4].strip() if len(row) > 4 else None
+            existentes.append((repo_name, repo_url, repo_path, pushed_at))
+    estados = verificar_atualizacoes(existentes, manifesto)
+    salvar_manifesto_heads(manifesto)
 
     for idx, row in enumerate(repositorios_raw, start=1):
         if not row:
@@ -90,6 +345,7 @@ def clonar_repositorios():
         repo_url = row[0].strip()
         repo_name = repo_url.split('/')[-1].replace('.git', '')
         repo_path = os.path.join(REPOS_DIR, repo_name)
+        pushed_at = row[4].strip() if len(row) > 4 else None
 
         idx_display = f"{idx:02}"
         log_prefix = f"({idx_display}/{total_repos})"
@@ -99,51 +355,30 @@ def clonar_repositorios():
 
         if os.path.exists(repo_path):
             logging.info(f"{padding} 🔎 Verificando se o repositório \033[35m{repo_name}\033[0m está atualizado...")
-            if repositorio_clonado_completo(repo_path) and fetch_and_compare(repo_path):
+            atualizado = estados.get(repo_name)
+            if atualizado is None:
+                # ls-remote falhou: recorre ao fetch completo antes de descartar o clone
+                atualizado = repositorio_clonado_completo(repo_path) and fetch_and_compare(repo_path)
+            if atualizado:
                 logging.info(f"{padding} ✅ \033[35m{repo_name}\033[0m está atualizado e não será re-clonado.")
                 continue
             else:
                 logging.warning(f"{padding} ⚠️ \033[35m{repo_name}\033[0m está incompleto ou desatualizado. Excluindo e re-clonando...")
                 shutil.rmtree(repo_path, onexc=remove_readonly)
 
-        if not recursos_suficientes():
-            logging.error(f"{padding} 🛑 Recursos insuficientes! Encerrando... ({idx_display}/{total_repos})")
+        # Com pouca memória/disco, espera os recursos voltarem em vez de abortar a execução
+        if not escalonador.aguardar_recursos():
+            logging.error(f"{padding} 🛑 Recursos insuficientes por tempo demais! Encerrando... ({idx_display}/{total_repos})")
             break
 
-        attempt = 0
-        success = False
-        while attempt < MAX_RETRIES:
-            try:
-                logging.info(f"{padding} 🔄 Clonando {repo_name}...")
-                result = subprocess.run(['git', 'clone', repo_url, repo_path], capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    logging.error(f"{padding} ❌ Erro ao clonar {repo_name}: {result.stderr.strip()}")
-                    attempt += 1
-                    time.sleep(5)
-                    continue
-                time.sleep(10)
-
-                if not os.path.exists(os.path.join(repo_path, '.git')):
-                    logging.warning(f"{padding} ⚠️ {repo_name} clonado mas .git não encontrado. Tentando novamente...")
-                    shutil.rmtree(repo_path, onexc=remove_readonly)
-                    attempt += 1
-                    time.sleep(5)
-                    continue
-
-                # Se chegou aqui, clone foi bem-sucedido
-                success = True
-                break
-
-            except subprocess.CalledProcessError:
-                attempt += 1
-                logging.warning(f"{padding} ⚠️ Erro ao clonar, tentativa {attempt}/{MAX_RETRIES}")
-                time.sleep(10)
+        success = clonar_repositorio(repo_url, repo_name, repo_path, padding, modo)
 
         if not success:
             logging.error(f"{padding} ❌ Falha ao clonar \033[35m{repo_name}\033[0m após {MAX_RETRIES} tentativas.")
         else:
             cloned_count += 1
+            registrar_head(manifesto, repo_name, repo_url, repo_path, pushed_at)
+            salvar_manifesto_heads(manifesto)
             logging.info(f"{padding} ✅ Clonado com sucesso: \033[35m{repo_name}\033[0m (Total: {cloned_count})")
 
 def contar_repositorios_clonados():
@@ -210,11 +445,14 @@ def verificar_pastas_inconsistentes():
         logging.info("✅ Nenhuma pasta faltando. Todas as listadas foram encontradas na pasta 'Repos'.")
         return []
 
-def clonar_faltantes(faltantes):
+def clonar_faltantes(faltantes, modo=MODO_CLONE):
     with open(REPOS_LIST_FILE, newline='', encoding='utf-8') as csvfile:
         csv_reader = csv.reader(csvfile)
         next(csv_reader, None)  # pula cabeçalho
-        repo_urls = {row[0].strip().split('/')[-1].replace('.git', ''): row[0].strip() for row in csv_reader if row}
+        linhas = [row for row in csv_reader if row]
+    repo_urls = {row[0].strip().split('/')[-1].replace('.git', ''): row[0].strip() for row in linhas}
+    repo_pushed_at = {row[0].strip().split('/')[-1].replace('.git', ''): (row[4].strip() if len(row) > 4 else None) for row in linhas}
+    manifesto = carregar_manifesto_heads()
 
     for repo_name in faltantes:
         repo_url = repo_urls.get(repo_name)
@@ -223,19 +461,31 @@ def clonar_faltantes(faltantes):
             continue
 
         repo_path = os.path.join(REPOS_DIR, repo_name)
-        logging.info(f"🔄 Re-clonando faltante: {repo_name}...")
-        result = subprocess.run(['git', 'clone', repo_url, repo_path], capture_output=True, text=True)
+        logging.info(f"🔄 Re-clonando faltante: {repo_name} (modo: {modo})...")
+        result, bytes_transferidos, bytes_em_disco = executar_clone(repo_url, repo_path, modo)
         if result.returncode != 0:
             logging.error(f"❌ Erro ao clonar {repo_name}: {result.stderr.strip()}")
         else:
-            logging.info(f"✅ Repositório {repo_name} clonado com sucesso.")
+            registrar_head(manifesto, repo_name, repo_url, repo_path, repo_pushed_at.get(repo_name))
+            salvar_manifesto_heads(manifesto)
+            logging.info(f"✅ Repositório {repo_name} clonado com sucesso. "
+                         f"📦 Transferido: {formatar_bytes(bytes_transferidos)} | 💾 Em disco: {formatar_bytes(bytes_em_disco)}")
 
 
 if __name__ == "__main__":
-    logging.info("🚀 Iniciando o processo de clonagem dos repositórios...\n")
+    parser = argparse.ArgumentParser(description="Clonagem automatizada dos repositórios Java")
+    parser.add_argument("--modo-clone", choices=MODOS_CLONE, default=MODO_CLONE,
+                        help="Estratégia de clonagem (padrão: %(default)s)")
+    parser.add_argument("--sem-espelho", action="store_true",
+                        help="Não usa o espelho de objetos compartilhado (equivale a LAB2_ESPELHO_GIT=0)")
+    args = parser.parse_args()
+    if args.sem_espelho:
+        USAR_ESPELHO = False
+
+    logging.info(f"🚀 Iniciando o processo de clonagem dos repositórios (modo: {args.modo_clone})...\n")
 
     # Etapa 1 - Clonagem inicial
-    clonar_repositorios()
+    clonar_repositorios(args.modo_clone)
 
     # Etapa 2 - Verifica se há repositórios faltantes
     logging.info("\n🔎 Verificando inconsistências e repositórios faltantes...")
@@ -244,7 +494,7 @@ if __name__ == "__main__":
     # Etapa 3 - Tenta clonar os faltantes (se houver)
     if faltantes:
         logging.info(f"🔄 Tentando clonar os repositórios faltantes ({len(faltantes)} repositórios)...")
-        clonar_faltantes(faltantes)
+        clonar_faltantes(faltantes, args.modo_clone)
     else:
         logging.info("✅ Nenhum repositório faltante. Tudo certo até aqui!")
 
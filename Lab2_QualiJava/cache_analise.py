@@ -0,0 +1,193 @@
+import os
+import json
+import hashlib
+import sqlite3
+import subprocess
+import threading
+
+from contador_loc import VERSAO_CONTADOR, contar_arquivos, contar_arquivos_por_arquivo, contar_loc_comentarios
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'Data')
+CACHE_DB = os.path.join(DATA_DIR, 'cache_analise.sqlite')
+CK_JAR = os.path.join(BASE_DIR, 'ck.jar')
+
+# 🗃️ Cache endereçado por conteúdo:
+#   - resultados do CK por SHA da árvore (tree) do HEAD: repositório inalterado não roda CK de novo;
+#   - LOC/comentários por SHA do blob de cada .java: só arquivos novos ou alterados são relidos.
+# As chaves incluem a "versão" da ferramenta (hash do ck.jar / VERSAO_CONTADOR), então trocar o
+# ck.jar ou a regra de contagem invalida o cache automaticamente.
+
+LOTE_CONSULTA = 500
+
+_conexao = None
+_lock = threading.Lock()
+_versao_ck = None
+
+def _obter_conexao():
+    global _conexao
+    if _conexao is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        _conexao = sqlite3.connect(CACHE_DB, check_same_thread=False)
+        _conexao.execute("PRAGMA journal_mode=WAL")
+        _conexao.execute("""
+            CREATE TABLE IF NOT EXISTS ck_cache (
+                versao TEXT NOT NULL, tree_sha TEXT NOT NULL,
+                cbo REAL, dit REAL, lcom REAL, estatisticas TEXT,
+                PRIMARY KEY (versao, tree_sha)
+            )""")
+        # Caches criados antes do resumo detalhado não têm a coluna de estatísticas
+        colunas = {linha[1] for linha in _conexao.execute("PRAGMA table_info(ck_cache)")}
+        if "estatisticas" not in colunas:
+            _conexao.execute("ALTER TABLE ck_cache ADD COLUMN estatisticas TEXT")
+        _conexao.execute("""
+            CREATE TABLE IF NOT EXISTS loc_cache (
+                versao INTEGER NOT NULL, blob_sha TEXT NOT NULL,
+                loc INTEGER NOT NULL, comentarios INTEGER NOT NULL,
+                PRIMARY KEY (versao, blob_sha)
+            )""")
+        _conexao.commit()
+    return _conexao
+
+def versao_ck():
+    global _versao_ck
+    if _versao_ck is None:
+        sha = hashlib.sha1()
+        if os.path.exists(CK_JAR):
+            with open(CK_JAR, 'rb') as f:
+                for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(bloco)
+        _versao_ck = sha.hexdigest()
+    return _versao_ck
+
+def obter_tree_sha(repo_path):
+    try:
+        return subprocess.check_output(
+            ['git', '-C', repo_path, 'rev-parse', 'HEAD^{tree}'], stderr=subprocess.DEVNULL
+        ).strip().decode()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+def obter_head_sha(repo_path):
+    try:
+        return subprocess.check_output(
+            ['git', '-C', repo_path, 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL
+        ).strip().decode()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+def listar_blobs_java(repo_path):
+    """Retorna {caminho_absoluto: blob_sha} dos .java no índice do git, ou None se não for um repositório git."""
+    try:
+        saida = subprocess.check_output(
+            ['git', '-C', repo_path, 'ls-files', '-s', '-z', '--', '*.java'], stderr=subprocess.DEVNULL
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+    blobs = {}
+    for entrada in saida.split(b'\0'):
+        if not entrada:
+            continue
+        # Formato: "<modo> <sha> <estágio>\t<caminho>"
+        cabecalho, caminho = entrada.split(b'\t', 1)
+        modo, sha, _ = cabecalho.split(b' ')
+        if modo == b'120000':  # link simbólico
+            continue
+        caminho_abs = os.path.join(repo_path, os.fsdecode(caminho))
+        if os.path.isfile(caminho_abs):
+            blobs[caminho_abs] = sha.decode()
+    return blobs
+
+def listar_java_fora_do_indice(repo_path):
+    """
+    Caminhos absolutos dos .java que não estão no índice do git (não rastreados ou ignorados, como
+    fontes gerados). Não têm blob SHA, então são contados sem cache.
+    """
+    try:
+        saida = subprocess.check_output(
+            ['git', '-C', repo_path, 'ls-files', '-o', '-z', '--', '*.java'], stderr=subprocess.DEVNULL
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return []
+    caminhos = (os.path.join(repo_path, os.fsdecode(caminho)) for caminho in saida.split(b'\0') if caminho)
+    return [caminho for caminho in caminhos if os.path.isfile(caminho) and not os.path.islink(caminho)]
+
+def buscar_ck(tree_sha):
+    """Retorna (cbo, dit, lcom, estatisticas) em cache para a árvore, ou None. `estatisticas` pode ser None."""
+    with _lock:
+        linha = _obter_conexao().execute(
+            "SELECT cbo, dit, lcom, estatisticas FROM ck_cache WHERE versao = ? AND tree_sha = ?", (versao_ck(), tree_sha)
+        ).fetchone()
+    if linha is None:
+        return None
+    cbo, dit, lcom, estatisticas = linha
+    return cbo, dit, lcom, json.loads(estatisticas) if estatisticas else None
+
+def salvar_ck(tree_sha, cbo, dit, lcom, estatisticas=None):
+    with _lock:
+        conexao = _obter_conexao()
+        conexao.execute(
+            "INSERT OR REPLACE INTO ck_cache (versao, tree_sha, cbo, dit, lcom, estatisticas) VALUES (?, ?, ?, ?, ?, ?)",
+            (versao_ck(), tree_sha, cbo, dit, lcom, json.dumps(estatisticas) if estatisticas is not None else None)
+        )
+        conexao.commit()
+
+def _buscar_loc(shas):
+    encontrados = {}
+    shas = list(shas)
+    with _lock:
+        conexao = _obter_conexao()
+        for i in range(0, len(shas), LOTE_CONSULTA):
+            lote = shas[i:i + LOTE_CONSULTA]
+            marcadores = ",".join("?" * len(lote))
+            for sha, loc, comentarios in conexao.execute(
+                f"SELECT blob_sha, loc, comentarios FROM loc_cache WHERE versao = ? AND blob_sha IN ({marcadores})",
+                (VERSAO_CONTADOR, *lote)
+            ):
+                encontrados[sha] = (loc, comentarios)
+    return encontrados
+
+def _salvar_loc(contagens):
+    with _lock:
+        conexao = _obter_conexao()
+        conexao.executemany(
+            "INSERT OR REPLACE INTO loc_cache (versao, blob_sha, loc, comentarios) VALUES (?, ?, ?, ?)",
+            [(VERSAO_CONTADOR, sha, loc, comentarios) for sha, (loc, comentarios) in contagens.items()]
+        )
+        conexao.commit()
+
+def contar_loc_com_cache(repo_path):
+    """
+    📑 Conta LOC e comentários reaproveitando as contagens de blobs já vistos.
+
+    Cobre os mesmos arquivos da varredura completa: os .java do índice (com cache) e os que estão
+    fora dele, como fontes gerados (sempre relidos). Retorna (loc, comentarios, arquivos_relidos).
+    Fora de um repositório git, faz a varredura completa.
+    """
+    blobs = listar_blobs_java(repo_path)
+    if blobs is None:
+        loc, comentarios = contar_loc_comentarios(repo_path)
+        return loc, comentarios, None
+
+    conhecidos = _buscar_loc(set(blobs.values()))
+    novos = {}
+    for caminho, sha in blobs.items():
+        if sha not in conhecidos and sha not in novos:
+            novos[sha] = caminho
+
+    if novos:
+        contagens = contar_arquivos_por_arquivo(list(novos.values()))
+        novas_contagens = dict(zip(novos.keys(), contagens))
+        _salvar_loc(novas_contagens)
+        conhecidos.update(novas_contagens)
+
+    loc = sum(conhecidos[sha][0] for sha in blobs.values())
+    comentarios = sum(conhecidos[sha][1] for sha in blobs.values())
+
+    fora_do_indice = listar_java_fora_do_indice(repo_path)
+    if fora_do_indice:
+        loc_fora, comentarios_fora = contar_arquivos(fora_do_indice)
+        loc += loc_fora
+        comentarios += comentarios_fora
+    return loc, comentarios, len(novos) + len(fora_do_indice)
@@ -72,7 +72,7 @@ def buscar_repositorios_open_source():
         for repo in items:
             repo_full_name = repo['full_name']
             releases_count = get_releases_count(repo_full_name)
-            repositorios.append((repo['clone_url'], repo['created_at'], repo['stargazers_count'], releases_count))
+            repositorios.append((repo['clone_url'], repo['created_at'], repo['stargazers_count'], releases_count, repo['pushed_at']))
 
         if len(items) < 100:
             logging.info("📉 Menos de 100 resultados obtidos, encerrando busca antecipadamente.")
@@ -90,9 +90,9 @@ def salvar_repositorios_list_csv(repos):
             output_dir = DATA_DIR
             relative_output_dir = os.path.relpath(output_dir, BASE_DIR)
             writer = csv.writer(csv_file)
-            writer.writerow(["clone_url", "created_at", "stars", "releases"])
-            for repo_url, created_at, stars, releases in repos:
-                writer.writerow([repo_url, created_at, stars, releases])
+            writer.writerow(["clone_url", "created_at", "stars", "releases", "pushed_at"])
+            for repo_url, created_at, stars, releases, pushed_at in repos:
+                writer.writerow([repo_url, created_at, stars, releases, pushed_at])
         logging.info(f"✅ CSV salvo com sucesso em '{relative_output_dir}' ({len(repos)} registros).")
     except Exception as e:
         logging.error(f"❌ Falha ao salvar CSV: {e}")
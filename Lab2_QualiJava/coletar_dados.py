@@ -1,9 +1,15 @@
 import os
+import json
 import subprocess
 import pandas as pd
 import logging
 import time
 import shutil
+import queue
+import argparse
+import threading
+import psutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import sys
@@ -11,6 +17,11 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
 
 from config_token import configurar_token
+from servidor_ck import ServidorCK, compilar_servidor_ck
+from escalonador import EscalonadorRecursos
+from armazenamento_ck import ingerir_saida_ck, existe_particao, pasta_particao
+from agregador_ck import agregar_saida_ck, medias_principais
+from cache_analise import obter_tree_sha, obter_head_sha, buscar_ck, salvar_ck, contar_loc_com_cache
 
 TOKEN = configurar_token()
 
@@ -21,6 +32,9 @@ DATA_DIR = os.path.join(BASE_DIR, 'Data')
 REPOS_DIR = os.path.abspath(os.path.join(BASE_DIR, 'Repos'))
 REPOS_LIST_FILE = os.path.join(DATA_DIR, 'repositorios_list.csv')
 CK_JAR = os.path.join(BASE_DIR, 'ck.jar')
+RESULTADOS_FILE = os.path.join(DATA_DIR, 'resultados_totais.csv')
+METRICAS_DETALHADAS_FILE = os.path.join(DATA_DIR, 'metricas_ck_detalhadas.csv')
+JOURNAL_FILE = os.path.join(DATA_DIR, 'journal_coleta.jsonl')
 
 LOG_DIR = os.path.join(script_dir, "Relatórios")
 LOG_FILE = os.path.join(LOG_DIR, "coletar_dados.log")
@@ -37,20 +51,144 @@ logging.basicConfig(
 
 CK_TIMEOUT = 300
 
-def run_ck(repo_path, output_dir, idx_display, total_repos):
+# 🧵 Pool de workers do CK: cada worker roda numa pasta temporária própria, com heap e
+# quantidade de threads da JVM limitadas para que vários CKs caibam na máquina ao mesmo tempo.
+CK_HEAP_MB = 2048
+CK_JVM_OVERHEAD_MB = 256
+CK_THREADS_POR_WORKER = 2
+# Quantidade fixa de workers (mesmo efeito de --workers-ck); sem ela (ou com 0), vem de núcleos e
+# memória. Lida só em calcular_workers_ck: um valor inválido vira aviso, e não erro na importação.
+CK_WORKERS = os.environ.get("LAB2_CK_WORKERS", "").strip()
+# ☕ Mantém uma JVM do CK aquecida por worker em vez de abrir um "java -jar" por repositório
+USAR_JVM_PERSISTENTE = os.environ.get("LAB2_CK_JVM_PERSISTENTE", "1") == "1"
+# 💨 Pastas temporárias do CK em memória (tmpfs), quando houver espaço; senão, em Data/
+USAR_TMPFS = os.environ.get("LAB2_CK_TMPFS", "1") == "1"
+TMPFS_DIR = os.path.join("/dev/shm", "lab2_ck")
+# Espaço reservado no tmpfs por worker (CSVs do CK de um repositório grande)
+SCRATCH_RESERVA_MB = 512
+
+def workers_ck_configurados():
+    """Valor de LAB2_CK_WORKERS, ou None se ausente, 0 ou inválido."""
+    if not CK_WORKERS:
+        return None
+    try:
+        workers = int(CK_WORKERS)
+    except ValueError:
+        workers = -1
+    if workers < 0:
+        logging.warning(f"⚠️ LAB2_CK_WORKERS inválido ({CK_WORKERS!r}): use um inteiro positivo. "
+                        f"Calculando os workers a partir de CPU e memória.")
+        return None
+    return workers or None
+
+def calcular_workers_ck():
+    configurados = workers_ck_configurados()
+    if configurados:
+        return configurados
+    nucleos = os.cpu_count() or 1
+    memoria_livre_mb = psutil.virtual_memory().available / (1024 * 1024)
+    por_cpu = max(1, nucleos // CK_THREADS_POR_WORKER)
+    por_memoria = max(1, int(memoria_livre_mb * 0.8) // (CK_HEAP_MB + CK_JVM_OVERHEAD_MB))
+    return min(por_cpu, por_memoria)
+
+def montar_jvm_args_ck():
+    return [f'-Xmx{CK_HEAP_MB}m', f'-XX:ActiveProcessorCount={CK_THREADS_POR_WORKER}']
+
+def tmpfs_livre_mb():
+    try:
+        return shutil.disk_usage(os.path.dirname(TMPFS_DIR)).free / (1024 * 1024)
+    except OSError:
+        return 0
+
+def pasta_scratch_disco(indice):
+    return os.path.join(DATA_DIR, f"temp_ck_{indice}")
+
+def pasta_fallback_disco(pasta):
+    """Pasta em Data/ usada por um worker do tmpfs quando ele enche ou uma tentativa falha lá."""
+    return pasta_scratch_disco(os.path.basename(pasta)) if pasta.startswith(TMPFS_DIR) else None
+
+def criar_sandboxes_ck(quantidade):
+    """
+    🧵 Cria as vagas dos workers do CK: cada uma é uma tupla (pasta_temporaria, servidor_ck).
+    O servidor é None quando a JVM persistente está desativada ou não pôde ser compilada.
+
+    Com `USAR_TMPFS`, as pastas ficam em /dev/shm enquanto couberem `SCRATCH_RESERVA_MB` por
+    worker; as demais ficam em Data/.
+    """
+    usar_servidor = USAR_JVM_PERSISTENTE and compilar_servidor_ck(CK_JAR)
+    em_memoria = min(quantidade, int(tmpfs_livre_mb() // SCRATCH_RESERVA_MB)) if USAR_TMPFS else 0
+    if USAR_TMPFS:
+        logging.info(f"💨 Pastas temporárias do CK em memória: {em_memoria} de {quantidade} (reserva de {SCRATCH_RESERVA_MB} MB cada)")
+
+    sandboxes = queue.Queue()
+    for i in range(quantidade):
+        servidor = ServidorCK(CK_JAR, montar_jvm_args_ck(), CK_TIMEOUT) if usar_servidor else None
+        pasta = os.path.join(TMPFS_DIR, f"worker_{i}") if i < em_memoria else pasta_scratch_disco(i)
+        sandboxes.put((pasta, servidor))
+    return sandboxes
+
+def encerrar_sandboxes_ck(sandboxes):
+    while not sandboxes.empty():
+        pasta, servidor = sandboxes.get()
+        if servidor is not None:
+            servidor.encerrar()
+        shutil.rmtree(pasta, ignore_errors=True)
+        fallback = pasta_fallback_disco(pasta)
+        if fallback:
+            shutil.rmtree(fallback, ignore_errors=True)
+    # Libera a memória ocupada pelas pastas em tmpfs
+    if os.path.isdir(TMPFS_DIR) and not os.listdir(TMPFS_DIR):
+        os.rmdir(TMPFS_DIR)
+
+def limpar_pasta_scratch(pasta):
+    # Esvazia a pasta em vez de recriá-la a cada tentativa
+    if not os.path.isdir(pasta):
+        return
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if entrada.is_dir(follow_symlinks=False):
+                shutil.rmtree(entrada.path, ignore_errors=True)
+            else:
+                os.remove(entrada.path)
+
+def escolher_pasta_scratch(temp_ck_dir):
+    """Volta para o disco se a pasta está no tmpfs e ele não tem mais a folga reservada."""
+    if temp_ck_dir.startswith(TMPFS_DIR) and tmpfs_livre_mb() < SCRATCH_RESERVA_MB:
+        fallback = pasta_fallback_disco(temp_ck_dir)
+        logging.warning(f"⚠️ tmpfs quase cheio ({tmpfs_livre_mb():.0f} MB livres). Usando {os.path.relpath(fallback, BASE_DIR)}")
+        return fallback
+    return temp_ck_dir
+
+def montar_comando_ck(repo_path):
+    return ['java', *montar_jvm_args_ck(), '-jar', CK_JAR, repo_path, "true", "0", "true"]
+
+def run_ck(repo_path, repo_name, idx_display, total_repos, temp_ck_dir=None, servidor=None):
+    """
+    🔨 Executa o CK e ingere os CSVs gerados direto da pasta temporária no dataset Parquet.
+
+    Se uma tentativa falhar numa pasta em tmpfs (ex.: sem espaço), a seguinte usa o disco.
+    """
+    temp_ck_dir = escolher_pasta_scratch(temp_ck_dir or os.path.join(DATA_DIR, "temp_ck"))
     tentativa = 0
     while tentativa < 2:
-        temp_ck_dir = os.path.join(DATA_DIR, "temp_ck")
         os.makedirs(temp_ck_dir, exist_ok=True)
-        os.makedirs(output_dir, exist_ok=True)
-
-        command = ['java', '-jar', CK_JAR, repo_path, "true", "0", "true"]
+        limpar_pasta_scratch(temp_ck_dir)
 
         try:
-            subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=CK_TIMEOUT, cwd=temp_ck_dir)
+            if servidor is not None:
+                if not servidor.analisar(repo_path, temp_ck_dir):
+                    logging.warning(f"⚠️ Servidor CK falhou em {repo_path}.")
+                    tentativa += 1
+                    continue
+            else:
+                command = montar_comando_ck(repo_path)
+                subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=CK_TIMEOUT, cwd=temp_ck_dir)
+        except RuntimeError as e:
+            logging.warning(f"⚠️ {e} Executando o CK com uma JVM dedicada...")
+            servidor = None
+            continue
         except subprocess.TimeoutExpired:
             logging.warning(f"⏰ Timeout ao executar CK em {repo_path}.")
-            shutil.rmtree(temp_ck_dir, ignore_errors=True)
             tentativa += 1
             continue
 
@@ -62,13 +200,12 @@ def run_ck(repo_path, output_dir, idx_display, total_repos):
 
         logging.info(f"{padding} 📊 Coletando métricas CK (CBO, DIT, LCOM)...")
 
+        tamanho_saida = 0
         for file_name in expected_files:
-            src = os.path.join(temp_ck_dir, file_name)  # <-- ALTERADO
-            dst = os.path.join(output_dir, file_name)
-
+            src = os.path.join(temp_ck_dir, file_name)
 
             if os.path.exists(src) and os.path.getsize(src) > 0:
-                shutil.move(src, dst)
+                tamanho_saida += os.path.getsize(src)
                 if file_name == "class.csv":
                     logging.info(f"{padding}   📄 \033[92mclass.csv\033[0m - Métricas por classe.")
                 elif file_name == "field.csv":
@@ -81,67 +218,216 @@ def run_ck(repo_path, output_dir, idx_display, total_repos):
                 logging.error(f"{padding} ❌ Arquivo faltando ou vazio: {file_name} | Repositório: {repo_path}")
                 missing_files.append(file_name)
 
-        shutil.rmtree(temp_ck_dir, ignore_errors=True)
-
         if missing_files:
+            limpar_pasta_scratch(temp_ck_dir)
             if tentativa == 0:
                 logging.warning(f"{padding} ⚠️ CK gerou arquivos faltando. Tentando rodar novamente...")
+                temp_ck_dir = pasta_fallback_disco(temp_ck_dir) or temp_ck_dir
                 tentativa += 1
                 continue
             else:
                 return False
 
-        relative_output_dir = os.path.relpath(output_dir, BASE_DIR)
-        logging.info(f"{padding} ✅ CK executado com sucesso. Arquivos salvos na pasta {relative_output_dir}")
+        # Os CSVs viram partições Parquet sem passar por uma pasta intermediária em Data/
+        ingerir_saida_ck(temp_ck_dir, repo_name)
+        limpar_pasta_scratch(temp_ck_dir)
+
+        logging.info(f"{padding} ✅ CK executado com sucesso. Saída ({tamanho_saida / (1024 * 1024):.1f} MB) "
+                     f"ingerida em {os.path.relpath(pasta_particao('class', repo_name), BASE_DIR)}")
         return True
-    
+
     return False
 
 
-def parse_ck_output(output_dir):
-    class_csv = os.path.join(output_dir, "class.csv")
-    if not os.path.exists(class_csv) or os.path.getsize(class_csv) == 0:
-        return None, None, None
-    df = pd.read_csv(class_csv)
-    return (
-        df["cbo"].mean() if "cbo" in df.columns else None,
-        df["dit"].mean() if "dit" in df.columns else None,
-        df["lcom"].mean() if "lcom" in df.columns else None
-    )
+def parse_ck_output(repo_name):
+    # Uma passada pelas tabelas de classe e método gera o resumo completo; as médias vêm dele
+    estatisticas = agregar_saida_ck(repo_name)
+    cbo, dit, lcom = medias_principais(estatisticas)
+    return cbo, dit, lcom, estatisticas
 
 def count_loc_comments(repo_path):
-    loc = comentarios = 0
-    for root, _, files in os.walk(repo_path):
-        for file in files:
-            if file.endswith('.java'):
-                with open(os.path.join(root, file), 'r', encoding='utf-8', errors='ignore') as f:
-                    in_block = False
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            loc += 1
-                            if line.startswith("//") or in_block:
-                                comentarios += 1
-                            if "/*" in line:
-                                comentarios += 1
-                                in_block = True
-                            if "*/" in line:
-                                in_block = False
+    loc, comentarios, _ = contar_loc_com_cache(repo_path)
     return loc, comentarios
 
 def calcular_maturidade(created_at_str):
     created_date = datetime.strptime(created_at_str[:10], "%Y-%m-%d")
     return round((datetime.today() - created_date).days / 365.25, 2)
 
-def coletar_dados():
+def coletar_metricas_repositorio(repo_name, repo_url, repo_path, created_at, stars, release, idx_display, total_repos, temp_ck_dir=None, servidor_ck=None):
+    log_prefix = f"({idx_display}/{total_repos})"
+    padding = ' ' * len(log_prefix)
+
+    # Mesmo conteúdo (tree do HEAD) → mesmas métricas: só roda o CK se a árvore mudou
+    tree_sha = obter_tree_sha(repo_path)
+    em_cache = buscar_ck(tree_sha) if tree_sha else None
+
+    if em_cache is not None:
+        logging.info(f"{padding} ♻️ CK em cache para \033[92m{repo_name}\033[0m (tree {tree_sha[:10]})")
+        cbo, dit, lcom, estatisticas = em_cache
+        if estatisticas is None and existe_particao("class", repo_name):
+            # Entrada gravada antes do resumo detalhado: completa a partir do dataset
+            _, _, _, estatisticas = parse_ck_output(repo_name)
+            salvar_ck(tree_sha, cbo, dit, lcom, estatisticas)
+    else:
+        logging.info(f"{padding} 🔨 Executando análise CK...")
+        success = run_ck(repo_path, repo_name, idx_display, total_repos, temp_ck_dir, servidor_ck)
+
+        if not success:
+            logging.error(f"{padding} ❌ CK falhou ou arquivos faltando para \033[92m{repo_name}\033[0m. Pulando...")
+            return None
+
+        cbo, dit, lcom, estatisticas = parse_ck_output(repo_name)
+        if tree_sha:
+            salvar_ck(tree_sha, cbo, dit, lcom, estatisticas)
+
+    logging.info(f"{padding} 📑 Contando Linhas de Código (LOC) e Comentários...")
+    loc, comentarios, relidos = contar_loc_com_cache(repo_path)
+    if relidos is not None:
+        logging.info(f"{padding} 📑 LOC: {relidos} arquivo(s) novo(s) ou alterado(s) contado(s); demais vieram do cache")
+
+    logging.info(f"{padding} 📅 Calculando Maturidade do Projeto...")
+    maturidade = calcular_maturidade(created_at)
+
+    return {
+        "repo_name": repo_name,
+        "Stars": stars,
+        "clone_url": repo_url,
+        "Release": release,
+        "CBO": cbo,
+        "DIT": dit,
+        "LCOM": lcom,
+        "LOC": loc,
+        "Comments": comentarios,
+        "Maturity": maturidade,
+        "estatisticas_ck": estatisticas or [],
+        # Versão analisada: o journal só reaproveita o resultado enquanto ela não mudar
+        "tree_sha": tree_sha,
+        "head_sha": obter_head_sha(repo_path)
+    }
+
+def _valor_json(valor):
+    # Números do numpy/pandas (ex.: estrelas lidas do CSV) viram tipos nativos
+    return valor.item() if hasattr(valor, "item") else str(valor)
+
+class JournalColeta:
+    """
+    📓 Diário append-only dos repositórios já coletados (um JSON por linha).
+
+    Cada resultado é gravado e sincronizado com o disco assim que o repositório termina, então
+    uma execução interrompida pode ser retomada pulando o que já está no diário. Cada entrada
+    guarda o SHA da árvore e o commit analisados: se o clone mudou, o repositório é coletado de
+    novo. A tabela final é materializada a partir dele, na ordem da lista de repositórios.
+
+    :param reiniciar: descarta o diário existente e começa do zero.
+    """
+    def __init__(self, caminho=JOURNAL_FILE, reiniciar=False):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        if reiniciar and os.path.exists(caminho):
+            os.remove(caminho)
+        self._descartar_linha_incompleta()
+        self.resultados = self._carregar()
+
+    def _descartar_linha_incompleta(self):
+        # Sem isso, o próximo registro seria anexado à linha cortada e também se perderia
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, 'rb+') as f:
+            conteudo = f.read()
+            if conteudo and not conteudo.endswith(b'\n'):
+                f.truncate(conteudo.rfind(b'\n') + 1)
+
+    def _carregar(self):
+        resultados = {}
+        if not os.path.exists(self.caminho):
+            return resultados
+        with open(self.caminho, encoding='utf-8') as f:
+            for numero, linha in enumerate(f, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    resultado = json.loads(linha)
+                except json.JSONDecodeError:
+                    # Tipicamente a última linha, cortada por uma queda no meio da escrita
+                    logging.warning(f"⚠️ Linha {numero} do journal ilegível. Ignorando...")
+                    continue
+                resultados[resultado["repo_name"]] = resultado
+        return resultados
+
+    def concluido(self, repo_name, tree_sha=None, head_sha=None):
+        """
+        True se o diário tem o repositório na mesma versão: mesmo SHA da árvore do clone ou, sem
+        clone local, mesmo commit (ex.: HEAD remoto). Sem versão para comparar, não está concluído.
+        """
+        resultado = self.resultados.get(repo_name)
+        if resultado is None:
+            return False
+        if tree_sha is not None:
+            return resultado.get("tree_sha") == tree_sha
+        if head_sha is not None:
+            return resultado.get("head_sha") == head_sha
+        return False
+
+    def registrar(self, resultado):
+        linha = json.dumps(resultado, ensure_ascii=False, default=_valor_json)
+        with self._lock:
+            with open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.resultados[resultado["repo_name"]] = resultado
+            return len(self.resultados)
+
+    def materializar(self, df_repos):
+        """Retorna {idx: resultado} dos repositórios da lista presentes no diário."""
+        resultados = {}
+        for idx, row in df_repos.iterrows():
+            repo_name = row["clone_url"].strip().split('/')[-1].replace('.git', '')
+            if repo_name in self.resultados:
+                # A maturidade depende da data de hoje, não da versão analisada
+                resultados[idx] = {**self.resultados[repo_name], "Maturity": calcular_maturidade(row["created_at"].strip())}
+        return resultados
+
+def salvar_resultados(resultados):
+    """
+    💾 Grava os resultados na ordem da lista de repositórios.
+
+    `resultados_totais.csv` mantém uma linha por repositório; o resumo detalhado do CK
+    (uma linha por repositório/tabela/métrica) vai para `metricas_ck_detalhadas.csv`.
+    """
+    linhas, detalhes = [], []
+    for idx in sorted(resultados):
+        resultado = dict(resultados[idx])
+        resultado.pop("tree_sha", None)
+        resultado.pop("head_sha", None)
+        for estatistica in resultado.pop("estatisticas_ck", None) or []:
+            detalhes.append({"repo_name": resultado["repo_name"], **estatistica})
+        linhas.append(resultado)
+
+    pd.DataFrame(linhas).to_csv(RESULTADOS_FILE, index=False)
+    pd.DataFrame(detalhes).to_csv(METRICAS_DETALHADAS_FILE, index=False)
+
+def coletar_dados(workers=None, reiniciar=False):
     logging.info("===== 📥 INICIANDO COLETA DE DADOS =====")
     inicio = time.time()
 
     df_repos = pd.read_csv(REPOS_LIST_FILE)
     total_repos = len(df_repos)
-    resultados, contador = [], 0
+    journal = JournalColeta(reiniciar=reiniciar)
+    if journal.resultados:
+        logging.info(f"📓 Journal com {len(journal.resultados)} repositório(s) já coletado(s). Os que não mudaram serão pulados.")
 
-    for idx, row in df_repos.iterrows():
+    workers = workers or calcular_workers_ck()
+    sandboxes = criar_sandboxes_ck(workers)
+    logging.info(f"🧵 Executando CK com {workers} worker(s) | Heap por JVM: {CK_HEAP_MB} MB | Threads por JVM: {CK_THREADS_POR_WORKER}")
+
+    # Sob pressão de memória/CPU, menos CKs rodam ao mesmo tempo (ou nenhum, até haver folga)
+    escalonador = EscalonadorRecursos(REPOS_DIR)
+    # O CK já é dimensionado para ocupar a CPU: só memória o reduz
+    controle_ck = escalonador.controle("Análise CK", workers, consome_cpu=False)
+
+    def processar(idx, row):
         repo_url, created_at = row["clone_url"].strip(), row["created_at"].strip()
         stars = row.get("stars", 0)
         release = row.get("releases", 0)
@@ -152,57 +438,50 @@ def coletar_dados():
         log_prefix = f"({idx_display}/{total_repos})"
         padding = ' ' * len(log_prefix)
 
-        logging.info(f"{log_prefix} \033[4m\033[96m📂 Processando: \033[1m{repo_name}\033[0m")
-
         if not os.path.exists(repo_path):
-            logging.warning(f"{padding} 📁 Diretório não encontrado: \033[92m{repo_name}\033[0m. Pulando...")
-            continue
-
-        ck_output_dir = os.path.join(DATA_DIR, f"ck_output_{repo_name}")
-        os.makedirs(ck_output_dir, exist_ok=True)
-
-
-        if os.path.exists(ck_output_dir):
-            logging.info(f"{padding} ♻️ Removendo saída anterior do CK para \033[92m{repo_name}\033[0m")
-            shutil.rmtree(ck_output_dir)
-
-        os.makedirs(ck_output_dir, exist_ok=True)
-
-        logging.info(f"{padding} 🔨 Executando análise CK...")
-        success = run_ck(repo_path, ck_output_dir, idx_display, total_repos)
-
-        if not success:
-            logging.error(f"{padding} ❌ CK falhou ou arquivos faltando para \033[92m{repo_name}\033[0m. Pulando...")
-            continue
-
-        cbo, dit, lcom = parse_ck_output(ck_output_dir)
+            if repo_name in journal.resultados:
+                # Sem clone não há como verificar a versão nem recoletar: vale o que está no journal
+                logging.warning(f"{log_prefix} 📁 Clone ausente: \033[92m{repo_name}\033[0m. Mantendo o resultado do journal.")
+            else:
+                logging.warning(f"{log_prefix} 📁 Diretório não encontrado: \033[92m{repo_name}\033[0m. Pulando...")
+            return
 
-        logging.info(f"{padding} 📑 Contando Linhas de Código (LOC) e Comentários...")
-        loc, comentarios = count_loc_comments(repo_path)
+        if journal.concluido(repo_name, tree_sha=obter_tree_sha(repo_path)):
+            logging.info(f"{log_prefix} ⏭️ Já coletado (journal, mesma versão): \033[92m{repo_name}\033[0m")
+            return
 
-        logging.info(f"{padding} 📅 Calculando Maturidade do Projeto...")
-        maturidade = calcular_maturidade(created_at)
+        logging.info(f"{log_prefix} \033[4m\033[96m📂 Processando: \033[1m{repo_name}\033[0m")
 
-        contador += 1
+        controle_ck.adquirir()
+        temp_ck_dir, servidor_ck = sandboxes.get()
+        try:
+            resultado = coletar_metricas_repositorio(repo_name, repo_url, repo_path, created_at, stars, release, idx_display, total_repos, temp_ck_dir, servidor_ck)
+        except Exception as e:
+            logging.error(f"{padding} ❌ Erro ao coletar dados de \033[92m{repo_name}\033[0m: {e}")
+            return
+        finally:
+            sandboxes.put((temp_ck_dir, servidor_ck))
+            controle_ck.liberar()
+
+        if resultado is None:
+            return
+
+        contador = journal.registrar(resultado)
         logging.info(f"{padding} ✅ Dados coletados: \033[92m{repo_name}\033[0m (Total: {contador})")
 
-        resultados.append({
-            "repo_name": repo_name,
-            "Stars": stars,
-            "clone_url": repo_url,
-            "Release": release,
-            "CBO": cbo,
-            "DIT": dit,
-            "LCOM": lcom,
-            "LOC": loc,
-            "Comments": comentarios,
-            "Maturity": maturidade
-        })
-
-    pd.DataFrame(resultados).to_csv(os.path.join(DATA_DIR, "resultados_totais.csv"), index=False)
+    try:
+        with escalonador, ThreadPoolExecutor(max_workers=workers) as executor:
+            for idx, row in df_repos.iterrows():
+                executor.submit(processar, idx, row)
+    finally:
+        encerrar_sandboxes_ck(sandboxes)
+
+    resultados = journal.materializar(df_repos)
+    contador = len(resultados)
+    salvar_resultados(resultados)
 
     fim = time.time()
-    logging.info(f"🎯 Coleta finalizada! Total coletado: {contador} de {total_repos}")
+    logging.info(f"🎯 Coleta finalizada em {fim - inicio:.0f}s! Total coletado: {contador} de {total_repos}")
 
     if contador < total_repos:
         logging.warning(f"⚠️ Apenas {contador} repositórios coletados. Esperado: {total_repos}")
@@ -211,4 +490,11 @@ def coletar_dados():
         logging.info(f"✅ Todos os {total_repos} repositórios coletados com sucesso!")
 
 if __name__ == "__main__":
-    coletar_dados()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Coleta de métricas CK, LOC e maturidade")
+    parser.add_argument("--workers-ck", type=int, default=None,
+                        help="Quantidade de CKs em paralelo (padrão: calculado a partir de CPU e memória)")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Ignora o journal e coleta todos os repositórios novamente")
+    args = parser.parse_args()
+
+    coletar_dados(args.workers_ck, args.reiniciar)
@@ -0,0 +1,136 @@
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# 📑 Scanner de LOC/comentários para arquivos Java.
+#
+# Os arquivos são lidos inteiros como bytes e percorridos por uma única regex
+# compilada. Cada casamento consome o código até o próximo comentário — pulando text blocks,
+# strings e literais de char — e captura o comentário. Assim "//" ou "/*" dentro de literais
+# não abrem comentários, e "/* ... */" numa mesma linha fecha corretamente.
+
+TOKENS_JAVA = re.compile(
+    rb'(?P<codigo>(?:[^"\'/]++'                 # código comum
+    rb'|"""(?:\\.|[^\\])*?"""'                   # text block (Java 15+)
+    rb'|"(?:\\.|[^"\\\n])*+"'                   # string
+    rb"|'(?:\\.|[^'\\\n])*+'"                   # char
+    rb'|/(?![/*])'                              # divisão
+    rb'|["\'])*+)'                              # aspas sem fechamento
+    rb'(?:(?P<linha>//[^\n]*+)'                 # comentário de linha
+    rb'|(?P<bloco>/\*.*?(?:\*/|\Z))'             # comentário de bloco (até o fim se não fechar)
+    rb'|\Z)',
+    re.DOTALL
+)
+ESPACOS = b' \t\f\r\v'
+
+ARQUIVOS_POR_LOTE = 256
+PROCESSOS_LOC = os.cpu_count() or 1
+# Incrementar quando a regra de contagem mudar, para invalidar resultados em cache
+VERSAO_CONTADOR = 1
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def contar_conteudo(dados):
+    """
+    Conta (loc, comentarios) de um conteúdo Java em bytes.
+
+    `loc` são as linhas não vazias; `comentarios` são as linhas não vazias que contêm algum
+    trecho de comentário (mesmo que também tenham código).
+    """
+    linhas = dados.translate(None, ESPACOS).split(b'\n')
+    loc = len(linhas) - linhas.count(b'')
+    if dados.find(b'/') == -1:
+        return loc, 0
+
+    comentarios = 0
+    anterior_bloco = False
+    for codigo, linha, bloco in TOKENS_JAVA.findall(dados):
+        # Só um bloco pode terminar numa linha que ainda tenha outro comentário depois dele
+        mesma_linha = anterior_bloco and b'\n' not in codigo
+        if linha:
+            if not mesma_linha:
+                comentarios += 1
+            anterior_bloco = False
+        elif bloco:
+            if not mesma_linha:
+                comentarios += 1
+            # A primeira linha do bloco já foi contada; as seguintes só contam se não vazias
+            for parte in bloco.split(b'\n')[1:]:
+                if parte.strip(ESPACOS):
+                    comentarios += 1
+            anterior_bloco = True
+    return loc, comentarios
+
+def contar_arquivo(caminho):
+    try:
+        with open(caminho, 'rb') as f:
+            dados = f.read()
+    except OSError:
+        return 0, 0
+    return contar_conteudo(dados) if dados else (0, 0)
+
+def contar_lote(caminhos):
+    loc = comentarios = 0
+    for caminho in caminhos:
+        l, c = contar_arquivo(caminho)
+        loc += l
+        comentarios += c
+    return loc, comentarios
+
+def contar_lote_por_arquivo(caminhos):
+    return [contar_arquivo(caminho) for caminho in caminhos]
+
+def listar_arquivos_java(raiz):
+    pendentes = [raiz]
+    while pendentes:
+        pasta = pendentes.pop()
+        try:
+            with os.scandir(pasta) as entradas:
+                for entrada in entradas:
+                    try:
+                        if entrada.is_dir(follow_symlinks=False):
+                            if entrada.name != '.git':
+                                pendentes.append(entrada.path)
+                        elif entrada.name.endswith('.java') and entrada.is_file(follow_symlinks=False):
+                            yield entrada.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+def _obter_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PROCESSOS_LOC)
+        return _executor
+
+def contar_arquivos(caminhos, processos=PROCESSOS_LOC):
+    """Soma (loc, comentarios) dos arquivos, distribuindo lotes num pool de processos quando compensa."""
+    caminhos = list(caminhos)
+    if processos <= 1 or len(caminhos) <= ARQUIVOS_POR_LOTE:
+        return contar_lote(caminhos)
+
+    lotes = [caminhos[i:i + ARQUIVOS_POR_LOTE] for i in range(0, len(caminhos), ARQUIVOS_POR_LOTE)]
+    loc = comentarios = 0
+    for l, c in _obter_executor().map(contar_lote, lotes):
+        loc += l
+        comentarios += c
+    return loc, comentarios
+
+def contar_arquivos_por_arquivo(caminhos, processos=PROCESSOS_LOC):
+    """Como `contar_arquivos`, mas devolve a lista de (loc, comentarios) de cada arquivo, na mesma ordem."""
+    caminhos = list(caminhos)
+    if processos <= 1 or len(caminhos) <= ARQUIVOS_POR_LOTE:
+        return contar_lote_por_arquivo(caminhos)
+
+    lotes = [caminhos[i:i + ARQUIVOS_POR_LOTE] for i in range(0, len(caminhos), ARQUIVOS_POR_LOTE)]
+    contagens = []
+    for parcial in _obter_executor().map(contar_lote_por_arquivo, lotes):
+        contagens.extend(parcial)
+    return contagens
+
+def contar_loc_comentarios(repo_path, processos=PROCESSOS_LOC):
+    return contar_arquivos(listar_arquivos_java(repo_path), processos)
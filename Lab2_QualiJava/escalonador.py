@@ -0,0 +1,201 @@
+import os
+import time
+import logging
+import threading
+
+import psutil
+
+# 🚦 Escalonador sensível a recursos.
+#
+# Um monitor em segundo plano mede memória, disco e CPU a cada INTERVALO_MONITOR segundos e
+# ajusta o limite de cada grupo de tarefas (clones, CKs...):
+#   - folga          -> o limite volta a subir, um por vez, até o máximo do grupo;
+#   - pressão        -> o limite desce um por vez (mínimo 1) nos grupos que consomem o recurso
+#                       (CPU alta só afeta os grupos com consome_cpu);
+#   - nível crítico  -> os grupos que consomem o recurso em falta pausam (limite 0), os demais
+#                       seguem e ajudam a esvaziar a fila. Com o disco crítico, o callback de
+#                       disco (ex.: apagar arquivos temporários ou avisar o usuário) é chamado.
+# Tarefas em andamento não são interrompidas; só novas tarefas aguardam uma vaga.
+
+MEMORIA_CRITICA_MB = 500
+DISCO_CRITICO_MB = 1024
+MEMORIA_FOLGA_MB = 2048
+DISCO_FOLGA_MB = 4096
+CPU_MAXIMA = 95
+INTERVALO_MONITOR = 2.0
+# Tempo máximo aguardando recursos antes de desistir (usado na clonagem sequencial)
+ESPERA_MAXIMA_S = 30 * 60
+
+def _mb(valor):
+    return valor / (1024 * 1024)
+
+class ControleConcorrencia:
+    """
+    Semáforo com limite ajustável em tempo real.
+
+    :param nome: nome do grupo nos logs.
+    :param maximo: limite quando há folga de recursos.
+    :param consome_disco: pausa quando o disco fica crítico.
+    :param consome_memoria: pausa quando a memória fica crítica.
+    :param consome_cpu: reduz o limite com a CPU acima de `cpu_maxima`. Grupos já dimensionados
+        para ocupar a CPU (como o CK, ver `calcular_workers_ck`) usam False: CPU alta é o esperado
+        enquanto eles trabalham, e reduzi-los desfaria esse dimensionamento.
+    """
+    def __init__(self, nome, maximo, consome_disco=False, consome_memoria=True, consome_cpu=True):
+        self.nome = nome
+        self.maximo = max(1, maximo)
+        self.consome_disco = consome_disco
+        self.consome_memoria = consome_memoria
+        self.consome_cpu = consome_cpu
+        self.limite = self.maximo
+        self.em_uso = 0
+        self._cond = threading.Condition()
+
+    def definir_limite(self, limite):
+        limite = max(0, min(self.maximo, limite))
+        with self._cond:
+            if limite == self.limite:
+                return
+            anterior, self.limite = self.limite, limite
+            self._cond.notify_all()
+        if limite == 0:
+            logging.warning(f"⏸️ {self.nome}: pausado por falta de recursos.")
+        elif anterior == 0:
+            logging.info(f"▶️ {self.nome}: retomado com {limite} vaga(s).")
+        else:
+            logging.info(f"🚦 {self.nome}: limite ajustado de {anterior} para {limite}.")
+
+    def adquirir(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.em_uso < self.limite, timeout):
+                return False
+            self.em_uso += 1
+            return True
+
+    def liberar(self):
+        with self._cond:
+            self.em_uso -= 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.adquirir()
+        return self
+
+    def __exit__(self, *exc):
+        self.liberar()
+
+class EscalonadorRecursos:
+    """
+    🚦 Monitora memória, disco e CPU e ajusta os controles de concorrência registrados.
+
+    :param pasta_disco: pasta cujo volume é monitorado (ex.: Repos/).
+    :param liberar_disco: callback opcional chamado com o disco crítico; retorna os bytes liberados.
+    """
+    def __init__(self, pasta_disco, liberar_disco=None, intervalo=INTERVALO_MONITOR,
+                 memoria_critica_mb=MEMORIA_CRITICA_MB, disco_critico_mb=DISCO_CRITICO_MB,
+                 memoria_folga_mb=MEMORIA_FOLGA_MB, disco_folga_mb=DISCO_FOLGA_MB, cpu_maxima=CPU_MAXIMA):
+        self.pasta_disco = pasta_disco
+        self.liberar_disco = liberar_disco
+        self.intervalo = intervalo
+        self.memoria_critica_mb = memoria_critica_mb
+        self.disco_critico_mb = disco_critico_mb
+        self.memoria_folga_mb = memoria_folga_mb
+        self.disco_folga_mb = disco_folga_mb
+        self.cpu_maxima = cpu_maxima
+        self.controles = []
+        self._parar = threading.Event()
+        self._monitor = None
+
+    def controle(self, nome, maximo, consome_disco=False, consome_memoria=True, consome_cpu=True):
+        controle = ControleConcorrencia(nome, maximo, consome_disco, consome_memoria, consome_cpu)
+        self.controles.append(controle)
+        return controle
+
+    def medir(self):
+        """Retorna (memoria_livre_mb, disco_livre_mb, cpu_percentual)."""
+        pasta = self.pasta_disco if os.path.exists(self.pasta_disco) else os.path.dirname(self.pasta_disco)
+        return (
+            _mb(psutil.virtual_memory().available),
+            _mb(psutil.disk_usage(pasta).free),
+            psutil.cpu_percent(interval=None)
+        )
+
+    def _ajustar(self):
+        memoria, disco, cpu = self.medir()
+        memoria_critica = memoria < self.memoria_critica_mb
+        disco_critico = disco < self.disco_critico_mb
+
+        if disco_critico and self.liberar_disco is not None:
+            liberado = self.liberar_disco()
+            if liberado:
+                logging.info(f"🧹 Disco crítico ({disco:.0f} MB livres): {_mb(liberado):.0f} MB liberados.")
+                memoria, disco, cpu = self.medir()
+                disco_critico = disco < self.disco_critico_mb
+
+        for controle in self.controles:
+            critico = (memoria_critica and controle.consome_memoria) or (disco_critico and controle.consome_disco)
+            pressionado = (
+                (controle.consome_cpu and cpu > self.cpu_maxima)
+                or (controle.consome_memoria and memoria < self.memoria_folga_mb)
+                or (controle.consome_disco and disco < self.disco_folga_mb)
+            )
+            if critico:
+                controle.definir_limite(0)
+            elif pressionado:
+                controle.definir_limite(max(1, controle.limite - 1))
+            else:
+                controle.definir_limite(controle.limite + 1)
+
+    def _monitorar(self):
+        psutil.cpu_percent(interval=None)  # a primeira leitura serve só de referência
+        while not self._parar.wait(self.intervalo):
+            try:
+                self._ajustar()
+            except Exception as e:
+                logging.warning(f"⚠️ Falha ao medir recursos: {e}")
+
+    def iniciar(self):
+        if self._monitor is None:
+            self._parar.clear()
+            self._monitor = threading.Thread(target=self._monitorar, daemon=True)
+            self._monitor.start()
+        return self
+
+    def parar(self):
+        if self._monitor is not None:
+            self._parar.set()
+            self._monitor.join()
+            self._monitor = None
+        # Libera quem estiver esperando uma vaga
+        for controle in self.controles:
+            controle.definir_limite(controle.maximo)
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    def aguardar_recursos(self, espera_maxima=ESPERA_MAXIMA_S):
+        """
+        ⏳ Bloqueia enquanto memória ou disco estiverem abaixo do nível crítico.
+
+        Retorna False apenas se os recursos não voltarem dentro de `espera_maxima` segundos.
+        """
+        inicio = time.time()
+        avisado = False
+        while True:
+            memoria, disco, _ = self.medir()
+            if memoria >= self.memoria_critica_mb and disco >= self.disco_critico_mb:
+                if avisado:
+                    logging.info("▶️ Recursos disponíveis novamente. Continuando...")
+                return True
+
+            if disco < self.disco_critico_mb and self.liberar_disco is not None:
+                self.liberar_disco()
+            if time.time() - inicio >= espera_maxima:
+                return False
+            if not avisado:
+                logging.warning(f"⏸️ Recursos baixos (memória: {memoria:.0f} MB | disco: {disco:.0f} MB). Aguardando...")
+                avisado = True
+            time.sleep(self.intervalo)
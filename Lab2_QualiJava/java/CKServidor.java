@@ -0,0 +1,50 @@
+import com.github.mauricioaniche.ck.Runner;
+
+import java.io.BufferedReader;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.nio.charset.StandardCharsets;
+
+/**
+ * Servidor CK persistente usado por servidor_ck.py.
+ *
+ * Lê um pedido por linha no stdin ("caminho_do_repositorio\tpasta_de_saida/") e executa o
+ * Runner do CK na mesma JVM, evitando a inicialização e o aquecimento do JIT a cada
+ * repositório. Responde uma linha por pedido no stdout: "OK" ou "ERRO <mensagem>".
+ * Tudo que o CK imprime é desviado para o stderr para não poluir o protocolo.
+ */
+public class CKServidor {
+
+    public static void main(String[] args) throws Exception {
+        PrintStream protocolo = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        System.setOut(System.err);
+
+        BufferedReader entrada = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        protocolo.println("PRONTO");
+
+        String linha;
+        while ((linha = entrada.readLine()) != null) {
+            String[] partes = linha.split("\t");
+            if (partes.length != 2) {
+                protocolo.println("ERRO pedido inválido: " + linha);
+                continue;
+            }
+
+            try {
+                // Mesmos argumentos do "java -jar ck.jar <repo> true 0 true", com a pasta de saída explícita
+                Runner.main(new String[]{partes[0], "true", "0", "true", partes[1]});
+                protocolo.println("OK");
+            } catch (Throwable t) {
+                String mensagem = String.valueOf(t.getMessage()).replace('\n', ' ');
+                protocolo.println("ERRO " + t.getClass().getSimpleName() + ": " + mensagem);
+                if (t instanceof OutOfMemoryError) {
+                    // A JVM pode ter ficado inconsistente; o lado Python reinicia o servidor
+                    System.exit(3);
+                }
+            }
+            System.gc();
+        }
+    }
+}
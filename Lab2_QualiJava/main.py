@@ -1,42 +1,35 @@
-# 🚀 Instalando dependências essenciais...
-import sys
-import subprocess
-
-# Lista de dependências externas
-dependencias = [
-    'os', 'csv', 'subprocess', 'logging', 'time', 'shutil', 'stat', 'psutil',
-    'requests', 'pandas', 'numpy', 'matplotlib', 'seaborn', 'statsmodels',
-    'scipy', 'tabulate', 'datetime', 'python-dotenv', 'tqdm'
-]
-
-# Checagem e instalação das dependências (antes de carregar o logging)
-print(f"\n{' ' * 37}🔎 Verificando e instalando dependências...\n")
-for pacote in dependencias:
-    try:
-        __import__(pacote if pacote != 'python-dotenv' else 'dotenv')
-        print(f"{' ' * 37}✅ {pacote.ljust(15)} -> Já instalado, pulando...")
-    except ImportError:
-        print(f"⬇️ {pacote.ljust(15)} -> ⏳ Instalando...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", pacote])
-        print(f"✅ {pacote.ljust(15)} -> 🎯 Instalada com sucesso!")
-
-# ✅ Só agora importa as demais
+# 🚀 Verificação rápida do ambiente: nada de importar os pacotes só para ver se existem
 import os
+import sys
+import json
+import hashlib
 import logging
 import argparse
 import shutil
+import subprocess
 import time
 import stat
-from tqdm import tqdm
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+REQUIREMENTS_FILE = os.path.join(script_dir, "requirements.txt")
+# Assinatura do último ambiente verificado (requirements + interpretador + pastas de pacotes)
+AMBIENTE_STAMP_FILE = os.path.join(script_dir, ".ambiente_verificado")
+
+# Módulo compartilhado com o Lab3, na raiz do repositório (ao lado do config_token.py)
+sys.path.append(os.path.abspath(os.path.join(script_dir, "..")))
+from ambiente import verificar_ambiente
+
+verificar_ambiente(REQUIREMENTS_FILE, AMBIENTE_STAMP_FILE, recuo=" " * 37)
 
 # Configura o logging
 for handler in logging.root.handlers[:]:
     logging.root.removeHandler(handler)
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(__file__)
 LOG_DIR = os.path.join(script_dir, "Relatórios")
 LOG_FILE = os.path.join(LOG_DIR, "main.log")
+DATA_DIR = os.path.join(script_dir, "Data")
+ESTADO_ETAPAS_FILE = os.path.join(DATA_DIR, ".estado_etapas.json")
 
 logging.basicConfig(
     level=logging.INFO,
@@ -60,41 +53,193 @@ def formatar_tempo(segundos):
     minutos, segundos = divmod(resto, 60)
     return f"{horas:02d}:{minutos:02d}:{segundos:02d}"
 
-def run_subprocess(script_name):
+def run_subprocess(script_name, *args):
     script_path = os.path.join(BASE_DIR, script_name)
-    subprocess.run(["python", script_path], check=True)
+    # Mesmo interpretador cujo ambiente foi verificado
+    subprocess.run([sys.executable, script_path, *args], check=True)
 
-# Etapas
-def buscar_repositorios():
-    logging.info("🌐 [ETAPA 1] BUSCAR REPOSITÓRIOS\n")
+# 🧩 Grafo de etapas: cada etapa declara os arquivos que lê e os que produz (caminhos relativos
+# à pasta do Lab2). Uma etapa depende das que produzem suas entradas, e é pulada quando o hash
+# das entradas é o mesmo da última execução bem-sucedida e as saídas ainda existem.
+MODULOS_COLETA = [
+    "coletar_dados.py", "contador_loc.py", "cache_analise.py", "armazenamento_ck.py",
+    "agregador_ck.py", "servidor_ck.py", "escalonador.py", "java/CKServidor.java", "ck.jar"
+]
+MODULOS_ANALISE = ["analisar_dados.py", "motor_figuras.py", "motor_correlacao.py", "motor_bootstrap.py", "analise_streaming.py"]
+
+ETAPAS = {
+    "buscar": {
+        "titulo": "🌐 [ETAPA 1] BUSCAR REPOSITÓRIOS",
+        "script": "coleta_repositorios.py",
+        "entradas": ["coleta_repositorios.py"],
+        "saidas": ["Data/repositorios_list.csv"],
+        # Busca ao vivo na API do GitHub (resultado muda a cada execução): nunca roda só por ser
+        # dependência de outra etapa, apenas quando pedida explicitamente
+        "apenas_explicita": True,
+    },
+    "clone": {
+        "titulo": "🗂️ [ETAPA 2] CLONAR REPOSITÓRIOS",
+        "script": "automacao_clone.py",
+        "entradas": ["automacao_clone.py", "escalonador.py", "Data/repositorios_list.csv"],
+        "saidas": ["Data/repos_head_manifest.json", "Repos"],
+    },
+    "coletar": {
+        "titulo": "📊 [ETAPA 3] COLETAR DADOS",
+        "script": "coletar_dados.py",
+        "entradas": [*MODULOS_COLETA, "Data/repositorios_list.csv", "Data/repos_head_manifest.json"],
+        "saidas": ["Data/resultados_totais.csv", "Data/metricas_ck_detalhadas.csv"],
+        # Com --forcar (ou a opção 7 do menu), a coleta não reaproveita o journal
+        "args_forcada": ["--reiniciar"],
+    },
+    "analisar": {
+        "titulo": "📈 [ETAPA 4] ANALISAR DADOS",
+        "script": "analisar_dados.py",
+        "entradas": [*MODULOS_ANALISE, "Data/resultados_totais.csv"],
+        "saidas": [f"Relatórios/correlacao_p_values_rq0{n}.csv" for n in range(1, 5)],
+    },
+}
+
+def carregar_estado_etapas():
+    try:
+        with open(ESTADO_ETAPAS_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"etapas": {}, "arquivos": {}}
+
+def salvar_estado_etapas(estado):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    temp_file = ESTADO_ETAPAS_FILE + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=2, sort_keys=True)
+    os.replace(temp_file, ESTADO_ETAPAS_FILE)
+
+def hash_arquivo(caminho_rel, estado):
+    # O hash de cada arquivo é reaproveitado enquanto tamanho e data de modificação não mudarem
+    caminho = os.path.join(script_dir, caminho_rel)
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return "ausente"
+    memo = estado["arquivos"].get(caminho_rel)
+    if memo and memo[0] == info.st_mtime_ns and memo[1] == info.st_size:
+        return memo[2]
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+    estado["arquivos"][caminho_rel] = [info.st_mtime_ns, info.st_size, sha.hexdigest()]
+    return sha.hexdigest()
+
+def hash_entradas(nome, estado):
+    sha = hashlib.sha256()
+    for caminho_rel in sorted(ETAPAS[nome]["entradas"]):
+        sha.update(f"{caminho_rel}={hash_arquivo(caminho_rel, estado)}\n".encode())
+    return sha.hexdigest()
+
+def saidas_presentes(nome):
+    for caminho_rel in ETAPAS[nome]["saidas"]:
+        caminho = os.path.join(script_dir, caminho_rel)
+        if not os.path.exists(caminho) or (os.path.isdir(caminho) and not os.listdir(caminho)):
+            return False
+    return True
+
+def dependencias(nome):
+    entradas = set(ETAPAS[nome]["entradas"])
+    return {outra for outra, etapa in ETAPAS.items() if outra != nome and entradas & set(etapa["saidas"])}
+
+def fechamento(alvos):
+    etapas, pendentes = set(), list(alvos)
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in etapas:
+            etapas.add(nome)
+            pendentes.extend(dependencias(nome))
+    return etapas
+
+def executar_etapa(nome, forcar=False):
+    etapa = ETAPAS[nome]
+    logging.info(f"{etapa['titulo']}\n")
     start = time.time()
-    run_subprocess('coleta_repositorios.py')
+    run_subprocess(etapa["script"], *(etapa.get("args_forcada", []) if forcar else []))
     end = time.time()
-    logging.info(f"✅ Busca finalizada em {formatar_tempo(end - start)}")
+    logging.info(f"✅ {etapa['titulo']} finalizada em {formatar_tempo(end - start)}")
     print("\n" + "🟰" * 120)
 
+def executar_grafo(alvos, forcar=False, forcar_alvos=False):
+    """
+    🧩 Executa as etapas `alvos` e as dependências que estiverem desatualizadas, uma de cada vez.
+
+    As etapas formam uma cadeia (buscar → clone → coletar → analisar) e `ETAPAS` já está declarado
+    nessa ordem. Com `forcar`, nada é pulado; com `forcar_alvos`, só as dependências podem ser
+    puladas (usado nas opções avulsas do menu). Retorna True se nenhuma etapa falhou.
+
+    Dependências sem execução registrada (estado apagado ou scripts rodados fora do `main.py`)
+    cujas saídas existem são consideradas atualizadas e passam a ter o hash registrado. Etapas
+    `apenas_explicita` só rodam quando estão em `alvos`; como dependência, usam as saídas existentes.
+    """
+    etapas = fechamento(alvos)
+    estado = carregar_estado_etapas()
+    falhas = set()
+
+    for nome in [nome for nome in ETAPAS if nome in etapas]:
+        if dependencias(nome) & falhas:
+            logging.error(f"🚫 Etapa '{nome}' não executada: dependência falhou.")
+            falhas.add(nome)
+            continue
+
+        hash_atual = hash_entradas(nome, estado)
+        dependencia = nome not in alvos
+        if dependencia and ETAPAS[nome].get("apenas_explicita"):
+            if saidas_presentes(nome):
+                logging.info(f"⏭️ Etapa '{nome}' só roda quando pedida explicitamente. Usando as saídas existentes...")
+                estado["etapas"].setdefault(nome, hash_atual)
+                continue
+            logging.error(f"🚫 Etapa '{nome}' não é executada como dependência e suas saídas não existem. "
+                          f"Rode-a antes (--step {nome}).")
+            falhas.add(nome)
+            continue
+        if dependencia and not forcar and nome not in estado["etapas"] and saidas_presentes(nome):
+            logging.info(f"⏭️ Etapa '{nome}' sem execução registrada, mas com as saídas presentes. Considerada atualizada.")
+            estado["etapas"][nome] = hash_atual
+            salvar_estado_etapas(estado)
+            continue
+
+        forcada = forcar or (forcar_alvos and nome in alvos)
+        if not forcada and estado["etapas"].get(nome) == hash_atual and saidas_presentes(nome):
+            logging.info(f"⏭️ Etapa '{nome}' atualizada (entradas sem mudanças). Pulando...")
+            continue
+
+        try:
+            executar_etapa(nome, forcar)
+        except Exception as e:
+            logging.error(f"❌ Etapa '{nome}' falhou: {e}")
+            estado["etapas"].pop(nome, None)
+            falhas.add(nome)
+        else:
+            estado["etapas"][nome] = hash_atual
+        salvar_estado_etapas(estado)
+
+    salvar_estado_etapas(estado)
+    return not falhas
+
+def buscar_repositorios():
+    executar_grafo(["buscar"], forcar_alvos=True)
+
 def clone_repositories():
-    logging.info("🗂️ [ETAPA 2] CLONAR REPOSITÓRIOS\n")
-    start = time.time()
-    run_subprocess("automacao_clone.py")
-    end = time.time()
-    logging.info(f"✅ Clonagem finalizada em {formatar_tempo(end - start)}")
-    print("\n" + "🟰" * 120)
+    executar_grafo(["clone"], forcar_alvos=True)
 
 def coletar_dados():
-    logging.info("📊 [ETAPA 3] COLETAR DADOS\n")
-    start = time.time()
-    run_subprocess('coletar_dados.py')
-    end = time.time()
-    logging.info(f"✅ Coleta de dados finalizada em {formatar_tempo(end - start)}")
-    print("\n" + "🟰" * 120)
+    executar_grafo(["coletar"], forcar_alvos=True)
 
 def analisar_dados():
-    logging.info("📈 [ETAPA 4] ANALISAR DADOS\n")
+    executar_grafo(["analisar"], forcar_alvos=True)
+
+def pipeline_streaming():
+    logging.info("⚡ [ETAPAS 2+3] PIPELINE STREAMING (CLONAR → CK → LOC → LIMPAR)\n")
     start = time.time()
-    run_subprocess('analisar_dados.py')
+    run_subprocess('pipeline_streaming.py')
     end = time.time()
-    logging.info(f"✅ Análise finalizada em {formatar_tempo(end - start)}")
+    logging.info(f"✅ Pipeline streaming finalizado em {formatar_tempo(end - start)}")
     print("\n" + "🟰" * 120)
 
 # Limpeza
@@ -103,6 +248,8 @@ def remove_readonly(func, path, _):
     func(path)
 
 def limpar_conteudo_pasta(pasta):
+    from tqdm import tqdm
+
     if not os.path.exists(pasta):
         logging.warning(f"⚠️ Pasta {pasta} não encontrada para limpeza.")
         return
@@ -120,6 +267,8 @@ def limpar_conteudo_pasta(pasta):
         logging.info(f"📂 Pasta {os.path.basename(pasta)} está vazia.\n")
 
 def limpeza_completa():
+    from tqdm import tqdm
+
     data_path = os.path.join(BASE_DIR, "Data")
     repos_dir = os.path.join(BASE_DIR, "Repos")
 
@@ -128,6 +277,10 @@ def limpeza_completa():
     print("\n")
 
     if confirmacao == "s":
+        # Sem os dados, nenhuma etapa pode ser considerada atualizada
+        if os.path.exists(ESTADO_ETAPAS_FILE):
+            os.remove(ESTADO_ETAPAS_FILE)
+
         if os.path.exists(data_path):
             logging.info(f"🪛 Limpando {os.path.basename(data_path)}")
             limpar_conteudo_pasta(data_path)
@@ -160,6 +313,9 @@ def menu():
         print(f"{' ' * 37}3 - 📊 COLETAR DADOS")
         print(f"{' ' * 37}4 - 📈 ANALISAR DADOS")
         print(f"{' ' * 37}5 - 🔄 EXECUTAR PIPELINE COMPLETO")
+        print(f"{' ' * 37}6 - ⚡ CLONAR + COLETAR EM STREAMING (DISCO LIMITADO)")
+        print(f"{' ' * 37}7 - 🔁 PIPELINE COMPLETO (FORÇAR TODAS AS ETAPAS)")
+        print(f"{' ' * 37}8 - 🧹 LIMPAR PASTAS 'Data' E 'Repos'")
         print(f"{' ' * 37}0 - 🚪 SAIR\n")
 
 
@@ -178,15 +334,19 @@ def menu():
         elif escolha == "4":
             analisar_dados()
             print("\n" + "🟰" * 120)
-        elif escolha == "5":
+        elif escolha in ("5", "7"):
             logging.info("🔄 Executando PIPELINE COMPLETO 🔄\n")
-            buscar_repositorios()
-            clone_repositories()
-            coletar_dados()
-            analisar_dados()
-            logging.info("🎉 Pipeline finalizado com sucesso!")
+            if executar_grafo(list(ETAPAS), forcar=escolha == "7"):
+                logging.info("🎉 Pipeline finalizado com sucesso!")
+            else:
+                logging.error("❌ Pipeline finalizado com falhas. Verifique o log.")
             print("\n" + "🟰" * 120)
             break
+        elif escolha == "6":
+            pipeline_streaming()
+            print("\n" + "🟰" * 120)
+        elif escolha == "8":
+            limpeza_completa()
         elif escolha == "0":
             logging.info("🚪 Encerrando o programa.\n")
             break
@@ -194,6 +354,15 @@ def menu():
             logging.warning("🚫 Opção inválida.\n")
 
 if __name__ == "__main__":
-    # Sempre executa a limpeza antes de abrir o menu
-    limpeza_completa()
+    parser = argparse.ArgumentParser(description="Pipeline do Lab2 (menu interativo ou etapas diretas)")
+    parser.add_argument("--step", choices=[*ETAPAS, "all"], default=None,
+                        help="Executa a etapa indicada (e dependências desatualizadas) sem abrir o menu")
+    parser.add_argument("--forcar", action="store_true",
+                        help="Executa as etapas mesmo que as entradas não tenham mudado")
+    args = parser.parse_args()
+
+    if args.step:
+        alvos = list(ETAPAS) if args.step == "all" else [args.step]
+        sys.exit(0 if executar_grafo(alvos, args.forcar) else 1)
+    # A limpeza agora é uma opção do menu (8), e não roda mais a cada inicialização
     menu()
@@ -0,0 +1,208 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# 🎲 Bootstrap e testes de permutação vetorizados.
+#
+# Cada reamostragem é representada pelo vetor de pesos w (quantas vezes cada repositório foi
+# sorteado). Um lote de B reamostragens vira uma matriz W (B x n) e as somas ponderadas que
+# alimentam correlações e a regressão saem de produtos matriciais W @ colunas, sem laço Python
+# por reamostragem. Para o Spearman, os postos de cada reamostragem são obtidos com soma
+# acumulada dos pesos na ordem original da coluna (empates recebem o posto médio).
+#
+# As reamostragens são divididas em FRAGMENTOS fixos, cada um com a sua semente derivada de
+# SeedSequence(SEMENTE). O resultado é o mesmo com 1 ou N processos.
+
+REAMOSTRAGENS = int(os.environ.get("LAB2_REAMOSTRAGENS", 10_000))
+SEMENTE = 2025
+FRAGMENTOS = 16
+NIVEL_CONFIANCA = 0.95
+PROCESSOS_BOOTSTRAP = os.cpu_count() or 1
+# Limite de elementos de cada matriz B x n, para a memória não depender de n
+ELEMENTOS_POR_LOTE = 2_000_000
+
+def _pesos(rng, n, lote):
+    """Matriz (lote x n) com quantas vezes cada observação aparece em cada reamostragem."""
+    sorteio = rng.integers(0, n, size=(lote, n)) + (np.arange(lote) * n)[:, None]
+    return np.bincount(sorteio.ravel(), minlength=lote * n).reshape(lote, n).astype(np.float64)
+
+def _correlacao_ponderada(W, x, Y):
+    """Pearson entre x (n) e cada coluna de Y (n x k) em cada linha de pesos de W. Retorna (B x k)."""
+    n = W.sum(axis=1, keepdims=True)
+    media_x = W @ x / n[:, 0]
+    media_y = W @ Y / n
+    sxy = W @ (x[:, None] * Y) / n - media_x[:, None] * media_y
+    sxx = W @ (x * x) / n[:, 0] - media_x ** 2
+    syy = W @ (Y * Y) / n - media_y ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sxy / np.sqrt(sxx[:, None] * syy)
+
+def _preparar_postos(valores):
+    """Ordem da coluna, fim de cada grupo de empates (na ordem) e grupo de cada observação."""
+    ordem = np.argsort(valores, kind="stable")
+    ordenados = valores[ordem]
+    fins = np.r_[np.nonzero(np.diff(ordenados))[0], len(valores) - 1]
+    grupo = np.empty(len(valores), dtype=np.int64)
+    grupo[ordem] = np.r_[0, np.cumsum(np.diff(ordenados) != 0)]
+    return ordem, fins, grupo
+
+def _postos_ponderados(W, ordem, fins, grupo):
+    """Posto médio de cada observação em cada reamostragem (B x n)."""
+    acumulado = np.cumsum(W[:, ordem], axis=1)[:, fins]
+    no_grupo = np.diff(acumulado, axis=1, prepend=0)
+    return (acumulado - (no_grupo - 1) / 2)[:, grupo]
+
+def _spearman_ponderado(W, postos_x, postos_Y):
+    n = W.sum(axis=1)
+    resultado = np.empty((W.shape[0], len(postos_Y)))
+    ponderado_x = W * postos_x
+    media_x = ponderado_x.sum(axis=1) / n
+    sxx = np.einsum("ij,ij->i", ponderado_x, postos_x) / n - media_x ** 2
+    for j, postos_y in enumerate(postos_Y):
+        ponderado_y = W * postos_y
+        media_y = ponderado_y.sum(axis=1) / n
+        sxy = np.einsum("ij,ij->i", ponderado_x, postos_y) / n - media_x * media_y
+        syy = np.einsum("ij,ij->i", ponderado_y, postos_y) / n - media_y ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            resultado[:, j] = sxy / np.sqrt(sxx * syy)
+    return resultado
+
+def _coeficientes_ponderados(W, X, y):
+    """Coeficientes de mínimos quadrados ponderados (B x p) para X (n x p, já com constante)."""
+    p = X.shape[1]
+    i, j = np.triu_indices(p)
+    XtWX = np.empty((W.shape[0], p, p))
+    XtWX[:, i, j] = W @ (X[:, i] * X[:, j])
+    XtWX[:, j, i] = XtWX[:, i, j]
+    XtWy = W @ (X * y[:, None])
+    # pinv em vez de solve: uma reamostragem degenerada não derruba o lote inteiro
+    return (np.linalg.pinv(XtWX) @ XtWy[:, :, None])[:, :, 0]
+
+def _padronizar(valores):
+    desvio = valores.std(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (valores - valores.mean(axis=0)) / desvio
+
+def _fragmento(tarefa):
+    """Executa as reamostragens e permutações de um fragmento. Função de topo para o pool."""
+    rng = np.random.default_rng(tarefa["semente"])
+    x, Y, X = tarefa["x"], tarefa["Y"], tarefa["X"]
+    n = len(x)
+    lote = max(1, ELEMENTOS_POR_LOTE // n)
+
+    postos_x = _preparar_postos(x)
+    postos_Y = [_preparar_postos(coluna) for coluna in Y.T]
+    # Os postos da amostra original não mudam numa permutação: basta padronizá-los uma vez
+    z_x, z_Y = _padronizar(x), _padronizar(Y)
+    z_postos_x = _padronizar(tarefa["postos_x"])
+    z_postos_Y = _padronizar(tarefa["postos_Y"])
+
+    pearson, spearman, coeficientes = [], [], []
+    restantes = tarefa["reamostragens"]
+    while restantes > 0:
+        tamanho = min(lote, restantes)
+        W = _pesos(rng, n, tamanho)
+        pearson.append(_correlacao_ponderada(W, x, Y))
+        px = _postos_ponderados(W, *postos_x)
+        spearman.append(_spearman_ponderado(W, px, [_postos_ponderados(W, *p) for p in postos_Y]))
+        coeficientes.append(_coeficientes_ponderados(W, X, x))
+        restantes -= tamanho
+
+    extremos_pearson = np.zeros(Y.shape[1], dtype=np.int64)
+    extremos_spearman = np.zeros(Y.shape[1], dtype=np.int64)
+    restantes = tarefa["permutacoes"]
+    while restantes > 0:
+        tamanho = min(lote, restantes)
+        permutacoes = rng.permuted(np.tile(np.arange(n), (tamanho, 1)), axis=1)
+        extremos_pearson += (np.abs(z_x[permutacoes] @ z_Y / n) >= tarefa["limiar_pearson"]).sum(axis=0)
+        extremos_spearman += (np.abs(z_postos_x[permutacoes] @ z_postos_Y / n) >= tarefa["limiar_spearman"]).sum(axis=0)
+        restantes -= tamanho
+
+    return np.vstack(pearson), np.vstack(spearman), np.vstack(coeficientes), extremos_pearson, extremos_spearman
+
+def _intervalo(amostras, nivel):
+    cauda = (1 - nivel) / 2 * 100
+    return np.nanpercentile(amostras, [cauda, 100 - cauda], axis=0)
+
+def bootstrap_questao(df, variavel, metricas, preditores, reamostragens=REAMOSTRAGENS, semente=SEMENTE,
+                      nivel=NIVEL_CONFIANCA, processos=PROCESSOS_BOOTSTRAP):
+    """
+    🎲 Intervalos de confiança (bootstrap percentil) e p-valores de permutação de uma RQ.
+
+    Retorna (correlacoes, coeficientes):
+      - correlacoes: uma linha por métrica com Metric, Pearson_CI_low/high, Spearman_CI_low/high,
+        Pearson_perm_p-value e Spearman_perm_p-value (mesmas reamostragens para todas as métricas);
+      - coeficientes: Variable, Coefficient, CI_low, CI_high da regressão OLS de `variavel`
+        sobre `preditores` (com constante).
+    """
+    metricas, preditores = list(metricas), list(preditores)
+    x = df[variavel].to_numpy(dtype=np.float64)
+    Y = df[metricas].to_numpy(dtype=np.float64)
+    n = len(x)
+
+    # Preditores padronizados deixam X'WX bem condicionado; os coeficientes voltam à escala original no fim
+    brutos = df[preditores].to_numpy(dtype=np.float64)
+    medias, desvios = brutos.mean(axis=0), brutos.std(axis=0)
+    desvios[desvios == 0] = 1.0
+    X = np.column_stack([np.ones(n), (brutos - medias) / desvios])
+
+    postos_x = pd.Series(x).rank().to_numpy()
+    postos_Y = df[metricas].rank().to_numpy()
+    observado_pearson = (_padronizar(x) @ _padronizar(Y)) / n
+    observado_spearman = (_padronizar(postos_x) @ _padronizar(postos_Y)) / n
+
+    fragmentos = min(FRAGMENTOS, reamostragens)
+    sementes = np.random.SeedSequence(semente).spawn(fragmentos)
+    base = {
+        "x": x, "Y": Y, "X": X,
+        "postos_x": postos_x, "postos_Y": postos_Y,
+        # Tolerância relativa: a própria amostra observada conta como extrema
+        "limiar_pearson": np.abs(observado_pearson) * (1 - 1e-12),
+        "limiar_spearman": np.abs(observado_spearman) * (1 - 1e-12),
+    }
+    tarefas = [
+        {**base, "semente": s, "reamostragens": len(parte), "permutacoes": len(parte)}
+        for s, parte in zip(sementes, np.array_split(np.arange(reamostragens), fragmentos))
+    ]
+
+    processos = min(processos, fragmentos)
+    if processos <= 1:
+        resultados = [_fragmento(tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            resultados = list(executor.map(_fragmento, tarefas))
+
+    pearson = np.vstack([r[0] for r in resultados])
+    spearman = np.vstack([r[1] for r in resultados])
+    coeficientes = np.vstack([r[2] for r in resultados])
+    extremos_pearson = sum(r[3] for r in resultados)
+    extremos_spearman = sum(r[4] for r in resultados)
+
+    ic_pearson = _intervalo(pearson, nivel)
+    ic_spearman = _intervalo(spearman, nivel)
+    correlacoes = pd.DataFrame({
+        "Metric": metricas,
+        "Pearson_CI_low": ic_pearson[0], "Pearson_CI_high": ic_pearson[1],
+        "Spearman_CI_low": ic_spearman[0], "Spearman_CI_high": ic_spearman[1],
+        "Pearson_perm_p-value": (1 + extremos_pearson) / (1 + reamostragens),
+        "Spearman_perm_p-value": (1 + extremos_spearman) / (1 + reamostragens),
+    })
+
+    def escala_original(betas):
+        # b_j = beta_j / desvio_j e a constante absorve as médias
+        escala = betas[:, 1:] / desvios
+        return np.column_stack([betas[:, 0] - escala @ medias, escala])
+
+    estimativa = escala_original(_coeficientes_ponderados(np.ones((1, n)), X, x))[0]
+    ic = _intervalo(escala_original(coeficientes), nivel)
+    coeficientes_df = pd.DataFrame({
+        "Variable": ["const", *preditores],
+        "Coefficient": estimativa,
+        "CI_low": ic[0], "CI_high": ic[1],
+    })
+
+    logging.info(f"🎲 Bootstrap de '{variavel}': {reamostragens} reamostragens e permutações em {fragmentos} fragmento(s).")
+    return correlacoes, coeficientes_df
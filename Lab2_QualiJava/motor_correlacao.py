@@ -0,0 +1,87 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata, t as dist_t
+
+# 🔗 Motor de correlação da análise.
+#
+# Pearson e Spearman de todos os pares de colunas saem de poucas operações matriciais: as
+# colunas são padronizadas e multiplicadas (Z.T @ Z); para o Spearman, cada coluna é ranqueada
+# uma única vez (empates recebem o posto médio) e passa pelo mesmo cálculo. Os p-valores usam
+# a estatística t com n - 2 graus de liberdade, a mesma de `pearsonr` e `spearmanr` do SciPy.
+# O resultado fica em cache pelo hash do conteúdo do DataFrame, então todas as questões de
+# pesquisa compartilham um único cálculo.
+
+_cache = {}
+
+def hash_dados(df):
+    """Hash do conteúdo (valores, índice e nomes das colunas) de um DataFrame."""
+    sha = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    sha.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    return sha.hexdigest()
+
+def _correlacao_colunas(matriz):
+    """Matriz de correlação de Pearson entre as colunas de um array 2D sem NaN."""
+    centrada = matriz - matriz.mean(axis=0)
+    normas = np.sqrt((centrada ** 2).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        padronizada = centrada / normas
+        r = padronizada.T @ padronizada
+    np.clip(r, -1.0, 1.0, out=r)
+    np.fill_diagonal(r, np.where(normas > 0, 1.0, np.nan))
+    return r
+
+def _p_valores(r, n):
+    """P-valor bicaudal de H0: r = 0, pela estatística t com n - 2 graus de liberdade."""
+    if n < 3:
+        return np.full_like(r, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        estatistica = r * np.sqrt((n - 2) / (1 - r ** 2))
+    p = 2 * dist_t.sf(np.abs(estatistica), n - 2)
+    p[np.abs(r) == 1] = 0.0
+    return p
+
+def matrizes_correlacao(df):
+    """
+    🔗 Pearson e Spearman de todos os pares de colunas de `df` (numérico, sem NaN).
+
+    Retorna um dicionário com os DataFrames "pearson", "pearson_p", "spearman" e "spearman_p".
+    Chamadas repetidas com o mesmo conteúdo devolvem o resultado em cache.
+    """
+    chave = hash_dados(df)
+    if chave in _cache:
+        return _cache[chave]
+
+    valores = df.to_numpy(dtype=np.float64)
+    n = len(valores)
+    postos = rankdata(valores, axis=0)
+
+    pearson = _correlacao_colunas(valores)
+    spearman = _correlacao_colunas(postos)
+
+    def quadro(matriz):
+        return pd.DataFrame(matriz, index=df.columns, columns=df.columns)
+
+    resultado = {
+        "pearson": quadro(pearson),
+        "pearson_p": quadro(_p_valores(pearson, n)),
+        "spearman": quadro(spearman),
+        "spearman_p": quadro(_p_valores(spearman, n)),
+    }
+    _cache[chave] = resultado
+    return resultado
+
+def correlacoes_com(df, variavel, metricas):
+    """
+    Tabela das correlações de `variavel` com cada métrica, no formato dos CSVs das RQs:
+    colunas Metric, Pearson_Coefficient, Pearson_p-value, Spearman_Coefficient, Spearman_p-value.
+    """
+    matrizes = matrizes_correlacao(df)
+    return pd.DataFrame({
+        "Metric": list(metricas),
+        "Pearson_Coefficient": matrizes["pearson"].loc[metricas, variavel].to_numpy(),
+        "Pearson_p-value": matrizes["pearson_p"].loc[metricas, variavel].to_numpy(),
+        "Spearman_Coefficient": matrizes["spearman"].loc[metricas, variavel].to_numpy(),
+        "Spearman_p-value": matrizes["spearman_p"].loc[metricas, variavel].to_numpy(),
+    })
@@ -0,0 +1,172 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # sem janelas: as figuras só são salvas em arquivo
+import matplotlib.pyplot as plt
+from matplotlib.cbook import boxplot_stats
+from scipy.stats import gaussian_kde, t as dist_t
+
+# 🖼️ Motor de figuras da análise.
+#
+# Cada painel (histograma, boxplot, dispersão com regressão) é calculado uma única vez no
+# processo principal: bins, KDE, estatísticas do boxplot, reta ajustada e banda de confiança.
+# O resultado é um dicionário simples, que é desenhado pela mesma função tanto na figura
+# individual quanto na composta. Os arquivos são renderizados em paralelo num pool de
+# processos com o backend Agg; nada bloqueia esperando uma janela.
+
+DPI_FIGURAS = 300
+PROCESSOS_FIGURAS = os.cpu_count() or 1
+PONTOS_CURVA = 200
+NIVEL_CONFIANCA = 0.95
+TAMANHO_INDIVIDUAL = (8, 6)
+
+def bins_sturges(n):
+    return int(np.ceil(1 + np.log2(n))) if n > 0 else 1
+
+def preparar_histograma(valores, titulo, rotulo_x, rotulo_y="Frequência"):
+    """Histograma (regra de Sturges) com a KDE já escalada para contagens."""
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[~np.isnan(valores)]
+    contagens, bordas = np.histogram(valores, bins=bins_sturges(len(valores)))
+    painel = histograma_de_contagens(contagens, bordas, titulo, rotulo_x, rotulo_y)
+
+    if len(valores) > 1 and np.ptp(valores) > 0:
+        kde_x = np.linspace(bordas[0], bordas[-1], PONTOS_CURVA)
+        painel.update(kde_x=kde_x, kde_y=gaussian_kde(valores)(kde_x) * len(valores) * (bordas[1] - bordas[0]))
+    return painel
+
+def histograma_de_contagens(contagens, bordas, titulo, rotulo_x, rotulo_y="Frequência"):
+    """Histograma a partir de contagens já calculadas (ex.: acumuladas lote a lote), sem KDE."""
+    return {
+        "tipo": "histograma", "titulo": titulo, "rotulo_x": rotulo_x, "rotulo_y": rotulo_y,
+        "contagens": np.asarray(contagens), "bordas": np.asarray(bordas), "kde_x": None, "kde_y": None
+    }
+
+def preparar_boxplot(valores, titulo, rotulo_x, escala_log=False):
+    """Estatísticas do boxplot (quartis, bigodes, outliers) calculadas uma vez."""
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[~np.isnan(valores)]
+    return {
+        "tipo": "boxplot", "titulo": titulo, "rotulo_x": rotulo_x, "escala_log": escala_log,
+        "estatisticas": boxplot_stats(valores)
+    }
+
+def preparar_regressao(x, y, titulo, rotulo_x, rotulo_y, nivel=NIVEL_CONFIANCA):
+    """Dispersão com reta de mínimos quadrados e banda de confiança (analítica) da média."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+
+    painel = {
+        "tipo": "regressao", "titulo": titulo, "rotulo_x": rotulo_x, "rotulo_y": rotulo_y,
+        "x": x, "y": y, "linha_x": None, "linha_y": None, "banda_inf": None, "banda_sup": None
+    }
+    n = len(x)
+    if n < 3 or np.ptp(x) == 0:
+        return painel
+
+    media_x = x.mean()
+    sxx = ((x - media_x) ** 2).sum()
+    inclinacao = ((x - media_x) * (y - y.mean())).sum() / sxx
+    intercepto = y.mean() - inclinacao * media_x
+    residuos = y - (intercepto + inclinacao * x)
+    erro_padrao = np.sqrt((residuos ** 2).sum() / (n - 2))
+
+    linha_x = np.linspace(x.min(), x.max(), PONTOS_CURVA)
+    linha_y = intercepto + inclinacao * linha_x
+    margem = dist_t.ppf((1 + nivel) / 2, n - 2) * erro_padrao * np.sqrt(1 / n + (linha_x - media_x) ** 2 / sxx)
+    painel.update(linha_x=linha_x, linha_y=linha_y, banda_inf=linha_y - margem, banda_sup=linha_y + margem)
+    return painel
+
+def desenhar_painel(ax, painel):
+    """Desenha um painel já calculado num eixo do matplotlib."""
+    if painel["tipo"] == "histograma":
+        contagens, bordas = painel["contagens"], painel["bordas"]
+        barras = ax.bar(bordas[:-1], contagens, width=np.diff(bordas), align="edge",
+                        color="C0", edgecolor="black", alpha=0.7)
+        if painel["kde_x"] is not None:
+            ax.plot(painel["kde_x"], painel["kde_y"], color="C0", lw=1.5)
+        for barra, altura in zip(barras, contagens):
+            if altura > 0:  # Evita mostrar valores para barras vazias
+                ax.text(barra.get_x() + barra.get_width() / 2, altura + 5, f"{int(altura)}",
+                        ha="center", va="bottom", fontsize=9)
+        ax.set_ylabel(painel["rotulo_y"])
+
+    elif painel["tipo"] == "boxplot":
+        ax.bxp(painel["estatisticas"], vert=False, showfliers=True, patch_artist=True,
+               boxprops={"facecolor": "C0", "alpha": 0.7})
+        ax.set_yticks([])
+        if painel["escala_log"]:
+            ax.set_xscale("log")
+
+    elif painel["tipo"] == "regressao":
+        ax.scatter(painel["x"], painel["y"], s=100, alpha=0.7)
+        if painel["linha_x"] is not None:
+            ax.fill_between(painel["linha_x"], painel["banda_inf"], painel["banda_sup"], color="red", alpha=0.15)
+            ax.plot(painel["linha_x"], painel["linha_y"], color="red", lw=2)
+        ax.set_ylabel(painel["rotulo_y"])
+
+    ax.set_title(painel["titulo"])
+    ax.set_xlabel(painel["rotulo_x"])
+
+def renderizar_arquivo(tarefa):
+    """Renderiza uma tarefa {"arquivo", "paineis", "grade", "tamanho"} e devolve o caminho salvo."""
+    linhas, colunas = tarefa["grade"]
+    fig, eixos = plt.subplots(linhas, colunas, figsize=tarefa["tamanho"], squeeze=False)
+    eixos = eixos.ravel()
+    for ax, painel in zip(eixos, tarefa["paineis"]):
+        desenhar_painel(ax, painel)
+    for ax in eixos[len(tarefa["paineis"]):]:
+        ax.set_visible(False)
+
+    fig.tight_layout()
+    fig.savefig(tarefa["arquivo"], dpi=tarefa.get("dpi", DPI_FIGURAS), bbox_inches="tight")
+    plt.close(fig)
+    return tarefa["arquivo"]
+
+class Figuras:
+    """
+    🖼️ Fila de figuras da análise.
+
+    `individual` agenda um painel num arquivo próprio; `composta` agenda vários painéis numa
+    grade. O mesmo painel calculado pode entrar nos dois. `renderizar` salva tudo em paralelo.
+    """
+    def __init__(self, pasta, dpi=DPI_FIGURAS):
+        self.pasta = pasta
+        self.dpi = dpi
+        self.tarefas = []
+
+    def individual(self, nome_arquivo, painel, tamanho=TAMANHO_INDIVIDUAL):
+        self.tarefas.append({
+            "arquivo": os.path.join(self.pasta, nome_arquivo), "paineis": [painel],
+            "grade": (1, 1), "tamanho": tamanho, "dpi": self.dpi
+        })
+
+    def composta(self, nome_arquivo, paineis, grade, tamanho):
+        self.tarefas.append({
+            "arquivo": os.path.join(self.pasta, nome_arquivo), "paineis": list(paineis),
+            "grade": grade, "tamanho": tamanho, "dpi": self.dpi
+        })
+
+    def renderizar(self, processos=PROCESSOS_FIGURAS):
+        """Salva todas as figuras agendadas e esvazia a fila. Retorna a lista de arquivos."""
+        tarefas, self.tarefas = self.tarefas, []
+        if not tarefas:
+            return []
+
+        os.makedirs(self.pasta, exist_ok=True)
+        processos = min(processos, len(tarefas))
+        logging.info(f"🖼️ Renderizando {len(tarefas)} figura(s) com {processos} processo(s)...")
+        if processos <= 1:
+            arquivos = [renderizar_arquivo(tarefa) for tarefa in tarefas]
+        else:
+            # Tarefas maiores primeiro, para não sobrar uma figura composta no fim da fila
+            tarefas.sort(key=lambda tarefa: len(tarefa["paineis"]), reverse=True)
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                arquivos = list(executor.map(renderizar_arquivo, tarefas))
+        logging.info(f"✅ {len(arquivos)} figura(s) salvas em {self.pasta}")
+        return arquivos
@@ -0,0 +1,214 @@
+import os
+import logging
+import argparse
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from automacao_clone import (
+    clonar_repositorio, repositorio_clonado_completo, remove_readonly, criar_escalonador,
+    obter_head_remoto, MODO_CLONE, MODOS_CLONE, REPOS_DIR
+)
+from cache_analise import obter_tree_sha
+from coletar_dados import (
+    coletar_metricas_repositorio, salvar_resultados, JournalColeta, calcular_workers_ck, criar_sandboxes_ck, encerrar_sandboxes_ck,
+    REPOS_LIST_FILE
+)
+
+# Os módulos importados configuram o próprio log; aqui o pipeline usa um arquivo dedicado
+for handler in logging.root.handlers[:]:
+    logging.root.removeHandler(handler)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(script_dir, "Relatórios")
+LOG_FILE = os.path.join(LOG_DIR, "pipeline_streaming.log")
+os.makedirs(LOG_DIR, exist_ok=True)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)-8s - %(message)s",
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler(LOG_FILE, encoding="utf-8")
+    ]
+)
+
+# Quantidade máxima de repositórios "em voo" (clonados e ainda não analisados/removidos).
+# O pico de disco passa a ser proporcional a esse valor, e não ao total de repositórios.
+MAX_EM_VOO = 4
+CLONADORES = 2
+
+def pipeline_streaming(max_em_voo=MAX_EM_VOO, clonadores=CLONADORES, modo=MODO_CLONE, remover_clones=True, workers_ck=None, reiniciar=False):
+    """
+    ⚡ Clona, analisa (CK + LOC) e remove cada repositório em fluxo contínuo.
+
+    Os clonadores só iniciam um novo clone quando há vaga (no máximo `max_em_voo` repositórios
+    em disco ao mesmo tempo) e entregam os clones numa fila limitada. A análise consome a fila
+    enquanto os próximos clones já estão em andamento, com até `workers_ck` CKs em paralelo
+    (cada um na sua pasta temporária). Clones que já existiam em `Repos/` antes
+    da execução são reaproveitados e nunca removidos.
+
+    Clones e CKs passam pelo escalonador de recursos: sob pressão de memória, disco ou CPU a
+    concorrência diminui ou pausa, e volta quando há folga. Com o disco crítico a clonagem pausa;
+    clones mantidos (`remover_clones=False`) nunca são apagados para liberar espaço.
+
+    Os resultados vão para o mesmo journal de `coletar_dados`: repositórios já coletados na
+    mesma versão (árvore do clone local ou, sem clone, HEAD remoto via `git ls-remote`) não são
+    nem clonados, e uma execução interrompida continua de onde parou.
+    """
+    logging.info("===== ⚡ INICIANDO PIPELINE STREAMING (CLONAR → CK → LOC → LIMPAR) =====")
+    workers_ck = workers_ck or calcular_workers_ck()
+    logging.info(f"🔧 Em voo: {max_em_voo} | Clonadores: {clonadores} | Workers CK: {workers_ck} | Modo de clone: {modo} | Remover clones: {remover_clones}")
+    if max_em_voo < workers_ck:
+        logging.warning(f"⚠️ Em voo ({max_em_voo}) menor que os workers CK ({workers_ck}): parte dos workers ficará ociosa.")
+    inicio = time.time()
+
+    if not os.path.exists(REPOS_LIST_FILE):
+        raise FileNotFoundError(f"📄 Lista de repositórios não encontrada: {REPOS_LIST_FILE}")
+
+    os.makedirs(REPOS_DIR, exist_ok=True)
+    df_repos = pd.read_csv(REPOS_LIST_FILE)
+    total_repos = len(df_repos)
+    journal = JournalColeta(reiniciar=reiniciar)
+    if journal.resultados:
+        logging.info(f"📓 Journal com {len(journal.resultados)} repositório(s) já coletado(s). Os que não mudaram serão pulados.")
+
+    vagas = threading.BoundedSemaphore(max_em_voo)
+    fila = queue.Queue(maxsize=max_em_voo)
+
+    aviso_disco = threading.Event()
+
+    def avisar_disco_critico():
+        # Os clones mantidos são resultado pedido pelo usuário: só avisa, sem liberar nada
+        if not aviso_disco.is_set():
+            aviso_disco.set()
+            logging.warning(f"🛑 Disco crítico com --manter-clones: a clonagem fica pausada até haver espaço livre. "
+                            f"Os clones mantidos em {REPOS_DIR} não são removidos; libere espaço manualmente.")
+        return 0
+
+    escalonador = criar_escalonador(None if remover_clones else avisar_disco_critico)
+    controle_clone = escalonador.controle("Clonagem", clonadores, consome_disco=True, consome_memoria=False)
+    # O CK já é dimensionado para ocupar a CPU: só memória o reduz
+    controle_ck = escalonador.controle("Análise CK", workers_ck, consome_cpu=False)
+
+    def clonar(idx, row):
+        # Toda chamada entrega exatamente um item na fila: o consumidor faz um fila.get() por linha
+        log_prefix = f"({idx + 1:02}/{total_repos})"
+        padding = ' ' * len(log_prefix)
+        repo_name = str(row.get("clone_url", "")).strip().split('/')[-1].replace('.git', '')
+        vaga_ocupada = False
+        try:
+            repo_url = row["clone_url"].strip()
+            repo_path = os.path.join(REPOS_DIR, repo_name)
+            if repo_name in journal.resultados:
+                if repositorio_clonado_completo(repo_path):
+                    atualizado = journal.concluido(repo_name, tree_sha=obter_tree_sha(repo_path))
+                else:
+                    atualizado = journal.concluido(repo_name, head_sha=obter_head_remoto(repo_url))
+                if atualizado:
+                    logging.info(f"{log_prefix} ⏭️ Já coletado (journal, mesma versão): \033[92m{repo_name}\033[0m")
+                    fila.put((idx, row, None, False))
+                    return
+
+            vagas.acquire()
+            vaga_ocupada = True
+            # A partir do fila.put com o clone, a vaga passa a ser liberada por `analisar`
+            if repositorio_clonado_completo(repo_path):
+                fila.put((idx, row, repo_path, False))
+                return
+            if os.path.exists(repo_path):
+                shutil.rmtree(repo_path, onexc=remove_readonly)
+            with controle_clone:
+                clonado = clonar_repositorio(repo_url, repo_name, repo_path, padding, modo)
+            if clonado:
+                fila.put((idx, row, repo_path, True))
+                return
+            logging.error(f"{padding} ❌ Falha ao clonar \033[35m{repo_name}\033[0m. Pulando...")
+        except Exception as e:
+            logging.error(f"{padding} ❌ Erro inesperado ao preparar \033[35m{repo_name}\033[0m: {e}")
+        if vaga_ocupada:
+            vagas.release()
+        fila.put((idx, row, None, False))
+
+    sandboxes = criar_sandboxes_ck(workers_ck)
+
+    def analisar(idx, row, repo_path, clonado_agora):
+        # Recebe a vaga ocupada em `clonar` e a libera no fim, aconteça o que acontecer
+        idx_display = f"{idx+1:02}"
+        log_prefix = f"({idx_display}/{total_repos})"
+        padding = ' ' * len(log_prefix)
+        repo_name = os.path.basename(repo_path)
+
+        ck_adquirido = False
+        sandbox = None
+        try:
+            repo_url, created_at = row["clone_url"].strip(), row["created_at"].strip()
+            controle_ck.adquirir()
+            ck_adquirido = True
+            logging.info(f"{log_prefix} \033[4m\033[96m📂 Analisando: \033[1m{repo_name}\033[0m")
+            sandbox = sandboxes.get()
+            temp_ck_dir, servidor_ck = sandbox
+            resultado = coletar_metricas_repositorio(
+                repo_name, repo_url, repo_path, created_at,
+                row.get("stars", 0), row.get("releases", 0), idx_display, total_repos, temp_ck_dir, servidor_ck
+            )
+            if resultado is not None:
+                contador = journal.registrar(resultado)
+                logging.info(f"{padding} ✅ Dados coletados: \033[92m{repo_name}\033[0m (Total: {contador})")
+        except Exception as e:
+            logging.error(f"{padding} ❌ Erro ao analisar \033[92m{repo_name}\033[0m: {e}")
+        finally:
+            if sandbox is not None:
+                sandboxes.put(sandbox)
+            if ck_adquirido:
+                controle_ck.liberar()
+            try:
+                if remover_clones and clonado_agora:
+                    shutil.rmtree(repo_path, onexc=remove_readonly)
+                    logging.info(f"{padding} 🧹 Clone removido: \033[92m{repo_name}\033[0m")
+            except OSError as e:
+                logging.warning(f"{padding} ⚠️ Não foi possível remover o clone de \033[92m{repo_name}\033[0m: {e}")
+            finally:
+                vagas.release()
+
+    try:
+        with escalonador, ThreadPoolExecutor(max_workers=clonadores) as clonagem, ThreadPoolExecutor(max_workers=workers_ck) as analise:
+            for idx, row in df_repos.iterrows():
+                clonagem.submit(clonar, idx, row)
+
+            for _ in range(total_repos):
+                idx, row, repo_path, clonado_agora = fila.get()
+                if repo_path is not None:
+                    analise.submit(analisar, idx, row, repo_path, clonado_agora)
+    finally:
+        encerrar_sandboxes_ck(sandboxes)
+
+    resultados = journal.materializar(df_repos)
+    salvar_resultados(resultados)
+
+    fim = time.time()
+    logging.info(f"🎯 Pipeline streaming finalizado em {fim - inicio:.0f}s! Total coletado: {len(resultados)} de {total_repos}")
+    if len(resultados) < total_repos:
+        logging.warning(f"⚠️ Apenas {len(resultados)} repositórios coletados. Esperado: {total_repos}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline streaming: clonar → CK → LOC → limpar")
+    parser.add_argument("--max-em-voo", type=int, default=MAX_EM_VOO,
+                        help="Máximo de repositórios clonados aguardando/em análise (padrão: %(default)s)")
+    parser.add_argument("--clonadores", type=int, default=CLONADORES,
+                        help="Quantidade de clones simultâneos (padrão: %(default)s)")
+    parser.add_argument("--modo-clone", choices=MODOS_CLONE, default=MODO_CLONE,
+                        help="Estratégia de clonagem (padrão: %(default)s)")
+    parser.add_argument("--manter-clones", action="store_true",
+                        help="Não remove os clones após a análise")
+    parser.add_argument("--workers-ck", type=int, default=None,
+                        help="Quantidade de CKs em paralelo (padrão: calculado a partir de CPU e memória)")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Ignora o journal e processa todos os repositórios novamente")
+    args = parser.parse_args()
+
+    pipeline_streaming(args.max_em_voo, args.clonadores, args.modo_clone, not args.manter_clones, args.workers_ck, args.reiniciar)
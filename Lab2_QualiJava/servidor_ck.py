@@ -0,0 +1,138 @@
+import os
+import queue
+import logging
+import subprocess
+import threading
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+JAVA_DIR = os.path.join(BASE_DIR, 'java')
+FONTE_SERVIDOR = os.path.join(JAVA_DIR, 'CKServidor.java')
+CLASSES_DIR = os.path.join(JAVA_DIR, 'classes')
+
+# Reinicia a JVM periodicamente para não acumular estado/memória do CK entre repositórios
+MAX_ANALISES_POR_JVM = 200
+INICIALIZACAO_TIMEOUT = 60
+
+_compilacao_lock = threading.Lock()
+
+def compilar_servidor_ck(ck_jar):
+    """
+    ☕ Compila o CKServidor.java (uma única vez) contra o ck.jar.
+
+    Retorna True se a classe está pronta para uso, False se o javac não estiver disponível ou a
+    compilação falhar — nesse caso o chamador volta a usar `java -jar ck.jar` por repositório.
+    """
+    classe = os.path.join(CLASSES_DIR, 'CKServidor.class')
+    with _compilacao_lock:
+        if os.path.exists(classe) and os.path.getmtime(classe) >= os.path.getmtime(FONTE_SERVIDOR):
+            return True
+        os.makedirs(CLASSES_DIR, exist_ok=True)
+        try:
+            result = subprocess.run(
+                ['javac', '-encoding', 'UTF-8', '-cp', ck_jar, '-d', CLASSES_DIR, FONTE_SERVIDOR],
+                capture_output=True, text=True
+            )
+        except FileNotFoundError:
+            logging.warning("⚠️ javac não encontrado. O CK será executado com uma JVM por repositório.")
+            return False
+        if result.returncode != 0:
+            logging.warning(f"⚠️ Falha ao compilar o servidor CK. Usando uma JVM por repositório: {result.stderr.strip()}")
+            return False
+        return True
+
+class ServidorCK:
+    """
+    ☕ Mantém uma JVM do CK aquecida e envia repositórios para ela pelo stdin.
+
+    Cada pedido é uma linha "repo\\tpasta_saida/" e cada resposta uma linha "OK" ou "ERRO ...".
+    A JVM é (re)iniciada sob demanda: após uma queda, um timeout ou a cada
+    `max_analises` repositórios.
+
+    :param ck_jar: caminho do ck.jar.
+    :param jvm_args: argumentos extras da JVM (heap, limite de threads...).
+    :param timeout: tempo máximo, em segundos, para analisar um repositório.
+    """
+    def __init__(self, ck_jar, jvm_args=None, timeout=300, max_analises=MAX_ANALISES_POR_JVM):
+        self.ck_jar = ck_jar
+        self.jvm_args = list(jvm_args or [])
+        self.timeout = timeout
+        self.max_analises = max_analises
+        self.processo = None
+        self.respostas = None
+        self.analises = 0
+
+    def iniciar(self):
+        comando = ['java', *self.jvm_args, '-cp', os.pathsep.join([self.ck_jar, CLASSES_DIR]), 'CKServidor']
+        try:
+            self.processo = subprocess.Popen(
+                comando, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                text=True, encoding='utf-8', bufsize=1
+            )
+        except FileNotFoundError:
+            raise RuntimeError("java não encontrado para iniciar o servidor CK.")
+        self.respostas = queue.Queue()
+        threading.Thread(target=self._ler_respostas, args=(self.processo, self.respostas), daemon=True).start()
+        self.analises = 0
+
+        if self._aguardar_resposta(INICIALIZACAO_TIMEOUT) != "PRONTO":
+            self.encerrar()
+            raise RuntimeError("Servidor CK não respondeu na inicialização.")
+
+    @staticmethod
+    def _ler_respostas(processo, respostas):
+        for linha in processo.stdout:
+            respostas.put(linha.rstrip('\n'))
+        respostas.put(None)  # EOF: a JVM terminou
+
+    def _aguardar_resposta(self, timeout):
+        try:
+            return self.respostas.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def ativo(self):
+        return self.processo is not None and self.processo.poll() is None
+
+    def analisar(self, repo_path, output_dir):
+        """Executa o CK em `repo_path` gravando os CSVs em `output_dir`. Retorna True em caso de sucesso."""
+        if not self.ativo() or self.analises >= self.max_analises:
+            self.encerrar()
+            self.iniciar()
+
+        # O CK concatena a pasta de saída com o nome dos arquivos, por isso a barra final
+        pasta_saida = os.path.join(os.path.abspath(output_dir), '')
+        try:
+            self.processo.stdin.write(f"{os.path.abspath(repo_path)}\t{pasta_saida}\n")
+            self.processo.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self.encerrar()
+            return False
+
+        resposta = self._aguardar_resposta(self.timeout)
+        self.analises += 1
+
+        if resposta == "OK":
+            return True
+        if resposta is None:
+            # Timeout ou queda da JVM: descarta o processo, o próximo pedido inicia outro
+            logging.warning(f"⚠️ Servidor CK sem resposta para {repo_path}. Reiniciando a JVM...")
+            self.encerrar(forcar=True)
+        else:
+            logging.warning(f"⚠️ Servidor CK: {resposta}")
+        return False
+
+    def encerrar(self, forcar=False):
+        if self.processo is None:
+            return
+        if forcar:
+            self.processo.kill()
+            self.processo.wait()
+            self.processo = None
+            return
+        try:
+            self.processo.stdin.close()
+            self.processo.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.processo.kill()
+            self.processo.wait()
+        self.processo = None
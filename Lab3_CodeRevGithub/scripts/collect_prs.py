@@ -1,24 +1,24 @@
-import json
-from github import Github
 import os
 import time
 from statistics import mean, median
 import pandas as pd
-import requests
 from tqdm import tqdm
-import random
 import sys
+import queue
 import shutil
-import contextlib
-import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
 from config_token import configurar_token
+from graphql_api import run_graphql, parse_github_datetime, GraphQLError, SERVER_ERRORS
+from pr_store import STORE_FILE, add_repo_prs, remove_repos, collected_keys, load_prs, import_previous, export_prs
 
 BASE_DIR = os.path.join("Lab3_CodeRevGithub", "Lab3S03")
 DATA_DIR = os.path.join(BASE_DIR, "data")
 REPO_FILE = os.path.join(DATA_DIR, "selected_repos.csv")
 COLLECTED_FILE = os.path.join(DATA_DIR, "collected_prs.csv")
+# Repositórios coletados ao mesmo tempo (a espera é quase toda de rede; o rate limit é compartilhado)
+COLETA_WORKERS = int(os.environ.get("LAB3_COLETA_WORKERS", 16))
 os.makedirs(DATA_DIR, exist_ok=True)
 
 def format_seconds(seconds):
@@ -40,217 +40,206 @@ def mover_pycache(destino="Lab3_CodeRevGithub/Lab3S03/__pycache__"):
             shutil.rmtree(origem)
             tqdm.write(f"📦 Pycache movido para: {destino}")
 
-def handle_error_and_rate_limit(g, error=None, fallback_wait=600, max_wait=1800):
-    wait_seconds = None
-    status_info = ""
-    handled = False
-
-    try:
-        if isinstance(error, Exception):
-            status_info = f"{type(error).__name__} — {error}"
-
-            # Verifica se é uma exceção do PyGithub com headers
-            if hasattr(error, 'status') or hasattr(error, 'status_code'):
-                status_code = getattr(error, 'status', None) or getattr(error, 'status_code', None)
-                if status_code == 403:
-                    try:
-                        core = g.get_rate_limit().core
-                        remaining = core.remaining
-                        reset_timestamp = core.reset.timestamp()
-                        now = time.time()
-
-
-
-                        if remaining == 0:
-                            wait_seconds = max(int(reset_timestamp - now + 10), 10)
-                        else:
-                            wait_seconds = random.randint(fallback_wait, max_wait)
-
-                        handled = True
-                    except Exception as fallback_check:
-                        status_info += f" | Erro ao checar rate limit: {fallback_check}"
-                        wait_seconds = random.randint(fallback_wait, max_wait)
-                        handled = True
-
-
-            # Trata timeout, conexão recusada, e erros comuns de rede
-            elif isinstance(error, (
-                ConnectionError,
-                TimeoutError,
-                OSError,
-                requests.exceptions.RequestException,
-                requests.exceptions.ConnectionError,
-                requests.exceptions.HTTPError,
-                requests.exceptions.Timeout,
-                requests.exceptions.TooManyRedirects,
-            )):
-                wait_seconds = random.randint(60, 180)
-                handled = True
-
-
-            # Catch-all para outros erros — imprime stacktrace para depuração
-            else:
-                wait_seconds = random.randint(fallback_wait, max_wait)
-                handled = True
-
-    except Exception as e:
-        status_info = f"Erro ao lidar com erro: {type(e).__name__} — {e}"
-        wait_seconds = random.randint(fallback_wait, max_wait)
-        handled = True
-
-    if wait_seconds and handled:
-        if wait_seconds > max_wait:
-            wait_seconds = random.randint(fallback_wait, max_wait)
-
-        tqdm.write(f"\n⚠️ Erro: {status_info}")
-        tqdm.write(f"🚦 Limite de requisições da API atingido ou outro erro - Iniciando pausa temporária..")
-        tqdm.write(f"⏳ Estimativa de espera: {wait_seconds} segundos até a liberação de novas requisições...\n")
-        time.sleep(wait_seconds)
-        return True  # Pausou
-
-    return False  # Não pausou (não foi erro esperado)
-
-def collect_prs_from_repo(g, repo_name, min_valid_prs=100, max_valid_prs=None, max_pages=50):
+PRS_PER_PAGE = 50
+MIN_PRS_PER_PAGE = 10
+
+# Uma página de PRs fechados com tudo o que a coleta usa: contagens, datas e autores de comentários e reviews
+PR_PAGE_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String) {
+  rateLimit { cost remaining resetAt }
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: [MERGED, CLOSED], first: $first, after: $after, orderBy: {field: CREATED_AT, direction: DESC}) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number title body merged createdAt closedAt mergedAt
+        changedFiles additions deletions
+        author { login }
+        comments(first: 100) { totalCount pageInfo { hasNextPage endCursor } nodes { author { login } } }
+        reviews(first: 100) { totalCount pageInfo { hasNextPage endCursor } nodes { author { login } comments { totalCount } } }
+      }
+    }
+  }
+}
+"""
+
+# Páginas seguintes de comentários/reviews de um PR, para PRs com mais de 100 de cada
+PR_NESTED_FIELDS = {
+    "comments": "author { login }",
+    "reviews": "author { login } comments { totalCount }",
+}
+PR_NESTED_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $after: String) {{
+  rateLimit {{ cost remaining resetAt }}
+  repository(owner: $owner, name: $name) {{
+    pullRequest(number: $number) {{
+      {connection}(first: 100, after: $after) {{ pageInfo {{ hasNextPage endCursor }} nodes {{ {fields} }} }}
+    }}
+  }}
+}}
+"""
+
+def complete_pr_connections(token, owner, name, node):
+    """
+    Busca as páginas restantes de comentários e reviews de um nó de PR, acrescentando-as ao próprio nó.
+    Retorna False se alguma página não pôde ser buscada; o nó fica só com o que já foi carregado.
+    """
+    for connection, fields in PR_NESTED_FIELDS.items():
+        data = node[connection]
+        query = PR_NESTED_QUERY.format(connection=connection, fields=fields)
+        while data["pageInfo"]["hasNextPage"]:
+            variables = {"owner": owner, "name": name, "number": node["number"], "after": data["pageInfo"]["endCursor"]}
+            try:
+                result = run_graphql(token, query, variables)
+            except GraphQLError:
+                return False
+            pull_request = (result["data"].get("repository") or {}).get("pullRequest")
+            if pull_request is None:
+                return False
+            page = pull_request[connection]
+            data["nodes"].extend(page["nodes"])
+            data["pageInfo"] = page["pageInfo"]
+    return True
+
+def has_more_pr_connections(node):
+    return any(node[connection]["pageInfo"]["hasNextPage"] for connection in PR_NESTED_FIELDS)
+
+def pr_from_graphql(repo_name, node):
+    """Converte um nó de PR do GraphQL na linha do CSV, ou None se o PR não for válido."""
+    created_at = parse_github_datetime(node["createdAt"])
+    closed_at = parse_github_datetime(node["closedAt"])
+    if not closed_at:
+        return None
+
+    time_diff = closed_at - created_at
+    if time_diff.total_seconds() < 3600:
+        return None
+
+    reviews = node["reviews"]
+    if reviews["totalCount"] == 0:
+        return None
+
+    # Participantes entre os comentários e reviews carregados (todos, após complete_pr_connections)
+    participants = set()
+    for author in [node["author"]] + [c["author"] for c in node["comments"]["nodes"]] + [r["author"] for r in reviews["nodes"]]:
+        if author and author.get("login"):
+            participants.add(author["login"])
+
+    merged_at = parse_github_datetime(node["mergedAt"])
+    body = node["body"] or ""
+    return {
+        "repo_name": repo_name,
+        "pr_number": node["number"],
+        "title": node["title"],
+        "body": body,
+        "body_length": len(body),
+        "state": "closed",
+        "merged": node["merged"],
+        "created_at": created_at.isoformat(),
+        "closed_at": closed_at.isoformat(),
+        "merged_at": merged_at.isoformat() if merged_at else None,
+        "review_count": reviews["totalCount"],
+        "files_changed": node["changedFiles"],
+        "additions": node["additions"],
+        "deletions": node["deletions"],
+        "comments": node["comments"]["totalCount"],
+        "review_comments": sum(r["comments"]["totalCount"] for r in reviews["nodes"]),
+        "time_to_close_hours": time_diff.total_seconds() / 3600,
+        "participant_count": len(participants)
+    }
+
+def collect_prs_from_repo(token, repo_name, min_valid_prs=100, max_valid_prs=None, max_pages=50, position=None,
+                          known_prs=None):
+    """
+    Coleta os PRs fechados válidos (abertos por 1h ou mais e com ao menos uma review) de um repositório.
+
+    Cada página de até PRS_PER_PAGE PRs vem numa única consulta GraphQL, já com reviews, comentários,
+    arquivos e datas. Se a API recusar a página por ser pesada demais, o tamanho da página cai pela metade.
+    Comentários e reviews vêm de 100 em 100: PRs válidos com mais do que isso têm o restante buscado à
+    parte, para que participant_count e review_comments cubram a discussão inteira.
+    `position` fixa a linha da barra de progresso quando vários repositórios são coletados ao mesmo tempo.
+    `known_prs` são os números de PRs já armazenados: contam como válidos para os limites, mas não são
+    convertidos nem retornados de novo.
+
+    Retorna a lista de PRs novos ([] se o repositório não tem `min_valid_prs` válidos) ou None se a
+    coleta foi interrompida por um erro da API, para o repositório ser tentado de novo depois.
+    """
+    known_prs = known_prs or set()
     collected = []
-    try:
-        repo = g.get_repo(repo_name)
-        page = 0
-        valid_count = 0
-        analisados = 0
-
-        total_prs_fechados = repo.get_pulls(state="closed").totalCount
-
-        with tqdm(ncols=120, bar_format="    ⏳{l_bar}{bar}| {n_fmt} PRs válidos coletados", leave=True, total=total_prs_fechados) as pbar:
-            while page < max_pages:
-                prs = repo.get_pulls(state="closed", sort="created", direction="desc").get_page(page)
-
-                if not prs:
-                    break
-
-                for pr in prs:
-                    if max_valid_prs and valid_count >= max_valid_prs:
-                        break  # Limite máximo atingido
-
-                    analisados += 1
-                    try:
-                        if not pr.closed_at:
-                            continue
-
-                        time_diff = pr.closed_at - pr.created_at
-                        if time_diff.total_seconds() < 3600:
-                            continue
-
-                        with contextlib.redirect_stdout(io.StringIO()):
-                            reviews = list(pr.get_reviews())
-                        if not reviews:
-                            continue
-
-                        participants = set()
-                        if pr.user and pr.user.login:
-                            participants.add(pr.user.login)
-
-                        try:
-                            comments = list(pr.get_issue_comments())
-                        except:
-                            comments = list(pr.get_comments())
-
-                        for comment in comments:
-                            if comment.user and comment.user.login:
-                                participants.add(comment.user.login)
-                        for review in reviews:
-                            if review.user and review.user.login:
-                                participants.add(review.user.login)
-
-                        collected.append({
-                            "repo_name": repo_name,
-                            "pr_number": pr.number,
-                            "title": pr.title,
-                            "body": pr.body or "",
-                            "body_length": len(pr.body or ""),
-                            "state": pr.state,
-                            "merged": pr.merged,
-                            "created_at": pr.created_at.isoformat(),
-                            "closed_at": pr.closed_at.isoformat(),
-                            "merged_at": pr.merged_at.isoformat() if pr.merged_at else None,
-                            "review_count": len(reviews),
-                            "files_changed": pr.changed_files,
-                            "additions": pr.additions,
-                            "deletions": pr.deletions,
-                            "comments": pr.comments,
-                            "review_comments": pr.review_comments,
-                            "time_to_close_hours": time_diff.total_seconds() / 3600,
-                            "participant_count": len(participants)
-                        })
-
-                        valid_count += 1
-                        pbar.total = analisados
-                        pbar.update(1)
-
-                    except Exception as e:
-                        if handle_error_and_rate_limit(g, error=e):
-                            continue
-                        else:
-                            raise e
-
+    interrompida = False
+    owner, name = repo_name.split("/", 1)
+    page = 0
+    valid_count = 0
+    analisados = 0
+    cursor = None
+    per_page = PRS_PER_PAGE
+
+    with tqdm(ncols=120, bar_format="    ⏳{l_bar}{bar}| {n_fmt} PRs válidos coletados", desc=repo_name,
+              position=position, leave=position is None) as pbar:
+        while page < max_pages:
+            variables = {"owner": owner, "name": name, "first": per_page, "after": cursor}
+            try:
+                result = run_graphql(token, PR_PAGE_QUERY, variables)
+            except GraphQLError as e:
+                if e.status_code in SERVER_ERRORS and per_page > MIN_PRS_PER_PAGE:
+                    per_page = max(MIN_PRS_PER_PAGE, per_page // 2)
+                    tqdm.write(f"   ⚠️ Página pesada demais em '{repo_name}' ({e}). Tentando com {per_page} PRs por página...")
+                    continue
+                tqdm.write(f"   ⚠️ Erro ao consultar PRs de '{repo_name}': {e}")
+                interrompida = True
+                break
+
+            repository = result["data"].get("repository")
+            if repository is None:
+                tqdm.write(f"   ⚠️ Repositório '{repo_name}' não encontrado.")
+                interrompida = True
+                break
+
+            pull_requests = repository["pullRequests"]
+            if pbar.total is None:
+                pbar.total = pull_requests["totalCount"]
+
+            for node in pull_requests["nodes"]:
                 if max_valid_prs and valid_count >= max_valid_prs:
                     break  # Limite máximo atingido
-
-                page += 1
-
-        tqdm.write(f"   🔍 {valid_count} PRs válidos encontrados entre {analisados} PRs avaliados em '{repo_name}'")
-
-        if valid_count < min_valid_prs:
-            tqdm.write(f"⚠️ Apenas {valid_count} PRs válidos encontrados em '{repo_name}' — abaixo do mínimo ({min_valid_prs}).")
-            return []
-
-        return collected
-
-    except Exception as e:
-        if handle_error_and_rate_limit(g, error=e):
-            return []
-        else:
-            raise e
-
-# Função para salvar PRs coletados em CSV
-def save_prs_to_files(prs, file_path):
-    if not prs:
-        print("🔴 Nenhum PR válido coletado. Arquivos não foram salvos.")
-        return
-
-    # Define colunas e ordem lógica
-    selected = [
-        "repo_name", "pr_number", "title", "body", "language",
-        "created_at", "closed_at", "merged_at", "state", "merged",
-        "review_count", "files_changed", "additions", "deletions",
-        "comments", "review_comments", "time_to_close_hours", "participant_count"
-    ]
-    rows = [{k: r.get(k) for k in selected} for r in prs]
-    df = pd.DataFrame(rows)
-
-    # Limita o tamanho do body para facilitar leitura
-    df["body"] = df["body"].apply(
-        lambda x: (x[:300] + "...") if isinstance(x, str) and len(x) > 300 else x
-    )
-
-    print(f"\n   🧮 PRs consolidados atualmente: {len(prs)}")
-
-    try:
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-        # 👉 Diferente do save_repos: aqui **não removemos arquivos antigos**
-
-        # Salva CSV com separador ";"
-        df.to_csv(file_path, index=False, sep=";", encoding="utf-8")
-        print(f"       ✅ Arquivo CSV salvo em {file_path}")
-
-        # Salva como JSON
-        json_path = file_path.replace(".csv", ".json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(prs, f, indent=2, ensure_ascii=False)
-        print(f"       ✅ Arquivo JSON salvo em {json_path}")
-
-    except Exception as e:
-        print(f"🔴 Erro ao salvar os arquivos de PRs: {e}\n")
+                analisados += 1
+                if node["number"] in known_prs:
+                    valid_count += 1
+                    pbar.update(1)
+                    continue
+                pr = pr_from_graphql(repo_name, node)
+                # Discussões longas: participantes e review_comments precisam de todas as páginas
+                if pr and has_more_pr_connections(node):
+                    if complete_pr_connections(token, owner, name, node):
+                        pr = pr_from_graphql(repo_name, node)
+                    else:
+                        tqdm.write(f"   ⚠️ PR #{node['number']} de '{repo_name}': não foi possível buscar todos os "
+                                   f"comentários/reviews; participant_count e review_comments ficam limitados aos 100 primeiros.")
+                if pr:
+                    collected.append(pr)
+                    valid_count += 1
+                    pbar.update(1)
+
+            if max_valid_prs and valid_count >= max_valid_prs:
+                break  # Limite máximo atingido
+            if not pull_requests["pageInfo"]["hasNextPage"]:
+                break
+            cursor = pull_requests["pageInfo"]["endCursor"]
+            page += 1
+
+        pbar.total = analisados
+        pbar.refresh()
+
+    if interrompida:
+        return None
+
+    tqdm.write(f"   🔍 {valid_count} PRs válidos encontrados entre {analisados} PRs avaliados em '{repo_name}'")
+
+    if valid_count < min_valid_prs:
+        tqdm.write(f"⚠️ Apenas {valid_count} PRs válidos encontrados em '{repo_name}' — abaixo do mínimo ({min_valid_prs}).")
+        return []
+
+    return collected
 
 def load_repos(file_path, required_columns=None):
     if required_columns is None:
@@ -284,47 +273,98 @@ def load_repos(file_path, required_columns=None):
     return df
 
 
-def repo_has_valid_prs(collected_prs_df, repo_name, min_prs=100, max_prs=1000):
-    repo_data = collected_prs_df[collected_prs_df['repo_name'] == repo_name]
-    valid_prs = repo_data.dropna(subset=["pr_number", "title", "body", "state", "created_at", "closed_at"])
-    return min_prs <= valid_prs.shape[0] <= max_prs
+def count_valid_prs(collected_prs_df):
+    """{repo_name normalizado: PRs com os campos obrigatórios preenchidos}, numa única passada."""
+    valid_prs = collected_prs_df.dropna(subset=["pr_number", "title", "body", "state", "created_at", "closed_at"])
+    return valid_prs.groupby(valid_prs['repo_name'].astype(str).str.strip().str.lower()).size().to_dict()
 
-def compare_repositories(selected_repos_df, collected_prs_df, g):
+def repo_has_valid_prs(valid_counts, repo_name, min_prs=100, max_prs=1000):
+    return min_prs <= valid_counts.get(repo_name, 0) <= max_prs
+
+REPOS_POR_VALIDACAO = 50
+
+def montar_consulta_validacao(repos):
+    """Consulta com um alias `rN` por repositório, pedindo só o total de PRs (todos os estados)."""
+    declaracoes, campos, variaveis = [], [], {}
+    for i, repo_name in enumerate(repos):
+        owner, name = repo_name.split("/", 1)
+        declaracoes.append(f"$o{i}: String!, $n{i}: String!")
+        campos.append(f"\n        r{i}: repository(owner: $o{i}, name: $n{i}) {{ pullRequests {{ totalCount }} }}")
+        variaveis.update({f"o{i}": owner, f"n{i}": name})
+    consulta = f"query({', '.join(declaracoes)}) {{ rateLimit {{ remaining resetAt }}{''.join(campos)}\n}}"
+    return consulta, variaveis
+
+def validar_repositorios(token, repos, por_consulta=REPOS_POR_VALIDACAO):
+    """
+    🔎 Verifica, em consultas GraphQL de até `por_consulta` repositórios, se cada repositório existe e
+    quantos PRs ele tem. Retorna {repo: total de PRs}, com None para repositórios inexistentes,
+    inacessíveis ou que não puderam ser consultados (o motivo é informado).
+    """
+    totais = {}
+    pendentes = list(repos)
+    with tqdm(total=len(pendentes), ncols=120,
+              bar_format="    ⏳ {l_bar}{bar}| {n:03d}/{total:03d} {percentage:3.0f}% {remaining}",
+              leave=True, position=0) as pbar:
+        while pendentes:
+            lote = pendentes[:por_consulta]
+            consulta, variaveis = montar_consulta_validacao(lote)
+            try:
+                resultado = run_graphql(token, consulta, variaveis)
+            except GraphQLError as e:
+                if e.status_code in SERVER_ERRORS and por_consulta > 1:
+                    por_consulta = max(1, por_consulta // 2)
+                    continue
+                tqdm.write(f"   ⚠️ Erro ao verificar {len(lote)} repositório(s) ({lote[0]}...): {e}")
+                resultado = {"data": {}, "errors": []}
+
+            # NOT_FOUND é o caso esperado de repositório removido; outros erros são mostrados
+            for erro in resultado.get("errors") or []:
+                if erro.get("type") != "NOT_FOUND":
+                    tqdm.write(f"   ⚠️ {erro.get('type', 'ERRO')}: {erro.get('message', '')}")
+
+            for i, repo_name in enumerate(lote):
+                repositorio = resultado["data"].get(f"r{i}")
+                totais[repo_name] = repositorio["pullRequests"]["totalCount"] if repositorio else None
+            pendentes = pendentes[len(lote):]
+            pbar.update(len(lote))
+    return totais
+
+def compare_repositories(selected_repos_df, collected_prs_df, token):
     # Normaliza: converte para string, tira espaços e transforma para minúsculas
     selected_repos = selected_repos_df['full_name'].astype(str).str.strip().str.lower().tolist()
     collected_repos = collected_prs_df['repo_name'].astype(str).str.strip().str.lower().unique().tolist()
+    selected_set = set(selected_repos)
+    valid_counts = count_valid_prs(collected_prs_df)
 
     valid_repos = []
     invalid_repos = []
 
     tqdm.write("    🔍 Verificando Repositórios Selecionados...")
-    with tqdm(total=len(selected_repos), ncols=120, 
-              bar_format="    ⏳ {l_bar}{bar}| {n:03d}/{total:03d} {percentage:3.0f}% {remaining}",
-              leave=True, position=0) as pbar:
-        for repo_name in selected_repos:
-            try:
-                g.get_repo(repo_name)
-                valid_repos.append(repo_name)
-            except Exception:
-                invalid_repos.append(repo_name)
-            pbar.update(1)
+    # Uma única validação em lote responde existência e total de PRs de todos os selecionados
+    totais_prs = validar_repositorios(token, list(dict.fromkeys(selected_repos)))
+    for repo_name in selected_repos:
+        if totais_prs[repo_name] is None:
+            invalid_repos.append(repo_name)
+        else:
+            valid_repos.append(repo_name)
 
-    removed_repos = [repo for repo in collected_repos if repo not in selected_repos]
-    collected_in_selected = [repo for repo in collected_repos if repo in selected_repos]
+    removed_repos = [repo for repo in collected_repos if repo not in selected_set]
+    collected_in_selected = [repo for repo in collected_repos if repo in selected_set]
 
     complete_repos = []
     incomplete_repos = []
 
     for repo in collected_in_selected:
-        try:
-            total_prs_repo = g.get_repo(repo).get_pulls(state="all").totalCount
-            is_valid = repo_has_valid_prs(collected_prs_df, repo, min_prs=100, max_prs=total_prs_repo)
-            if is_valid:
-                complete_repos.append(repo)
-            else:
-                incomplete_repos.append(repo)
-        except Exception as e:
-            pass
+        total_prs_repo = totais_prs[repo]
+        if total_prs_repo is None:
+            continue  # Já listado entre os inválidos
+        if repo_has_valid_prs(valid_counts, repo, min_prs=100, max_prs=total_prs_repo):
+            complete_repos.append(repo)
+        else:
+            incomplete_repos.append(repo)
+
+    if invalid_repos:
+        tqdm.write(f"    ⚠️ {len(invalid_repos)} repositório(s) selecionado(s) não encontrado(s) ou inacessível(is): {', '.join(invalid_repos[:10])}")
 
     return complete_repos, incomplete_repos, len(removed_repos), len(collected_repos), len(collected_in_selected), valid_repos, invalid_repos, removed_repos
 
@@ -338,14 +378,13 @@ def filter_remaining_repos(selected_df, collected_df):
 
 def show_initial_info():
     tqdm.write(f"📁 Caminho dos repositórios: {REPO_FILE}")
-    tqdm.write(f"📁 Caminho dos PRs: {COLLECTED_FILE}\n")
+    tqdm.write(f"📁 Caminho dos PRs: {STORE_FILE} (exportados para {COLLECTED_FILE})\n")
     tqdm.write("-" * 120 + "\n")
 
 def summarize_collection_results(
     selected_repos_df, collected_prs_df,
     complete_repos, incomplete_repos,
-    repos_pendentes_set, removidos_set,
-    collected_file
+    repos_pendentes_set, removidos_set
 ):
     total_collected_repos = len(collected_prs_df["repo_name"].unique())
 
@@ -362,13 +401,12 @@ def summarize_collection_results(
     if not collected_prs_df.empty:
         selected_set_lower = set(selected_repos_df["full_name"].str.lower().str.strip())
         before = len(collected_prs_df)
-        collected_prs_df = collected_prs_df[
-            collected_prs_df["repo_name"].str.lower().str.strip().isin(selected_set_lower)
-        ].reset_index(drop=True)
+        manter = collected_prs_df["repo_name"].str.lower().str.strip().isin(selected_set_lower)
+        remove_repos(collected_prs_df.loc[~manter, "repo_name"].unique())
+        collected_prs_df = collected_prs_df[manter].reset_index(drop=True)
         after = len(collected_prs_df)
 
         if before != after:
-            collected_prs_df.to_csv(collected_file, index=False, encoding='utf-8')
             tqdm.write(f"🧹 PRs de repositórios não selecionados foram excluídos ({before - after} linhas removidas).")
 
     # 🔥 Limita o total de repositórios para no máximo 200
@@ -378,85 +416,99 @@ def summarize_collection_results(
         repos_a_manter = list(selected_repos_df["full_name"].str.lower().str.strip())[:200]
 
         antes = len(collected_prs_df)
-        collected_prs_df = collected_prs_df[
-            collected_prs_df["repo_name"].str.lower().str.strip().isin(repos_a_manter)
-        ].reset_index(drop=True)
+        manter = collected_prs_df["repo_name"].str.lower().str.strip().isin(repos_a_manter)
+        remove_repos(collected_prs_df.loc[~manter, "repo_name"].unique())
+        collected_prs_df = collected_prs_df[manter].reset_index(drop=True)
         depois = len(collected_prs_df)
 
-        collected_prs_df.to_csv(collected_file, index=False, encoding='utf-8')
         tqdm.write(f"✅ PRs filtrados para manter somente 200 repositórios. ({antes - depois} linhas removidas)")
 
     return collected_prs_df
 
-def filter_collected_repositories(selected_repos_df, collected_prs_df, output_path) -> pd.DataFrame:
+def filter_collected_repositories(selected_repos_df, collected_prs_df) -> pd.DataFrame:
+    """PRs já coletados dos repositórios selecionados, limitados aos 200 primeiros repositórios."""
     selected_repos_set = set(selected_repos_df['full_name'].str.lower().str.strip())
     filtered_collected_repos_df = collected_prs_df[
         collected_prs_df['repo_name'].str.lower().str.strip().isin(selected_repos_set)
     ]
-    filtered_collected_repos_df = filtered_collected_repos_df.drop_duplicates(subset=["repo_name"])
-    filtered_collected_repos_df = filtered_collected_repos_df.head(200)
-    filtered_collected_repos_df.to_csv(output_path, index=False, sep=";", encoding="utf-8")
-    return filtered_collected_repos_df
-
-# Carregamento dos arquivos CSV
-selected_repos_df = pd.read_csv(REPO_FILE, sep=";")
-collected_prs_df = pd.read_csv(COLLECTED_FILE, sep=";")
-
-# Chama a função para filtrar os repositórios coletados
-output_path = COLLECTED_FILE
-filtered_collected_repos_df = filter_collected_repositories(selected_repos_df, collected_prs_df, output_path)
-
-# Retorna o número de repositórios após a filtragem
-filtered_collected_repos_df['repo_name'].nunique(), output_path
+    primeiros_repos = filtered_collected_repos_df['repo_name'].drop_duplicates().head(200)
+    return filtered_collected_repos_df[filtered_collected_repos_df['repo_name'].isin(primeiros_repos)]
 
-
-def coletar_prs_dos_repos(remaining_repos, collected_file, g, incomplete_repos):
-    tqdm.write(f"\n📄 Coletando PRs dos repositórios restantes ({len(remaining_repos)})...")
+def coletar_prs_dos_repos(remaining_repos, token, incomplete_repos, known_prs=None, workers=COLETA_WORKERS):
+    """
+    Coleta até `workers` repositórios ao mesmo tempo. Os PRs de cada repositório são gravados uma vez
+    no armazenamento (pr_store) assim que a sua coleta termina, sem esperar pelos anteriores da lista;
+    só o log segue a ordem de `remaining_repos`. `known_prs` é o índice de `collected_keys()`; PRs já
+    presentes nele não são reprocessados.
+    """
+    known_prs = collected_keys() if known_prs is None else known_prs
+    incomplete_set = set(incomplete_repos)
+    workers = max(1, min(workers, len(remaining_repos)))
+    tqdm.write(f"\n📄 Coletando PRs dos repositórios restantes ({len(remaining_repos)}) com {workers} em paralelo...")
     total_prs_collected = 0
     repo_times = {}
 
-    collected_df = load_repos(collected_file)
-
-    for idx, repo_name in enumerate(remaining_repos):
-        tipo_coleta = "♻️  RECOLETA" if repo_name in incomplete_repos else "🆕 NOVO"
-        tqdm.write(f"\n🔄 {str(idx + 1).zfill(2)}/{len(remaining_repos)} Coletando PRs de repositório: {repo_name} ({tipo_coleta})")
+    # Cada coleta em andamento ocupa uma linha fixa para a sua barra de progresso
+    posicoes = queue.Queue()
+    for posicao in range(workers):
+        posicoes.put(posicao)
 
+    def coletar(idx, repo_name):
+        tipo_coleta = "♻️  RECOLETA" if repo_name in incomplete_set else "🆕 NOVO"
+        tqdm.write(f"🔄 {str(idx + 1).zfill(2)}/{len(remaining_repos)} Coletando PRs de repositório: {repo_name} ({tipo_coleta})")
+        posicao = posicoes.get()
         inicio = time.time()
         try:
-            prs = collect_prs_from_repo(g, repo_name, min_valid_prs=100)
+            prs = collect_prs_from_repo(token, repo_name, min_valid_prs=100, position=posicao if workers > 1 else None,
+                                        known_prs=known_prs.get(repo_name.strip().lower()))
         except Exception as e:
             tqdm.write(f"   ⚠️ Erro ao coletar PRs de '{repo_name}': {e}")
-            continue
-        fim = time.time()
-
-        tempo = fim - inicio
-        repo_times[repo_name] = tempo
-        tempo_str = format_seconds(tempo)
+            prs = None
+        finally:
+            posicoes.put(posicao)
+        tempo = time.time() - inicio
 
+        # Grava já: um repositório lento não segura os que terminaram depois dele
+        novos = 0
         if prs:
-            validos = len(prs)
-            total_prs_collected += validos
-            tqdm.write(f"   📦 PRs válidos coletados de '{repo_name}': {validos} ⏱️ Tempo: {tempo_str}")
+            novos = add_repo_prs(repo_name, prs)
+            known_prs.setdefault(repo_name.strip().lower(), set()).update(pr["pr_number"] for pr in prs)
+        return repo_name, prs, tempo, novos
 
-            new_df = pd.DataFrame(prs)
-            
-            if new_df.empty:
-                continue
-            if collected_df.empty and not new_df.empty:
-                collected_df = pd.DataFrame(columns=new_df.columns)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = {executor.submit(coletar, idx, repo_name): idx for idx, repo_name in enumerate(remaining_repos)}
+        concluidos = {}
+        proximo = 0
 
-            collected_df = pd.concat([collected_df, new_df], ignore_index=True)
+        for futuro in as_completed(futuros):
+            concluidos[futuros[futuro]] = futuro.result()
 
-            antes = collected_df.shape[0]
-            collected_df.drop_duplicates(subset=["repo_name", "pr_number"], inplace=True)
-            depois = collected_df.shape[0]
-            removidos = antes - depois
-            if removidos > 0:
-                tqdm.write(f"   🔍 {removidos} PRs duplicados removidos.")
+            # O log segue a ordem da lista: só avança quando o próximo repositório terminou
+            while proximo in concluidos:
+                repo_name, prs, tempo, novos = concluidos.pop(proximo)
+                proximo += 1
+                if prs is None:
+                    tqdm.write(f"   ❌ Coleta de '{repo_name}' interrompida por erro; o repositório fica pendente para a próxima execução.")
+                    continue
 
-            save_prs_to_files(collected_df.to_dict(orient="records"), collected_file)
-        else:
-            tqdm.write(f"   ⚠️ Repositório '{repo_name}' ignorado — menos de 100 PRs válidos. ⏱️ Tempo: {tempo_str}")
+                repo_times[repo_name] = tempo
+                tempo_str = format_seconds(tempo)
+
+                if not prs:
+                    if known_prs.get(repo_name.strip().lower()):
+                        tqdm.write(f"   ⚠️ Nenhum PR novo armazenado de '{repo_name}'. ⏱️ Tempo: {tempo_str}")
+                    else:
+                        tqdm.write(f"   ⚠️ Repositório '{repo_name}' ignorado — menos de 100 PRs válidos. ⏱️ Tempo: {tempo_str}")
+                    continue
+
+                validos = len(prs)
+                total_prs_collected += validos
+                tqdm.write(f"   📦 PRs válidos coletados de '{repo_name}': {validos} ⏱️ Tempo: {tempo_str}")
+
+                # A chave (repo_name, pr_number) ainda descarta duplicados dentro do próprio lote
+                duplicados = validos - novos
+                if duplicados > 0:
+                    tqdm.write(f"   🔍 {duplicados} PRs duplicados ignorados.")
 
     tqdm.write(f"\n📊 Total acumulado de PRs válidos coletados nesta execução: {total_prs_collected}")
 
@@ -472,9 +524,8 @@ def coletar_prs_dos_repos(remaining_repos, collected_file, g, incomplete_repos):
         tqdm.write(f"   🔹 Tempo mediano por repositório: {format_seconds(mediana_tempo)}")
 
 def main():
-    g = Github(configurar_token())
+    token = configurar_token()
     selected_repos_df = load_repos(REPO_FILE)
-    collected_prs_df = load_repos(COLLECTED_FILE)
 
     if selected_repos_df.empty or 'full_name' not in selected_repos_df.columns:
         tqdm.write("❌ Arquivo de repositórios selecionados está vazio ou mal formatado. Verifique o arquivo.")
@@ -482,11 +533,16 @@ def main():
 
     show_initial_info()
 
+    # Coletas anteriores ao armazenamento ficaram só no CSV/JSON
+    import_previous(COLLECTED_FILE)
+    collected_prs_df = load_prs()
+
     # 🔃 Filtra os repositórios para garantir no máximo 200 antes de avaliar completude
-    filtered_collected_repos_df = filter_collected_repositories(selected_repos_df, collected_prs_df, COLLECTED_FILE)
+    filtered_collected_repos_df = filter_collected_repositories(selected_repos_df, collected_prs_df)
+    remove_repos(set(collected_prs_df['repo_name']) - set(filtered_collected_repos_df['repo_name']))
 
     # Usa o DataFrame filtrado para verificar completude
-    complete_repos, incomplete_repos, _, _, _, _, _, _ = compare_repositories(selected_repos_df, filtered_collected_repos_df, g)
+    complete_repos, incomplete_repos, _, _, _, _, _, _ = compare_repositories(selected_repos_df, filtered_collected_repos_df, token)
 
     # Atualiza o DataFrame usado para o restante do fluxo
     collected_prs_df = filtered_collected_repos_df
@@ -501,8 +557,7 @@ def main():
     collected_prs_df = summarize_collection_results(
         selected_repos_df, collected_prs_df,
         complete_repos, incomplete_repos,
-        repos_pendentes_set, removidos_set,
-        COLLECTED_FILE
+        repos_pendentes_set, removidos_set
     )
 
     # Filtra repositórios incompletos que ainda estão entre os selecionados
@@ -512,20 +567,16 @@ def main():
     remaining_repos = sorted(list((repos_pendentes_set | incomplete_set) & selected_set))
 
     if remaining_repos:
-        coletar_prs_dos_repos(remaining_repos, COLLECTED_FILE, g, incomplete_repos)
+        coletar_prs_dos_repos(remaining_repos, token, incomplete_set, known_prs=collected_keys())
     else:
         tqdm.write("🔴 Não há repositórios restantes para coletar.")
 
-    # Verifica quantos repositórios únicos estão presentes no CSV final
-    if os.path.exists(COLLECTED_FILE):
-        try:
-            final_df = pd.read_csv(COLLECTED_FILE, sep=";")
-            repos_unicos = final_df["repo_name"].dropna().str.lower().str.strip().unique()
-            tqdm.write(f"\n📦 Total final de repositórios com PRs coletados no CSV: {len(repos_unicos)}")
-        except Exception as e:
-            tqdm.write(f"\n⚠️ Erro ao ler 'collected_prs.csv': {e}")
-    else:
-        tqdm.write("\n⚠️ Arquivo 'collected_prs.csv' não encontrado para contagem final de repositórios.")
+    # CSV e JSON são gerados uma única vez, a partir do armazenamento
+    export_prs(COLLECTED_FILE)
+
+    final_df = load_prs()
+    repos_unicos = final_df["repo_name"].dropna().str.lower().str.strip().unique()
+    tqdm.write(f"\n📦 Total final de repositórios com PRs coletados: {len(repos_unicos)}")
 
 # === EXECUÇÃO PRINCIPAL ===
 if __name__ == "__main__":
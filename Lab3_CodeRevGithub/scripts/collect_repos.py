@@ -10,6 +10,7 @@ import shutil
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
 from config_token import configurar_token
+from graphql_api import run_graphql, GraphQLError, SERVER_ERRORS
 
 TOKEN = configurar_token()
 
@@ -78,14 +79,79 @@ def handle_rate_limit(response, fallback_wait=600, max_wait=1800, message="", er
 
     return False
 
+# Repositórios verificados por consulta GraphQL (um alias por repositório)
+REPOS_POR_CONSULTA = 10
+# Máximo de PRs fechados examinados por repositório antes de desistir dele
+MAX_PRS_EXAMINADOS = 600
+
+def montar_consulta_reviews(estados):
+    """Consulta com um alias `rN` por repositório, cada um com o seu cursor de paginação."""
+    declaracoes, campos, variaveis = [], [], {}
+    for i, estado in enumerate(estados):
+        declaracoes.append(f"$o{i}: String!, $n{i}: String!, $c{i}: String")
+        campos.append(f"""
+        r{i}: repository(owner: $o{i}, name: $n{i}) {{
+            pullRequests(states: [MERGED, CLOSED], first: 100, after: $c{i}, orderBy: {{field: CREATED_AT, direction: DESC}}) {{
+                nodes {{ reviews {{ totalCount }} }}
+                pageInfo {{ hasNextPage endCursor }}
+            }}
+        }}""")
+        variaveis.update({f"o{i}": estado["owner"], f"n{i}": estado["name"], f"c{i}": estado["cursor"]})
+    consulta = f"query({', '.join(declaracoes)}) {{ rateLimit {{ remaining resetAt }}{''.join(campos)}\n}}"
+    return consulta, variaveis
+
+def contar_prs_com_review(token, repos, min_prs=100, max_to_fetch=MAX_PRS_EXAMINADOS):
+    """
+    Conta PRs fechados com ao menos uma review em cada repositório, vários repositórios por consulta.
+
+    A contagem de um repositório para assim que chega a `min_prs` (não importa quantos a mais
+    existam), quando os PRs acabam ou depois de `max_to_fetch` PRs examinados.
+    Retorna {full_name: quantidade}.
+    """
+    estados = []
+    for repo in repos:
+        owner, name = repo["full_name"].split("/")
+        estados.append({"full_name": repo["full_name"], "owner": owner, "name": name,
+                        "cursor": None, "fetched": 0, "valid": 0, "done": False})
+
+    por_consulta = REPOS_POR_CONSULTA
+    while True:
+        ativos = [estado for estado in estados if not estado["done"]][:por_consulta]
+        if not ativos:
+            break
+
+        consulta, variaveis = montar_consulta_reviews(ativos)
+        try:
+            resultado = run_graphql(token, consulta, variaveis)
+        except GraphQLError as e:
+            if e.status_code in SERVER_ERRORS and por_consulta > 1:
+                por_consulta = max(1, por_consulta // 2)
+                continue
+            # Mesmo comportamento de antes: um erro encerra a contagem desses repositórios
+            for estado in ativos:
+                estado["done"] = True
+            continue
+
+        for i, estado in enumerate(ativos):
+            repositorio = resultado["data"].get(f"r{i}")
+            if repositorio is None:  # NOT_FOUND ou sem acesso
+                estado["done"] = True
+                continue
+            pr_data = repositorio["pullRequests"]
+            estado["valid"] += sum(1 for pr in pr_data["nodes"] if pr["reviews"]["totalCount"] > 0)
+            estado["fetched"] += len(pr_data["nodes"])
+            estado["cursor"] = pr_data["pageInfo"]["endCursor"]
+            if (estado["valid"] >= min_prs or estado["fetched"] >= max_to_fetch
+                    or not pr_data["pageInfo"]["hasNextPage"]):
+                estado["done"] = True
+
+    return {estado["full_name"]: estado["valid"] for estado in estados}
+
 def filter_repos_with_min_prs(token, min_prs=100, needed=200):
     headers_rest = {
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github.v3+json"
     }
-    headers_graphql = {
-        "Authorization": f"bearer {token}"
-    }
 
     all_filtered = []
     page = 1
@@ -117,58 +183,22 @@ def filter_repos_with_min_prs(token, min_prs=100, needed=200):
         validos_na_pagina = 0
         repos_nesta_pagina = []
 
-        for repo in tqdm(repos, desc=f"   ⚙️  Filtrando por PRs com reviews", ncols=120):
-            owner, name = repo["full_name"].split("/")
-            valid_prs = []
-            cursor = None
-            fetched = 0
-            max_to_fetch = 600
-
-            while fetched < max_to_fetch:
-                after_clause = f', after: "{cursor}"' if cursor else ""
-                query = {
-                    "query": f"""
-                    {{
-                        repository(owner: \"{owner}\", name: \"{name}\") {{
-                            pullRequests(states: [MERGED, CLOSED], first: 100{after_clause}, orderBy: {{field: CREATED_AT, direction: DESC}}) {{
-                                nodes {{
-                                    reviews {{ totalCount }}
-                                }}
-                                pageInfo {{ hasNextPage endCursor }}
-                            }}
-                        }}
-                    }}
-                    """
-                }
-
-                try:
-                    r = requests.post("https://api.github.com/graphql", headers=headers_graphql, json=query)
-                    if handle_rate_limit(r):
-                        continue
-                    response_json = r.json()
-
-                    if "errors" in response_json:
-                        break
-
-                    pr_data = response_json["data"]["repository"]["pullRequests"]
-                    for pr in pr_data["nodes"]:
-                        if pr["reviews"]["totalCount"] > 0:
-                            valid_prs.append(pr)
-
-                    fetched += len(pr_data["nodes"])
-                    if not pr_data["pageInfo"]["hasNextPage"]:
-                        break
-                    cursor = pr_data["pageInfo"]["endCursor"]
-
-                except Exception as e:
+        with tqdm(total=len(repos), desc=f"   ⚙️  Filtrando por PRs com reviews", ncols=120) as pbar:
+            for inicio in range(0, len(repos), REPOS_POR_CONSULTA):
+                # Já há repositórios suficientes: o restante da página nem é consultado
+                if len(all_filtered) + len(repos_nesta_pagina) >= needed:
                     break
 
-            pr_count = len(valid_prs)
-            if pr_count >= min_prs:
-                repo["pr_count"] = pr_count
-                validos_na_pagina += 1
-                repos_nesta_pagina.append(repo)
-
+                lote = repos[inicio:inicio + REPOS_POR_CONSULTA]
+                contagens = contar_prs_com_review(token, lote, min_prs)
+                for repo in lote:
+                    verificados = contagens[repo["full_name"]]
+                    if verificados >= min_prs:
+                        # A contagem para em `min_prs`: não é o total de PRs do repositório
+                        repo["prs_com_review_verificados"] = verificados
+                        validos_na_pagina += 1
+                        repos_nesta_pagina.append(repo)
+                pbar.update(len(lote))
 
         all_filtered.extend(repos_nesta_pagina)
 
@@ -176,42 +206,13 @@ def filter_repos_with_min_prs(token, min_prs=100, needed=200):
         print(f"      ➕ Extraídos nesta página: {validos_na_pagina}")
         print(f"      📊 Total acumulado: {len(all_filtered)} repositórios válidos.")
 
-        # Estatísticas da página
-        faixas = [
-            (0, 99),
-            (100, 199),
-            (200, 499),
-            (500, 999),
-            (1000, float("inf"))
-        ]
-
-        contexto = f"página {page}"
-        pr_counts = [(repo.get("full_name", "desconhecido"), repo.get("pr_count", 0)) for repo in repos_nesta_pagina if "pr_count" in repo]
-
-        print(f"\n📊 Distribuição dos repositórios por faixas de PRs válidos ({contexto}):")
-        for min_val, max_val in faixas:
-            label = f"{int(min_val)}+" if max_val == float("inf") else f"{int(min_val)}–{int(max_val)}"
-            count = sum(1 for _, pr_count in pr_counts if min_val <= pr_count <= max_val)
-            print(f"   🔹 {label} PRs: {count} repositório(s)")
-
-        if pr_counts:
-            sorted_repos = sorted(pr_counts, key=lambda x: x[1])
-            repo_min = sorted_repos[0]
-            repo_max = sorted_repos[-1]
-
-            print(f"\n📈 Estatísticas de PRs nesta página:")
-            print(f"   🔹 Mínimo: {repo_min[1]} PRs — {repo_min[0]}")
-            print(f"   🔹 Máximo: {repo_max[1]} PRs — {repo_max[0]}")
-        else:
-            print("\n🔴 Nenhum repositório válido nesta página para calcular estatísticas.")
-
         print("\n" + "-" * 80 + "\n")
 
         # Salvar resultados parciais
         if all_filtered:
             selected = [
                 "id", "full_name", "description", "language",
-                "stargazers_count", "forks_count", "open_issues_count", "pr_count"
+                "stargazers_count", "forks_count", "open_issues_count", "prs_com_review_verificados"
             ]
             rows = [{k: r.get(k) for k in selected} for r in all_filtered]
             df = pd.DataFrame(rows)
@@ -234,7 +235,7 @@ def save_repos_to_files(repos, file_path):
     # Define colunas e ordem lógica
     selected = [
         "id", "full_name", "description", "language",
-        "stargazers_count", "forks_count", "open_issues_count", "pr_count"
+        "stargazers_count", "forks_count", "open_issues_count", "prs_com_review_verificados"
     ]
     rows = [{k: r.get(k) for k in selected} for r in repos]
     df = pd.DataFrame(rows)
@@ -269,37 +270,6 @@ def save_repos_to_files(repos, file_path):
     except Exception as e:
         print(f"🔴 Erro ao salvar os arquivos: {e}\n")
 
-def print_faixa_distribuicao(repos, contexto="geral"):
-    faixas = [
-        (100, 199),
-        (200, 499),
-        (500, 999),
-        (1000, float("inf"))
-    ]
-
-    pr_counts = [(repo.get("full_name", "desconhecido"), repo.get("pr_count", 0)) for repo in repos if "pr_count" in repo]
-
-    print(f"\n📊 Distribuição dos repositórios por faixas de PRs válidos ({contexto}):")
-    for min_val, max_val in faixas:
-        label = f"{int(min_val)}+" if max_val == float("inf") else f"{int(min_val)}–{int(max_val)}"
-        count = sum(1 for _, pr_count in pr_counts if min_val <= pr_count <= max_val)
-        print(f"   🔹 {label} PRs: {count} repositório(s)")
-
-    if pr_counts:
-        sorted_repos = sorted(pr_counts, key=lambda x: x[1])
-        repo_min = sorted_repos[0]
-        repo_max = sorted_repos[-1]
-
-        minimo = repo_min[1]
-        maximo = repo_max[1]
-
-        print(f"\n📈 Estatísticas dos PRs válidos:")
-        print(f"   🔹 Mínimo: {minimo}  — {repo_min[0]}")
-        print(f"   🔹 Máximo: {maximo}  — {repo_max[0]}")
-    else:
-        print("\n🔴 Nenhuma informação de PRs disponível para estatísticas.")
-
-
 def main():
     print("Iniciando o processo de coleta de repositórios...\n")
     start_time = time.time()
@@ -307,9 +277,7 @@ def main():
     filtered = filter_repos_with_min_prs(TOKEN, min_prs=100, needed=200)
 
     # ✅ Filtragem final por segurança (mínimo de 100 PRs válidos)
-    filtered_final = [repo for repo in filtered if repo.get("pr_count", 0) >= 100]
-
-    print_faixa_distribuicao(filtered_final, contexto="final")
+    filtered_final = [repo for repo in filtered if repo.get("prs_com_review_verificados", 0) >= 100]
 
     save_repos_to_files(filtered_final, output_csv)
 
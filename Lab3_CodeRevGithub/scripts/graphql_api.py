@@ -0,0 +1,168 @@
+import time
+import random
+import threading
+from datetime import datetime, timezone
+
+import requests
+from tqdm import tqdm
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Abaixo disso, a próxima consulta espera a janela de rate limit reabrir
+MIN_REMAINING_POINTS = 50
+SERVER_ERRORS = (500, 502, 503, 504)
+# 5xx transitórios são repetidos com espera crescente antes de virarem GraphQLError
+SERVER_ERROR_RETRIES = 3
+SERVER_ERROR_BACKOFF = 5
+
+class GraphQLError(Exception):
+    """Erro de uma consulta GraphQL que não se resolve esperando (ou que esgotou as tentativas)."""
+    def __init__(self, message, status_code=None, errors=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.errors = errors or []
+
+def _seconds_until(reset_at):
+    """
+    Segundos até `reset_at` (+10 de folga). Aceita epoch em segundos, como no header
+    X-RateLimit-Reset ("1700000000"), ou data ISO, como no campo `resetAt` do GraphQL.
+    """
+    if isinstance(reset_at, str):
+        try:
+            reset_at = float(reset_at)
+        except ValueError:
+            reset_at = parse_github_datetime(reset_at).timestamp()
+    return max(int(float(reset_at) - time.time()) + 10, 10)
+
+def _wait(seconds, reason):
+    tqdm.write(f"🚦 {reason} — Iniciando pausa temporária.")
+    tqdm.write(f"⏳ Estimativa de espera: {seconds} segundos até a liberação de novas requisições...\n")
+    time.sleep(seconds)
+
+class OrcamentoAPI:
+    """
+    🪙 Orçamento de pontos do GraphQL compartilhado entre threads.
+
+    Cada resposta atualiza os pontos restantes e o horário de reabertura da janela. Quando o saldo
+    fica abaixo do mínimo (ou a API avisa que acabou), todas as threads pausam juntas até o reset,
+    em vez de cada uma descobrir o limite por conta própria com uma requisição recusada.
+    """
+    def __init__(self, minimo=MIN_REMAINING_POINTS):
+        self.minimo = minimo
+        self.remaining = None
+        self.reset_at = 0.0
+        self._lock = threading.Lock()
+        self._pausa_anunciada = False
+
+    def atualizar(self, rate_limit):
+        reset_at = parse_github_datetime(rate_limit["resetAt"]).timestamp() + 10
+        with self._lock:
+            # Respostas chegam fora de ordem: numa mesma janela vale o menor saldo visto
+            if reset_at > self.reset_at or self.remaining is None:
+                self.reset_at, self.remaining = reset_at, rate_limit["remaining"]
+            elif reset_at == self.reset_at:
+                self.remaining = min(self.remaining, rate_limit["remaining"])
+
+    def esgotar(self, segundos):
+        with self._lock:
+            self.remaining = 0
+            self.reset_at = max(self.reset_at, time.time() + segundos)
+
+    def aguardar(self):
+        """Bloqueia até haver saldo (ou a janela reabrir)."""
+        with self._lock:
+            if self.remaining is None or self.remaining >= self.minimo:
+                return
+            espera = int(self.reset_at - time.time()) + 1
+            anunciar = not self._pausa_anunciada
+            self._pausa_anunciada = True
+        if espera > 0:
+            if anunciar:
+                _wait(espera, f"Restam {self.remaining} pontos de GraphQL para todas as coletas")
+            else:
+                time.sleep(espera)
+        with self._lock:
+            if time.time() >= self.reset_at:
+                self.remaining = None
+                self._pausa_anunciada = False
+
+# Orçamento padrão: um token por processo
+ORCAMENTO_PADRAO = OrcamentoAPI()
+
+def parse_github_datetime(value):
+    """Converte '2024-01-01T10:00:00Z' no mesmo formato ISO que o PyGithub gerava (+00:00)."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+def run_graphql(token, query, variables=None, max_retries=5, timeout=90, orcamento=None,
+                server_retries=SERVER_ERROR_RETRIES):
+    """
+    🔗 Executa uma consulta GraphQL na API do GitHub.
+
+    Espera quando o rate limit acaba (HTTP 403/429, erro RATE_LIMITED ou `rateLimit.remaining`
+    baixo, se a consulta pedir esse campo) e repete falhas de rede. A espera é combinada com as
+    demais threads pelo `orcamento` (padrão: ORCAMENTO_PADRAO). Erros 5xx são repetidos até
+    `server_retries` vezes, com espera crescente, antes de chegar a quem chamou. Retorna o JSON
+    completo: erros parciais (ex.: NOT_FOUND de um alias) ficam em `"errors"` para quem chamou
+    decidir. Levanta `GraphQLError` quando não há `data` ou as tentativas acabam.
+    """
+    headers = {"Authorization": f"bearer {token}"}
+    payload = {"query": query, "variables": variables or {}}
+    orcamento = orcamento or ORCAMENTO_PADRAO
+    last_error = None
+    falhas_servidor = 0
+
+    for attempt in range(max_retries):
+        orcamento.aguardar()
+        try:
+            response = requests.post(GRAPHQL_URL, headers=headers, json=payload, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            last_error = GraphQLError(f"{type(e).__name__} — {e}")
+            _wait(random.randint(30, 90), f"Erro de rede na consulta GraphQL ({type(e).__name__})")
+            continue
+
+        if response.status_code in (403, 429):
+            if response.headers.get("Retry-After"):
+                seconds = int(response.headers["Retry-After"]) + 1
+            elif response.headers.get("X-RateLimit-Remaining") == "0":
+                seconds = _seconds_until(response.headers.get("X-RateLimit-Reset", time.time() + 600))
+            else:
+                seconds = random.randint(60, 180)  # limite secundário (abuso)
+            last_error = GraphQLError(f"{response.status_code} — {response.reason}", response.status_code)
+            tqdm.write(f"🚦 Limite de requisições da API atingido ({response.status_code}).")
+            orcamento.esgotar(seconds)
+            continue
+
+        if response.status_code in SERVER_ERRORS:
+            if falhas_servidor < server_retries:
+                falhas_servidor += 1
+                last_error = GraphQLError(f"{response.status_code} — {response.reason}", response.status_code)
+                espera = SERVER_ERROR_BACKOFF * 2 ** (falhas_servidor - 1) + random.uniform(0, 1)
+                tqdm.write(f"   ⚠️ Erro {response.status_code} do GraphQL. Nova tentativa ({falhas_servidor}/{server_retries}) em {espera:.0f}s...")
+                time.sleep(espera)
+                continue
+            # Persistente: normalmente a consulta pesada demais, e quem chamou pode tentar com páginas menores
+            raise GraphQLError(f"{response.status_code} — {response.reason}", response.status_code)
+
+        if response.status_code != 200:
+            raise GraphQLError(f"{response.status_code} — {response.reason}", response.status_code)
+
+        result = response.json()
+        errors = result.get("errors") or []
+        if any(error.get("type") == "RATE_LIMITED" for error in errors):
+            seconds = _seconds_until(response.headers.get("X-RateLimit-Reset", time.time() + 600))
+            last_error = GraphQLError("RATE_LIMITED", errors=errors)
+            tqdm.write("🚦 Limite de pontos do GraphQL atingido.")
+            orcamento.esgotar(seconds)
+            continue
+
+        if not result.get("data"):
+            raise GraphQLError("; ".join(error.get("message", "") for error in errors) or "Resposta sem dados", errors=errors)
+
+        rate_limit = result["data"].get("rateLimit")
+        if rate_limit:
+            orcamento.atualizar(rate_limit)
+
+        return result
+
+    raise last_error or GraphQLError("Tentativas esgotadas")
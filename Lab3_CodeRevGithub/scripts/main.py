@@ -1,55 +1,22 @@
-import subprocess
-import sys
-import importlib.metadata
-
-# Lista de dependências essenciais para o projeto
-dependencias = [
-    'requests', 'pandas', 'numpy', 'matplotlib', 'seaborn',
-    'scipy', 'tqdm', 'tabulate', 'python-dotenv', 'openpyxl',
-    'PyGithub', 'scikit-learn', 'importlib-metadata', 'plotly', 'polars',
-    'pyarrow', 'pydantic', 'typer', 'rich', 'beautifulsoup4'
-]
-
-print("\n🔍 Verificando e instalando dependências...")
-
-def check_and_install(package):
-    print(f"\n🔧 Verificando e instalando a dependência: {package}")
-
-    try:
-        # Verificar se o pacote já está instalado
-        
-        installed_version = importlib.metadata.version(package)
-        print(f"    🎯 {package} (v{installed_version}) já está instalado.")
-        
-        # Obter a versão mais recente disponível do pacote
-        print(f"        🔍 Verificando se {package} precisa ser atualizado...")
-        result = subprocess.run([sys.executable, "-m", "pip", "show", package], capture_output=True, text=True)
-        latest_version = result.stdout.splitlines()[1].split(":")[1].strip()
-
-        # Comparar a versão instalada com a versão mais recente
-        if installed_version == latest_version:
-            print(f"        👍 {package} está na versão mais recente.")
-        else:
-            print(f"        🔄 {package} precisa ser atualizado. Atualizando para v{latest_version}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade", package])
-            print(f"        🚀 {package} foi atualizado para a versão mais recente. 🎉")
-    
-    except importlib.metadata.PackageNotFoundError:
-        # Caso o pacote não esteja instalado, ele será instalado
-        print(f"        ⬇️ {package} não encontrado. Instalando... 🔧")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-
-# Atualizar ou instalar pacotes conforme necessário
-for pacote in dependencias:
-    check_and_install(pacote)
-
+# 🚀 Verificação rápida do ambiente: nada de perguntar ao pip a cada execução
 import os
+import sys
 import time
 import logging
+import subprocess
 
 # Configuração do logging (console + arquivo)
 script_dir = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(script_dir)
+REQUIREMENTS_FILE = os.path.join(BASE_DIR, "requirements.txt")
+# Assinatura do último ambiente verificado (requirements + interpretador + pastas de pacotes)
+AMBIENTE_STAMP_FILE = os.path.join(BASE_DIR, ".ambiente_verificado")
+
+# Módulo compartilhado com o Lab2, na raiz do repositório (ao lado do config_token.py)
+sys.path.append(os.path.abspath(os.path.join(BASE_DIR, "..")))
+from ambiente import verificar_ambiente
+
+verificar_ambiente(REQUIREMENTS_FILE, AMBIENTE_STAMP_FILE)
 
 # Configuração do log
 for handler in logging.root.handlers[:]:
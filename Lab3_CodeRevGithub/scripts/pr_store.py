@@ -0,0 +1,195 @@
+import os
+import json
+import sqlite3
+import threading
+
+import pandas as pd
+from tqdm import tqdm
+
+BASE_DIR = os.path.join("Lab3_CodeRevGithub", "Lab3S03")
+DATA_DIR = os.path.join(BASE_DIR, "data")
+STORE_FILE = os.path.join(DATA_DIR, "collected_prs.sqlite")
+COLLECTED_FILE = os.path.join(DATA_DIR, "collected_prs.csv")
+
+# 🗃️ Armazenamento dos PRs coletados.
+#
+# Os PRs ficam numa tabela SQLite com chave (repo_name, pr_number): cada repositório é gravado
+# uma única vez, numa transação, e PRs repetidos são ignorados pela própria chave. O CSV e o
+# JSON de `collected_prs` deixam de ser reescritos a cada repositório e passam a ser exportações,
+# geradas no fim da coleta ou sob demanda (`python pr_store.py`).
+
+PR_COLUMNS = [
+    "repo_name", "pr_number", "title", "body", "body_length", "state", "merged",
+    "created_at", "closed_at", "merged_at", "review_count", "files_changed", "additions", "deletions",
+    "comments", "review_comments", "time_to_close_hours", "participant_count"
+]
+# Colunas (e ordem) do collected_prs.csv exportado
+CSV_COLUMNS = [
+    "repo_name", "pr_number", "title", "body", "language",
+    "created_at", "closed_at", "merged_at", "state", "merged",
+    "review_count", "files_changed", "additions", "deletions",
+    "comments", "review_comments", "time_to_close_hours", "participant_count"
+]
+BODY_PREVIEW_CHARS = 300
+
+_connection = None
+_lock = threading.Lock()
+
+def _get_connection():
+    global _connection
+    if _connection is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        _connection = sqlite3.connect(STORE_FILE, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS prs (
+                repo_name TEXT NOT NULL, pr_number INTEGER NOT NULL,
+                title TEXT, body TEXT, body_length INTEGER, state TEXT, merged INTEGER,
+                created_at TEXT, closed_at TEXT, merged_at TEXT,
+                review_count INTEGER, files_changed INTEGER, additions INTEGER, deletions INTEGER,
+                comments INTEGER, review_comments INTEGER, time_to_close_hours REAL, participant_count INTEGER,
+                PRIMARY KEY (repo_name, pr_number)
+            )""")
+        _connection.commit()
+    return _connection
+
+def _value(value):
+    # NaN/NA de linhas vindas do pandas viram NULL
+    return None if value is None or (not isinstance(value, str) and pd.isna(value)) else value
+
+def add_repo_prs(repo_name, prs):
+    """Grava os PRs de um repositório numa transação. Retorna quantos eram novos."""
+    rows = [tuple(_value(pr.get(column)) for column in PR_COLUMNS) for pr in prs]
+    with _lock:
+        connection = _get_connection()
+        before = connection.total_changes
+        with connection:
+            connection.executemany(
+                f"INSERT OR IGNORE INTO prs ({', '.join(PR_COLUMNS)}) VALUES ({', '.join('?' * len(PR_COLUMNS))})",
+                rows
+            )
+        return connection.total_changes - before
+
+def remove_repos(repo_names):
+    """Remove todos os PRs dos repositórios informados (comparação sem caixa e sem espaços)."""
+    names = sorted({str(name).strip().lower() for name in repo_names})
+    if not names:
+        return 0
+    with _lock:
+        connection = _get_connection()
+        with connection:
+            removed = connection.executemany(
+                "DELETE FROM prs WHERE lower(trim(repo_name)) = ?", [(name,) for name in names]
+            ).rowcount
+    return removed
+
+def count_prs():
+    with _lock:
+        return _get_connection().execute("SELECT COUNT(*) FROM prs").fetchone()[0]
+
+def collected_keys():
+    """
+    🔑 Índice dos PRs armazenados: {repo_name normalizado: {pr_number, ...}}.
+
+    Lido direto da chave primária, sem carregar as demais colunas. A coleta consulta e atualiza
+    esse índice para não reprocessar PRs que já estão no armazenamento.
+    """
+    keys = {}
+    with _lock:
+        for repo_name, pr_number in _get_connection().execute("SELECT repo_name, pr_number FROM prs"):
+            keys.setdefault(repo_name.strip().lower(), set()).add(pr_number)
+    return keys
+
+def load_prs():
+    """
+    Todos os PRs armazenados, agrupados por repositório (em ordem alfabética) e, dentro de cada um,
+    na ordem em que foram gravados. Como a coleta grava os repositórios na ordem em que terminam,
+    a ordenação por nome mantém as exportações estáveis entre execuções.
+    """
+    with _lock:
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(PR_COLUMNS)} FROM prs ORDER BY lower(trim(repo_name)), rowid", _get_connection()
+        )
+    df["merged"] = df["merged"].astype("boolean")
+    return df
+
+def _read_previous_json(json_path):
+    # O JSON antigo guarda os PRs completos (corpo inteiro e body_length original)
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            return pd.DataFrame(json.load(f))
+    except (OSError, ValueError) as e:
+        tqdm.write(f"⚠️ Não foi possível ler '{json_path}' ({e}). Usando o CSV.")
+        return None
+
+def _read_previous_csv(csv_path):
+    # O CSV tem o corpo cortado em BODY_PREVIEW_CHARS: só é usado quando não há JSON
+    for sep in [";", ","]:
+        try:
+            candidate = pd.read_csv(csv_path, sep=sep)
+        except Exception:
+            continue
+        if {"repo_name", "pr_number"} <= set(candidate.columns):
+            return candidate
+    return None
+
+def import_previous(csv_path=COLLECTED_FILE):
+    """
+    Migra os PRs de coletas anteriores para o armazenamento, se ele ainda estiver vazio.
+    Lê o collected_prs.json ao lado do CSV quando ele existe e recorre ao CSV só sem ele.
+    Retorna quantos PRs foram importados.
+    """
+    if count_prs() > 0:
+        return 0
+
+    json_path = csv_path.replace(".csv", ".json")
+    df, source = None, None
+    if os.path.exists(json_path):
+        df, source = _read_previous_json(json_path), json_path
+    if (df is None or not {"repo_name", "pr_number"} <= set(df.columns)) and os.path.exists(csv_path):
+        df, source = _read_previous_csv(csv_path), csv_path
+    if df is None or df.empty or not {"repo_name", "pr_number"} <= set(df.columns):
+        return 0
+
+    df = df.dropna(subset=["repo_name", "pr_number"])
+    df["pr_number"] = df["pr_number"].astype(int)
+    if "body_length" not in df.columns and "body" in df.columns:
+        df["body_length"] = df["body"].map(lambda x: len(x) if isinstance(x, str) else 0)
+
+    imported = 0
+    for repo_name, repo_df in df.groupby("repo_name", sort=False):
+        imported += add_repo_prs(repo_name, repo_df.to_dict(orient="records"))
+    tqdm.write(f"📥 {imported} PRs importados de '{source}' para '{STORE_FILE}'.")
+    return imported
+
+def export_prs(file_path=COLLECTED_FILE):
+    """📤 Gera o collected_prs.csv (corpo resumido, separador ";") e o collected_prs.json a partir do armazenamento."""
+    df = load_prs()
+    if df.empty:
+        tqdm.write("🔴 Nenhum PR armazenado. Arquivos não foram exportados.")
+        return
+
+    tqdm.write(f"\n   🧮 PRs consolidados atualmente: {len(df)}")
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        csv_df = df.reindex(columns=CSV_COLUMNS)
+        csv_df["body"] = csv_df["body"].apply(
+            lambda x: (x[:BODY_PREVIEW_CHARS] + "...") if isinstance(x, str) and len(x) > BODY_PREVIEW_CHARS else x
+        )
+        csv_df.to_csv(file_path, index=False, sep=";", encoding="utf-8")
+        tqdm.write(f"       ✅ Arquivo CSV salvo em {file_path}")
+
+        json_path = file_path.replace(".csv", ".json")
+        records = json.loads(df.to_json(orient="records", force_ascii=False))
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        tqdm.write(f"       ✅ Arquivo JSON salvo em {json_path}")
+
+    except Exception as e:
+        tqdm.write(f"🔴 Erro ao exportar os arquivos de PRs: {e}\n")
+
+# === EXECUÇÃO PRINCIPAL ===
+if __name__ == "__main__":
+    import_previous()
+    export_prs()
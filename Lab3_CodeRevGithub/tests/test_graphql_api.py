@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts")))
+
+import graphql_api
+
+
+class SecondsUntilTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(graphql_api.time, "time", return_value=1_700_000_000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_header_epoch_seconds(self):
+        # X-RateLimit-Reset chega como texto com o epoch em segundos
+        self.assertEqual(graphql_api._seconds_until("1700000100"), 110)
+
+    def test_graphql_reset_at_iso(self):
+        # 1700000100 = 2023-11-14T22:15:00Z
+        self.assertEqual(graphql_api._seconds_until("2023-11-14T22:15:00Z"), 110)
+
+    def test_numeric_and_past_reset(self):
+        self.assertEqual(graphql_api._seconds_until(1_700_000_100), 110)
+        self.assertEqual(graphql_api._seconds_until("1699999000"), 10)
+
+
+class Resposta:
+    def __init__(self, status_code, dados=None, headers=None):
+        self.status_code = status_code
+        self.reason = "x"
+        self.headers = headers or {}
+        self._dados = dados
+
+    def json(self):
+        return self._dados
+
+
+class RateLimitHeaderTest(unittest.TestCase):
+    def test_403_with_epoch_header_waits_instead_of_crashing(self):
+        respostas = [
+            Resposta(403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 60)}),
+            Resposta(200, {"data": {"viewer": {"login": "u"}}}),
+        ]
+        orcamento = graphql_api.OrcamentoAPI()
+        with mock.patch.object(graphql_api.requests, "post", side_effect=respostas), \
+                mock.patch.object(graphql_api.time, "sleep") as dormir:
+            resultado = graphql_api.run_graphql("tok", "{ viewer { login } }", orcamento=orcamento)
+
+        self.assertEqual(resultado["data"]["viewer"]["login"], "u")
+        dormir.assert_called_once()
+
+
+class ServerErrorTest(unittest.TestCase):
+    def _executar(self, respostas):
+        with mock.patch.object(graphql_api.requests, "post", side_effect=respostas) as post, \
+                mock.patch.object(graphql_api.time, "sleep"):
+            try:
+                return graphql_api.run_graphql("tok", "{ viewer { login } }", orcamento=graphql_api.OrcamentoAPI())
+            finally:
+                self.chamadas = post.call_count
+
+    def test_transient_5xx_is_retried(self):
+        resultado = self._executar([Resposta(502), Resposta(503), Resposta(200, {"data": {"viewer": {"login": "u"}}})])
+        self.assertEqual(resultado["data"]["viewer"]["login"], "u")
+        self.assertEqual(self.chamadas, 3)
+
+    def test_persistent_5xx_raises_after_retries(self):
+        with self.assertRaises(graphql_api.GraphQLError) as erro:
+            self._executar([Resposta(502)] * (graphql_api.SERVER_ERROR_RETRIES + 1))
+        self.assertEqual(erro.exception.status_code, 502)
+        self.assertEqual(self.chamadas, graphql_api.SERVER_ERROR_RETRIES + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
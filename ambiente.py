@@ -0,0 +1,68 @@
+# 🚀 Verificação rápida do ambiente dos labs: nada de importar os pacotes (ou perguntar ao pip)
+# só para ver se existem. O resultado fica numa assinatura gravada em `stamp_file`; enquanto
+# requirements, interpretador e pastas de pacotes não mudarem, a verificação nem é refeita.
+import os
+import re
+import sys
+import hashlib
+import subprocess
+import importlib.metadata
+
+def _versao(texto):
+    partes = []
+    for parte in texto.split("."):
+        numero = re.match(r"\d+", parte)
+        if not numero:
+            break
+        partes.append(int(numero.group()))
+    return tuple(partes)
+
+def _ler_requisitos(conteudo):
+    for linha in conteudo.decode("utf-8").splitlines():
+        linha = linha.split("#", 1)[0].strip()
+        requisito = re.match(r"([A-Za-z0-9_.\-]+)\s*(?:(>=|==)\s*([\w.]+))?", linha)
+        if requisito:
+            yield linha, *requisito.groups()
+
+def _assinatura_ambiente(conteudo):
+    # Instalar ou remover um pacote altera a data de modificação da pasta site-packages
+    sha = hashlib.sha256(conteudo)
+    sha.update(sys.executable.encode())
+    for pasta in sys.path:
+        if pasta and os.path.isdir(pasta):
+            sha.update(f"{pasta}:{os.stat(pasta).st_mtime_ns}".encode())
+    return sha.hexdigest()
+
+def _requisito_atendido(nome, operador, versao):
+    try:
+        instalada = importlib.metadata.version(nome)
+    except importlib.metadata.PackageNotFoundError:
+        return False
+    if operador == ">=":
+        return _versao(instalada) >= _versao(versao)
+    if operador == "==":
+        return _versao(instalada) == _versao(versao)
+    return True
+
+def verificar_ambiente(requirements_file, stamp_file, recuo=""):
+    """
+    🔎 Instala (com o pip do interpretador atual) os requisitos de `requirements_file` que faltam
+    ou estão abaixo da versão pedida. `recuo` alinha as mensagens com o menu de cada lab.
+    """
+    with open(requirements_file, "rb") as f:
+        conteudo = f.read()
+    try:
+        with open(stamp_file, encoding="utf-8") as f:
+            if f.read().strip() == _assinatura_ambiente(conteudo):
+                return
+    except OSError:
+        pass
+
+    print(f"\n{recuo}🔎 Verificando dependências (requirements.txt)...\n")
+    faltando = [linha for linha, nome, operador, versao in _ler_requisitos(conteudo)
+                if not _requisito_atendido(nome, operador, versao)]
+    if faltando:
+        print(f"{recuo}⬇️ Instalando: {', '.join(faltando)}")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *faltando])
+    with open(stamp_file, "w", encoding="utf-8") as f:
+        f.write(_assinatura_ambiente(conteudo))